@@ -0,0 +1,116 @@
+"""Admission control for bd executions.
+
+A fixed number of bd processes may run at once. Commands beyond that wait in
+a priority queue: interactive traffic (the Teams bot) is admitted before
+normal API traffic, which is admitted before batch work (agents, dashboard
+renders). Each priority class has a bounded queue and every command a
+bounded wait. When either limit is hit, the request fails immediately with
+503 and a Retry-After estimate, rather than queueing until the bd timeout.
+
+Callers pick a class with the X-Atom-Priority header. The HTTP middleware
+stores it in `current_priority`, so it reaches the executor without being
+threaded through every helper.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+
+from fastapi import HTTPException
+
+import metrics
+
+PRIORITIES = {"interactive": 0, "normal": 1, "batch": 2}
+DEFAULT_PRIORITY = "normal"
+
+current_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "atom_priority", default=DEFAULT_PRIORITY)
+
+
+def parse_priority(value: str | None) -> str:
+    value = (value or "").strip().lower()
+    return value if value in PRIORITIES else DEFAULT_PRIORITY
+
+
+class AdmissionGate:
+    """Counting semaphore with priority classes, bounded queues and wait deadlines."""
+
+    def __init__(self, slots: int, max_waiting: dict[str, int] | None = None,
+                 wait_timeout: float = 5.0):
+        self.slots = slots
+        self.max_waiting = {p: 32 for p in PRIORITIES}
+        self.max_waiting.update(max_waiting or {})
+        self.wait_timeout = wait_timeout
+        self.in_use = 0
+        self.waiting = {p: 0 for p in PRIORITIES}
+        self.rejected = {p: 0 for p in PRIORITIES}
+        self.avg_duration = 0.5  # EWMA of bd run time (s), for Retry-After
+        self._heap: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        backlog = sum(self.waiting.values()) + self.in_use
+        return max(1, math.ceil(self.avg_duration * backlog / self.slots))
+
+    def reject(self, priority: str, reason: str) -> HTTPException:
+        self.rejected[priority] += 1
+        metrics.BD_REJECTED.inc(priority=priority, reason=reason)
+        return HTTPException(503, detail=f"bd executor saturated ({reason}); retry later",
+                             headers={"Retry-After": str(self.retry_after())})
+
+    async def acquire(self, priority: str = DEFAULT_PRIORITY, timeout: float | None = None) -> None:
+        """Take a slot, or raise 503 if the class queue is full or the wait runs out."""
+        if self.in_use < self.slots and not self._heap:
+            self.in_use += 1
+            return
+        if self.waiting[priority] >= self.max_waiting[priority]:
+            raise self.reject(priority, "queue full")
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (PRIORITIES[priority], next(self._seq), fut))
+        self.waiting[priority] += 1
+        try:
+            await asyncio.wait_for(fut, self.wait_timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                return  # the slot arrived as the deadline fired
+            raise self.reject(priority, "wait timeout")
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # handed a slot we'll never use
+            raise
+        finally:
+            self.waiting[priority] -= 1
+            if not fut.done() or fut.cancelled():
+                self._discard(fut)
+
+    def _discard(self, fut: asyncio.Future) -> None:
+        """Drop an abandoned waiter so a free slot never sits behind it."""
+        self._heap = [entry for entry in self._heap if entry[2] is not fut]
+        heapq.heapify(self._heap)
+
+    def release(self) -> None:
+        """Hand the slot straight to the best waiter, or free it."""
+        while self._heap:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.in_use -= 1
+
+    def observe(self, duration: float) -> None:
+        self.avg_duration += 0.2 * (duration - self.avg_duration)
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.slots,
+            "in_use": self.in_use,
+            "waiting": dict(self.waiting),
+            "max_waiting": dict(self.max_waiting),
+            "rejected": dict(self.rejected),
+            "wait_timeout_s": self.wait_timeout,
+            "retry_after_s": self.retry_after(),
+        }
@@ -0,0 +1,126 @@
+"""Artifact access — path resolution, content cache and directory listings.
+
+Artifacts are the text files (mostly markdown) in a project's repo. JSON reads
+are served from a byte-bounded LRU cache of encoded response bodies keyed by
+path and invalidated by mtime/size, so a hot document is read and escaped
+once per change rather than once per request.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from fastapi import HTTPException
+
+import metrics
+
+ALLOWED_SUFFIXES = {".md", ".txt", ".yml", ".yaml", ".json", ".toml"}
+MEDIA_TYPES = {
+    ".md": "text/markdown; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+    ".yml": "application/yaml",
+    ".yaml": "application/yaml",
+    ".json": "application/json",
+    ".toml": "application/toml",
+}
+# Never listed: VCS internals, bead storage, dependency trees
+SKIP_DIRS = {".git", ".beads", "node_modules", "__pycache__", ".venv", "venv"}
+MAX_LISTING = 5000
+
+
+def resolve(project_root: str, file_path: str) -> Path:
+    """Resolve a project-relative path, rejecting anything outside the project."""
+    root = Path(project_root).resolve()
+    resolved = (root / file_path).resolve()
+    if not resolved.is_relative_to(root):
+        raise HTTPException(400, detail="path traversal not allowed")
+    return resolved
+
+
+def check_suffix(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix not in ALLOWED_SUFFIXES:
+        raise HTTPException(400, detail=f"unsupported file type: {suffix}")
+    return suffix
+
+
+class ContentCache:
+    """LRU of encoded JSON bodies, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[tuple, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, sig: tuple, render) -> bytes:
+        """Cached body for path at sig, else render() it and cache the result."""
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self._entries.move_to_end(key)
+                metrics.ARTIFACT_CACHE.inc(result="hit")
+                return entry[1]
+        metrics.ARTIFACT_CACHE.inc(result="miss")
+        body = render()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            # An entry bigger than a quarter of the budget would just churn it
+            if len(body) <= self.max_bytes // 4:
+                self._entries[key] = (sig, body)
+                self.size += len(body)
+                while self.size > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.size -= len(evicted)
+        return body
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes}
+
+
+def encode(path: str, resolved: Path) -> bytes:
+    content = resolved.read_text(errors="replace")
+    return json.dumps({"path": path, "content": content}, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+
+
+def list_dir(project_root: str, rel_dir: str, recursive: bool = False) -> tuple[list[dict], bool]:
+    """Artifact files (and, unless recursive, subdirectories) under rel_dir.
+
+    Returns (entries, truncated); listings stop at MAX_LISTING entries.
+    """
+    root = Path(project_root).resolve()
+    base = resolve(project_root, rel_dir or ".")
+    if not base.is_dir():
+        raise HTTPException(404, detail=f"directory not found: {rel_dir}")
+
+    out = []
+
+    def add(entry: os.DirEntry, kind: str) -> None:
+        st = entry.stat()
+        item = {"path": Path(entry.path).relative_to(root).as_posix(),
+                "name": entry.name, "type": kind, "modified": st.st_mtime}
+        if kind == "file":
+            item["size"] = st.st_size
+        out.append(item)
+
+    stack = [base]
+    while stack and len(out) <= MAX_LISTING:
+        with os.scandir(stack.pop()) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in SKIP_DIRS or entry.name.startswith("."):
+                        continue
+                    if recursive:
+                        stack.append(Path(entry.path))
+                    else:
+                        add(entry, "dir")
+                elif entry.is_file() and Path(entry.name).suffix.lower() in ALLOWED_SUFFIXES:
+                    add(entry, "file")
+    out.sort(key=lambda e: (e["type"] != "dir", e["path"]))
+    return out[:MAX_LISTING], len(out) > MAX_LISTING
@@ -0,0 +1,128 @@
+"""Planning for POST /api/v1/batch.
+
+Ops are grouped per project (groups run concurrently, ops within a group run
+in submission order). Update/close ops that carry identical arguments are
+merged into one multi-ID bd invocation, so a bulk triage of N beads costs one
+process and one JSONL rewrite instead of N. The same planning backs the
+per-project write pipeline (writes.py).
+"""
+
+import json
+
+READ_OPS = {"list", "show", "comments", "deps"}
+WRITE_OPS = {"create", "update", "close", "comment"}
+ID_OPS = {"show", "comments", "deps", "update", "close", "comment"}
+MERGEABLE_OPS = {"update", "close"}
+MAX_OPS = 200
+
+
+STRING_FIELDS = ("id", "project", "actor", "status", "label", "assignee", "type",
+                 "title", "description", "reason", "text")
+INT_FIELDS = ("limit", "priority")
+LIST_FIELDS = ("labels", "add_labels", "remove_labels")  # lists of strings
+
+
+def validate(op: dict) -> str | None:
+    """Return an error message for a malformed op, or None.
+
+    Fields with a fixed type are checked and coerced in place (JSON clients
+    send "1" as often as 1), so a bad value fails this op instead of the batch.
+    """
+    if not isinstance(op, dict):
+        return "op must be an object"
+    kind = op.get("op")
+    if not isinstance(kind, str) or kind not in READ_OPS | WRITE_OPS:
+        return f"unknown op: {kind}"
+    for field in STRING_FIELDS:
+        if op.get(field) is not None and not isinstance(op[field], str):
+            return f"{field} must be a string"
+    for field in LIST_FIELDS:
+        value = op.get(field)
+        if value is not None and not (isinstance(value, list)
+                                      and all(isinstance(v, str) for v in value)):
+            return f"{field} must be a list of strings"
+    for field in INT_FIELDS:
+        value = op.get(field)
+        if value is None:
+            continue
+        if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            value = int(value)
+        if not isinstance(value, int) or isinstance(value, bool):
+            return f"{field} must be an integer"
+        if field == "limit" and value < 0:
+            return "limit must not be negative"
+        op[field] = value
+    if "all" in op:
+        value = op["all"]
+        if isinstance(value, str) and value.lower() in ("true", "1", "false", "0"):
+            value = value.lower() in ("true", "1")
+        if not isinstance(value, bool):
+            return "all must be a boolean"
+        op["all"] = value
+    if kind in ID_OPS and not op.get("id"):
+        return f"{kind} requires id"
+    return None
+
+
+def group_by_project(ops: list[tuple[int, dict]]) -> dict[str | None, list[tuple[int, dict]]]:
+    """Bucket (index, op) pairs by target project, preserving order."""
+    groups: dict[str | None, list[tuple[int, dict]]] = {}
+    for i, op in ops:
+        groups.setdefault(op.get("project"), []).append((i, op))
+    return groups
+
+
+def _merge_key(op: dict) -> str | None:
+    if op["op"] not in MERGEABLE_OPS:
+        return None
+    rest = {k: v for k, v in op.items() if k not in ("id", "project")}
+    return json.dumps(rest, sort_keys=True)
+
+
+def coalesce(items: list[tuple[int, dict]]) -> list[list[tuple[int, dict]]]:
+    """Split a project's ops into runs executed in order; each run is one bd call.
+
+    An update/close op joins an earlier run with identical arguments as long
+    as no op in between touches the same bead, so per-bead ordering holds.
+    """
+    runs: list[list[tuple[int, dict]]] = []
+    touched_after: list[set] = []  # ids touched by other runs since run i began
+    open_runs: dict[str, int] = {}
+    for item in items:
+        op = item[1]
+        key = _merge_key(op)
+        bead_id = op.get("id")
+        target = open_runs.get(key) if key is not None else None
+        if target is not None and (bead_id in touched_after[target]
+                                   or any(o.get("id") == bead_id for _, o in runs[target])):
+            target = None
+        if target is None:
+            runs.append([item])
+            touched_after.append(set())
+            target = len(runs) - 1
+            if key is not None:
+                open_runs[key] = target
+        else:
+            runs[target].append(item)
+        if bead_id:
+            for i in range(len(runs)):
+                if i != target:
+                    touched_after[i].add(bead_id)
+    return runs
+
+
+def split_result(result: dict | list, bead_ids: list[str]) -> list:
+    """Distribute a multi-ID bd result back to each requested bead."""
+    if isinstance(result, list):
+        by_id = {r.get("id"): r for r in result if isinstance(r, dict)}
+        if all(b in by_id for b in bead_ids):
+            return [by_id[b] for b in bead_ids]
+    return [result for _ in bead_ids]
+
+
+def ok(result) -> dict:
+    return {"ok": True, "result": result}
+
+
+def error(status: int, detail) -> dict:
+    return {"ok": False, "status": status, "error": detail}
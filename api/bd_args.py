@@ -0,0 +1,102 @@
+"""bd argument builders shared by the single-bead endpoints and /api/v1/batch.
+
+Each builder takes the same JSON body the REST endpoint accepts and raises
+HTTPException(400) on missing required fields.
+"""
+
+from fastapi import HTTPException
+
+
+def list_args(status=None, priority=None, label=None, assignee=None,
+              type=None, limit=0, all=False) -> list[str]:
+    args = ["list", "--json"]
+    if all:
+        args.append("--all")
+    if status:
+        args += ["--status", status]
+    if priority is not None:
+        args += ["--priority", str(priority)]
+    if label:
+        args += ["--label", label]
+    if assignee:
+        args += ["--assignee", assignee]
+    if type:
+        args += ["--type", type]
+    # Always explicit: bd's own default would cap a "no limit" (0) listing
+    args += ["--limit", str(limit or 0)]
+    return args
+
+
+def create_args(body: dict) -> list[str]:
+    title = body.get("title")
+    if not title:
+        raise HTTPException(400, detail="title is required")
+
+    args = ["create", title, "--json", "--actor", body.get("actor", "api")]
+    if body.get("description"):
+        args += ["--description", body["description"]]
+    if body.get("priority") is not None:
+        args += ["--priority", str(body["priority"])]
+    if body.get("type"):
+        args += ["--type", body["type"]]
+    if body.get("labels"):
+        args += ["--labels", ",".join(body["labels"])]
+    if body.get("assignee"):
+        args += ["--assignee", body["assignee"]]
+    return args
+
+
+def update_args(bead_ids: list[str], body: dict) -> list[str]:
+    args = ["update", *bead_ids, "--json", "--actor", body.get("actor", "api")]
+    if body.get("status"):
+        args += ["--status", body["status"]]
+    if body.get("title"):
+        args += ["--title", body["title"]]
+    if body.get("description"):
+        args += ["--description", body["description"]]
+    if body.get("priority") is not None:
+        args += ["--priority", str(body["priority"])]
+    if body.get("assignee"):
+        args += ["--assignee", body["assignee"]]
+    if body.get("claim"):
+        args.append("--claim")
+    for label in body.get("add_labels") or []:
+        args += ["--add-label", label]
+    for label in body.get("remove_labels") or []:
+        args += ["--remove-label", label]
+    return args
+
+
+def close_args(bead_ids: list[str], body: dict) -> list[str]:
+    args = ["close", *bead_ids, "--json", "--actor", body.get("actor", "api")]
+    if body.get("reason"):
+        args += ["--reason", body["reason"]]
+    return args
+
+
+def comment_args(bead_id: str, body: dict) -> list[str]:
+    text = body.get("text")
+    if not text:
+        raise HTTPException(400, detail="text is required")
+    return ["comments", "add", bead_id, text, "--actor", body.get("actor", "api")]
+
+
+def op_args(op: dict) -> list[str]:
+    """Arguments for a single write op ({op: create|update|close|comment, ...})."""
+    kind = op["op"]
+    if kind == "create":
+        return create_args(op)
+    if kind == "update":
+        return update_args([op["id"]], op)
+    if kind == "close":
+        return close_args([op["id"]], op)
+    if kind == "comment":
+        return comment_args(op["id"], op)
+    raise HTTPException(400, detail=f"not a write op: {kind}")
+
+
+def create_result(result: dict | list) -> dict | list:
+    """Normalize bd create output (--silent style returns just the ID as text)."""
+    if isinstance(result, dict) and "output" in result:
+        return {"id": result["output"].strip()}
+    return result
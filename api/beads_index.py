@@ -0,0 +1,304 @@
+"""In-memory index over a project's .beads/issues.jsonl.
+
+bd in --no-db mode treats issues.jsonl as the source of truth, so reads can be
+served straight from the file without forking bd. Each project gets one
+ProjectIndex, reloaded whenever the file's inode/mtime/size changes.
+
+Queries only read the last loaded snapshot; they never touch the file.
+Callers reload with refresh() first, off the event loop (the API does this
+through asyncio.to_thread, the watcher on its own thread).
+
+Reloads are incremental: unchanged lines reuse their parsed record, only
+changed beads are re-indexed, and the resulting ChangeSet is handed to any
+listeners registered with on_change() (dependency graph, stats, feeds).
+
+Each indexed bead remembers the exact JSONL line it was parsed from
+(raw_json()), so responses can splice bd's own serialization back out
+instead of re-encoding the dict.
+"""
+
+import bisect
+import itertools
+import json
+import sys
+import threading
+import traceback
+from collections import defaultdict
+from pathlib import Path
+
+# Statuses that never show up in listings
+HIDDEN_STATUSES = {"tombstone"}
+CLOSED_STATUSES = {"closed"}
+
+
+class IndexUnavailable(Exception):
+    """The JSONL file is missing or unreadable — callers should fall back to bd."""
+
+
+class ChangeSet:
+    """Beads that differ between two loads of a project's JSONL."""
+
+    def __init__(self, project_path: str, initial: bool = False):
+        self.project_path = project_path
+        self.initial = initial  # first load of the project, not a live change
+        self.added: dict[str, dict] = {}
+        self.updated: dict[str, tuple[dict, dict]] = {}  # id -> (old, new)
+        self.removed: dict[str, dict] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def sort_key(bead: dict) -> tuple:
+    """Listing order: priority, then creation time, then id."""
+    p = bead.get("priority")
+    return (p if isinstance(p, int) else 99, bead.get("created_at") or "", bead.get("id", ""))
+
+
+class ProjectIndex:
+    """Secondary indexes over one project's beads."""
+
+    def __init__(self, project_path: str | Path):
+        self.project_path = str(project_path)
+        self.jsonl = Path(project_path) / ".beads" / "issues.jsonl"
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._sig: tuple | None = None
+        self._by_line: dict[bytes, dict] = {}
+        self.by_id: dict[str, dict] = {}
+        self.by_status: dict[str, set] = defaultdict(set)
+        self.by_priority: dict[int, set] = defaultdict(set)
+        self.by_label: dict[str, set] = defaultdict(set)
+        self.by_assignee: dict[str, set] = defaultdict(set)
+        self.by_type: dict[str, set] = defaultdict(set)
+        self.ordered: list[str] = []
+        self.ordered_keys: list[tuple] = []
+
+    def _stat_sig(self) -> tuple:
+        try:
+            st = self.jsonl.stat()
+        except OSError:
+            raise IndexUnavailable(f"{self.jsonl} not found")
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def stale(self) -> bool:
+        """True if the next read would reload the file."""
+        try:
+            return self._stat_sig() != self._sig
+        except IndexUnavailable:
+            return True
+
+    def refresh(self) -> bool:
+        """Reload if the file changed since the last load. Returns True on reload."""
+        if self._stat_sig() == self._sig:
+            return False
+        # One reload at a time (watcher thread vs. a request's to_thread), so
+        # an older parse can never be applied over a newer one. Parsing is
+        # still outside _lock; readers only wait for the (cheap) swap.
+        with self._load_lock:
+            sig = self._stat_sig()
+            if sig == self._sig:
+                return False
+            beads, by_line = self._load()
+            with self._lock:
+                changes = self._apply(beads)
+                _register_raw(self._by_line, by_line)
+                self._by_line = by_line
+                self._sig = sig
+                for listener in _listeners:
+                    try:
+                        listener(changes)
+                    except Exception:
+                        # One broken listener must not starve the others of changes
+                        traceback.print_exc(file=sys.stderr)
+        return True
+
+    def _load(self) -> tuple[dict[str, dict], dict[bytes, dict]]:
+        beads = {}
+        by_line = {}
+        prev = self._by_line
+        try:
+            with open(self.jsonl, "rb") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    bead = prev.get(line)
+                    if bead is None:
+                        bead = json.loads(line)
+                    beads[bead["id"]] = bead
+                    by_line[line] = bead
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Caught mid-rewrite or corrupt — don't cache, let bd handle it
+            raise IndexUnavailable(f"failed to load {self.jsonl}: {e}")
+        return beads, by_line
+
+    def _apply(self, beads: dict[str, dict]) -> ChangeSet:
+        """Swap in a new load, re-indexing only the beads that changed."""
+        old = self.by_id
+        changes = ChangeSet(self.project_path, initial=self._sig is None)
+        for bead_id, bead in beads.items():
+            prior = old.get(bead_id)
+            if prior is None:
+                changes.added[bead_id] = bead
+            elif prior is not bead:
+                changes.updated[bead_id] = (prior, bead)
+        for bead_id, prior in old.items():
+            if bead_id not in beads:
+                changes.removed[bead_id] = prior
+
+        for bead_id, prior in changes.removed.items():
+            self._unindex(bead_id, prior)
+        for bead_id, (prior, _) in changes.updated.items():
+            self._unindex(bead_id, prior)
+        for bead_id, bead in changes.added.items():
+            self._index(bead_id, bead)
+        for bead_id, (_, bead) in changes.updated.items():
+            self._index(bead_id, bead)
+
+        self.by_id = beads
+        if changes:
+            self.ordered = sorted(beads, key=lambda i: sort_key(beads[i]))
+            self.ordered_keys = [sort_key(beads[i]) for i in self.ordered]
+        return changes
+
+    def _keys(self, bead: dict) -> list[tuple[dict, object]]:
+        keys = [(self.by_status, bead.get("status", "open")),
+                (self.by_type, bead.get("issue_type", "task"))]
+        if isinstance(bead.get("priority"), int):
+            keys.append((self.by_priority, bead["priority"]))
+        for label in bead.get("labels") or []:
+            keys.append((self.by_label, label))
+        if bead.get("assignee"):
+            keys.append((self.by_assignee, bead["assignee"]))
+        return keys
+
+    def _index(self, bead_id: str, bead: dict) -> None:
+        for table, key in self._keys(bead):
+            table[key].add(bead_id)
+
+    def _unindex(self, bead_id: str, bead: dict) -> None:
+        for table, key in self._keys(bead):
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(bead_id)
+                if not ids:
+                    del table[key]
+
+    # ---- Queries ----
+
+    def _check_loaded(self) -> None:
+        if self._sig is None:
+            raise IndexUnavailable(f"{self.jsonl} not loaded")
+
+    def get(self, bead_id: str) -> dict | None:
+        self._check_loaded()
+        with self._lock:
+            return self.by_id.get(bead_id)
+
+    def query(
+        self,
+        status: str | None = None,
+        priority: int | None = None,
+        label: str | None = None,
+        assignee: str | None = None,
+        type: str | None = None,
+        limit: int = 0,
+        all: bool = False,
+        after: tuple | None = None,
+    ) -> list[dict]:
+        """Filter beads with bd list semantics (closed hidden unless asked for).
+
+        `after` is a sort_key(); only beads ordered strictly after it are returned.
+        """
+        self._check_loaded()
+        with self._lock:
+            return self._query(status, priority, label, assignee, type, limit, all, after)
+
+    def _query(self, status, priority, label, assignee, type, limit, all, after) -> list[dict]:
+        by_id = self.by_id
+        candidates = []
+        if status:
+            candidates.append(self.by_status.get(status, set()))
+        if priority is not None:
+            candidates.append(self.by_priority.get(priority, set()))
+        if label:
+            candidates.append(self.by_label.get(label, set()))
+        if assignee:
+            candidates.append(self.by_assignee.get(assignee, set()))
+        if type:
+            candidates.append(self.by_type.get(type, set()))
+
+        if candidates:
+            candidates.sort(key=len)
+            matched = set.intersection(*candidates)
+            ids = sorted(matched, key=lambda i: sort_key(by_id[i]))
+            if after is not None:
+                ids = [i for i in ids if sort_key(by_id[i]) > after]
+        elif after is not None:
+            start = bisect.bisect_right(self.ordered_keys, after)
+            ids = itertools.islice(self.ordered, start, None)
+        else:
+            ids = self.ordered
+
+        out = []
+        for bead_id in ids:
+            bead = by_id[bead_id]
+            s = bead.get("status", "open")
+            if s in HIDDEN_STATUSES and s != status:
+                continue
+            if s in CLOSED_STATUSES and not (all or status):
+                continue
+            out.append(bead)
+            if limit and len(out) >= limit:
+                break
+        return out
+
+    def comments(self, bead_id: str) -> list[dict] | None:
+        bead = self.get(bead_id)
+        if bead is None:
+            return None
+        return bead.get("comments") or []
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+# id(bead) -> (bead, the JSONL line it was parsed from) for every bead an index
+# holds. Keeping the bead itself pins its id; entries go when the bead leaves
+# its index.
+_raw_lines: dict[int, tuple[dict, bytes]] = {}
+
+
+def _register_raw(old: dict[bytes, dict], new: dict[bytes, dict]) -> None:
+    for line, bead in old.items():
+        if new.get(line) is not bead:
+            _raw_lines.pop(id(bead), None)
+    for line, bead in new.items():
+        _raw_lines[id(bead)] = (bead, line)
+
+
+def raw_json(bead: dict) -> bytes | None:
+    """The bead's original JSONL line, if it is an unmodified indexed record."""
+    entry = _raw_lines.get(id(bead))
+    return entry[1] if entry is not None and entry[0] is bead else None
+
+
+_indexes: dict[str, ProjectIndex] = {}
+_registry_lock = threading.Lock()
+_listeners: list = []
+
+
+def on_change(listener) -> None:
+    """Register fn(ChangeSet), called after every (re)load of any project."""
+    _listeners.append(listener)
+
+
+def get_index(project_path: str) -> ProjectIndex:
+    """Return the (lazily created) index for a project directory."""
+    idx = _indexes.get(project_path)
+    if idx is None:
+        with _registry_lock:
+            idx = _indexes.setdefault(project_path, ProjectIndex(project_path))
+    return idx
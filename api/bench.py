@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the Atom API.
+
+    # synthetic portfolio: 4 projects, 20k beads total, with deps and comments
+    python3 api/bench.py generate /tmp/bench --projects 4 --beads 20000
+
+    # start the API on it (fake bd, 40 ms per call) and drive a mixed workload
+    python3 api/bench.py run /tmp/bench --latency-ms 40 --concurrency 32 \\
+        --duration 20 --out results/base.json
+
+    # same workload after a change, then diff the two runs
+    python3 api/bench.py run /tmp/bench ... --out results/new.json
+    python3 api/bench.py compare results/base.json results/new.json
+
+`run` spawns api/main.py against the generated projects, using fake_bd.py
+unless --bd points at a real bd binary; --url targets an already running API
+instead. The load driver is a plain asyncio HTTP/1.1 keep-alive client, so no
+extra packages are needed. Generation and the op mix are seeded, so runs are
+reproducible.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+API_DIR = Path(__file__).resolve().parent
+
+DEFAULT_MIX = "list=30,list_all=5,show=25,ready=10,search=10,graph=5,update=10,comment=5"
+WORDS = ("api bot index cache deploy renderer signal portfolio queue webhook schema "
+         "migration latency timeout retry auth token dashboard sync export parser "
+         "worker daemon socket stream cursor graph search artifact release pipeline").split()
+STATUSES = ("open", "open", "open", "in_progress", "closed", "closed")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic projects
+# ---------------------------------------------------------------------------
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def generate(base: Path, projects: int, beads: int, seed: int = 1,
+             dep_ratio: float = 0.3, comment_ratio: float = 0.2) -> dict:
+    """Write <base>/<project>/.beads/issues.jsonl for each project plus projects.yml."""
+    rng = random.Random(seed)
+    names = [f"p{i}" for i in range(projects)]
+    per_project = max(1, beads // projects)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    all_ids: list[str] = []
+    for name in names:
+        ids = [f"{name}-{i:05x}" for i in range(per_project)]
+        rows = []
+        for i, bead_id in enumerate(ids):
+            created = (start + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            bead = {
+                "id": bead_id,
+                "title": _sentence(rng, 5),
+                "description": _sentence(rng, 30),
+                "status": rng.choice(STATUSES),
+                "priority": rng.randint(0, 4),
+                "issue_type": rng.choice(("task", "task", "bug", "feature")),
+                "labels": rng.sample(WORDS, rng.randint(0, 2)),
+                "created_at": created,
+                "updated_at": created,
+            }
+            if bead["status"] == "closed":
+                bead["close_reason"] = _sentence(rng, 4)
+            if i and rng.random() < dep_ratio:
+                # Mostly earlier beads in the same project, sometimes another project
+                pool = all_ids if all_ids and rng.random() < 0.05 else ids[:i]
+                bead["dependencies"] = [
+                    {"issue_id": bead_id, "depends_on_id": target, "type": "blocks"}
+                    for target in set(rng.choice(pool) for _ in range(rng.randint(1, 3)))]
+            if rng.random() < comment_ratio:
+                bead["comments"] = [
+                    {"id": c + 1, "issue_id": bead_id, "author": "bench",
+                     "text": _sentence(rng, 12), "created_at": created}
+                    for c in range(rng.randint(1, 4))]
+            rows.append(bead)
+        all_ids += ids
+
+        beads_dir = base / name / ".beads"
+        beads_dir.mkdir(parents=True, exist_ok=True)
+        with open(beads_dir / "issues.jsonl", "w") as f:
+            f.writelines(json.dumps(b, separators=(",", ":")) + "\n" for b in rows)
+        docs = base / name / "docs"
+        docs.mkdir(exist_ok=True)
+        for d in range(5):
+            (docs / f"doc-{d}.md").write_text(
+                f"# {_sentence(rng, 3)}\n\n" + "\n\n".join(_sentence(rng, 60) for _ in range(20)))
+
+    (base / "projects.yml").write_text(
+        "projects:\n" + "".join(f"  {n}:\n    prefix: {n}\n" for n in names))
+    return {"projects": names, "beads": per_project * projects, "seed": seed}
+
+
+# ---------------------------------------------------------------------------
+# HTTP client
+# ---------------------------------------------------------------------------
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client (Content-Length and chunked bodies)."""
+
+    def __init__(self, host: str, port: int, token: str = ""):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, body=None) -> tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        if self.token:
+            head.append(f"Authorization: Bearer {self.token}")
+        if body is not None:
+            head.append("Content-Type: application/json")
+        head.append(f"Content-Length: {len(payload)}")
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode().partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b"".join(chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, data
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+def parse_mix(mix: str) -> dict[str, float]:
+    out = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPS:
+            raise SystemExit(f"unknown op in mix: {name}")
+        out[name.strip()] = float(weight or 1)
+    return out
+
+
+def _pick(rng: random.Random, ctx: dict) -> tuple[str, str]:
+    project = rng.choice(ctx["projects"])
+    return project, rng.choice(ctx["ids"][project])
+
+
+def _op_list(rng, ctx):
+    return "GET", f"/api/v1/beads?project={rng.choice(ctx['projects'])}&limit=50", None
+
+
+def _op_list_all(rng, ctx):
+    return "GET", "/api/v1/beads?project=*&limit=50", None
+
+
+def _op_show(rng, ctx):
+    project, bead_id = _pick(rng, ctx)
+    return "GET", f"/api/v1/beads/{bead_id}?project={project}", None
+
+
+def _op_ready(rng, ctx):
+    return "GET", "/api/v1/ready?limit=50", None
+
+
+def _op_search(rng, ctx):
+    return "GET", f"/api/v1/search?q={quote(_sentence(rng, 2))}", None
+
+
+def _op_graph(rng, ctx):
+    _, bead_id = _pick(rng, ctx)
+    return "GET", f"/api/v1/graph/beads/{bead_id}", None
+
+
+def _op_update(rng, ctx):
+    project, bead_id = _pick(rng, ctx)
+    return "PATCH", f"/api/v1/beads/{bead_id}", {"project": project, "priority": rng.randint(0, 4)}
+
+
+def _op_comment(rng, ctx):
+    project, bead_id = _pick(rng, ctx)
+    return "POST", f"/api/v1/beads/{bead_id}/comments", {"project": project, "text": _sentence(rng, 8)}
+
+
+OPS = {
+    "list": _op_list, "list_all": _op_list_all, "show": _op_show, "ready": _op_ready,
+    "search": _op_search, "graph": _op_graph, "update": _op_update, "comment": _op_comment,
+}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ms = sorted(v * 1000 for v in latencies)
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+async def drive(host: str, port: int, token: str, ctx: dict, mix: dict[str, float],
+                concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples: dict[str, list[float]] = {n: [] for n in names}
+    errors: dict[str, int] = {n: 0 for n in names}
+    start = time.monotonic()
+    record_from = start + warmup
+    stop_at = record_from + duration
+
+    async def worker(i: int) -> None:
+        rng = random.Random(seed * 1000 + i)
+        conn = Connection(host, port, token)
+        try:
+            while time.monotonic() < stop_at:
+                name = rng.choices(names, weights)[0]
+                method, path, body = OPS[name](rng, ctx)
+                t0 = time.monotonic()
+                try:
+                    status, _ = await conn.request(method, path, body)
+                    ok = status < 400
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    await conn.close()
+                    ok = False
+                if t0 >= record_from:
+                    samples[name].append(time.monotonic() - t0)
+                    if not ok:
+                        errors[name] += 1
+        finally:
+            await conn.close()
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.monotonic() - record_from
+    everything = [v for n in names for v in samples[n]]
+    return {
+        "total": summarize(everything, sum(errors.values()), elapsed),
+        "ops": {n: summarize(samples[n], errors[n], elapsed) for n in names},
+    }
+
+
+async def discover(host: str, port: int, token: str) -> dict:
+    """Projects and a sample of bead IDs to aim reads and writes at."""
+    conn = Connection(host, port, token)
+    try:
+        status, data = await conn.request("GET", "/api/v1/projects")
+        projects = [p["name"] for p in json.loads(data) if p["has_beads"]]
+        ids = {}
+        for name in projects:
+            _, data = await conn.request("GET", f"/api/v1/beads?project={name}&limit=500&fields=id")
+            ids[name] = [b["id"] for b in json.loads(data)] or [f"{name}-missing"]
+        return {"projects": projects, "ids": ids}
+    finally:
+        await conn.close()
+
+
+# ---------------------------------------------------------------------------
+# API process
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_api(base: Path, bd: str | None, latency_ms: float, jitter_ms: float,
+              extra_env: dict) -> tuple[subprocess.Popen, int]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PROJECTS_BASE": str(base),
+        "ATOM_PROJECTS_FILE": str(base / "projects.yml"),
+        "ATOM_API_PORT": str(port),
+        "ATOM_API_TOKEN": "",
+        "BD_PATH": bd or str(API_DIR / "fake_bd.py"),
+        "FAKE_BD_LATENCY_MS": str(latency_ms),
+        "FAKE_BD_JITTER_MS": str(jitter_ms),
+        **extra_env,
+    }
+    proc = subprocess.Popen([sys.executable, str(API_DIR / "main.py")], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 120  # 100k-bead indexes take a while to load
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"API exited: {proc.stderr.read().decode()[-2000:]}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2) as s:
+                s.sendall(b"GET /healthz HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+                if s.recv(64).startswith(b"HTTP/1.1 200"):
+                    return proc, port
+        except OSError:
+            pass
+        time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("API did not become healthy")
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    proc = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        extra = dict(e.split("=", 1) for e in args.env)
+        proc, port = spawn_api(Path(args.base), args.bd, args.latency_ms, args.jitter_ms, extra)
+        host = "127.0.0.1"
+    try:
+        ctx = asyncio.run(discover(host, port, args.token))
+        result = asyncio.run(drive(host, port, args.token, ctx, mix, args.concurrency,
+                                   args.duration, args.warmup, args.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    result["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "target": args.url or "spawned",
+        "bd": args.bd or "fake_bd.py",
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": mix,
+        "seed": args.seed,
+        "env": args.env,
+        "projects": len(ctx["projects"]),
+    }
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+COLUMNS = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def report(result: dict) -> str:
+    lines = [f"{'op':<10}" + "".join(f"{c:>11}" for c in COLUMNS)]
+    for name, row in [*result["ops"].items(), ("TOTAL", result["total"])]:
+        lines.append(f"{name:<10}" + "".join(f"{row[c]:>11}" for c in COLUMNS))
+    return "\n".join(lines)
+
+
+def compare(base: dict, new: dict) -> str:
+    """Per-op change in throughput and latency percentiles, new vs base."""
+    metrics = ("rps", "p50_ms", "p95_ms", "p99_ms")
+    lines = [f"{'op':<10}" + "".join(f"{m:>24}" for m in metrics)]
+    rows = [(n, base["ops"].get(n), new["ops"].get(n)) for n in new["ops"]]
+    rows.append(("TOTAL", base["total"], new["total"]))
+    for name, b, n in rows:
+        if b is None:
+            continue
+        cells = []
+        for m in metrics:
+            delta = f"{(n[m] - b[m]) / b[m] * 100:+.1f}%" if b[m] else "n/a"
+            cells.append(f"{b[m]:>9} -> {n[m]:<7} {delta:>6}")
+        lines.append(f"{name:<10}" + "".join(f"{c:>24}" for c in cells))
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write synthetic projects")
+    gen.add_argument("base")
+    gen.add_argument("--projects", type=int, default=4)
+    gen.add_argument("--beads", type=int, default=2000, help="total beads across projects")
+    gen.add_argument("--dep-ratio", type=float, default=0.3)
+    gen.add_argument("--comment-ratio", type=float, default=0.2)
+    gen.add_argument("--seed", type=int, default=1)
+
+    bench = sub.add_parser("run", help="drive a workload and report latencies")
+    bench.add_argument("base", nargs="?", default=".", help="directory made by generate")
+    bench.add_argument("--url", help="benchmark a running API instead of spawning one")
+    bench.add_argument("--token", default=os.environ.get("ATOM_API_TOKEN", ""))
+    bench.add_argument("--bd", help="real bd binary (default: fake_bd.py)")
+    bench.add_argument("--latency-ms", type=float, default=30, help="fake bd per-call latency")
+    bench.add_argument("--jitter-ms", type=float, default=10)
+    bench.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                       help="extra API environment, e.g. ATOM_API_INDEX=0")
+    bench.add_argument("--mix", default=DEFAULT_MIX, help=f"op weights (default: {DEFAULT_MIX})")
+    bench.add_argument("--concurrency", type=int, default=16)
+    bench.add_argument("--duration", type=float, default=10, help="measured seconds")
+    bench.add_argument("--warmup", type=float, default=2, help="unmeasured seconds first")
+    bench.add_argument("--seed", type=int, default=1)
+    bench.add_argument("--out", help="write results JSON here")
+
+    cmp = sub.add_parser("compare", help="diff two result files")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        info = generate(Path(args.base), args.projects, args.beads, args.seed,
+                        args.dep_ratio, args.comment_ratio)
+        print(f"wrote {info['beads']} beads in {len(info['projects'])} projects to {args.base}")
+    elif args.command == "run":
+        result = run(args)
+        print(report(result))
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.out).write_text(json.dumps(result, indent=2) + "\n")
+    else:
+        base = json.loads(Path(args.base).read_text())
+        new = json.loads(Path(args.new).read_text())
+        print(compare(base, new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Negotiated response compression (zstd when available, else gzip).
+
+Pure ASGI middleware, so streamed listings are compressed chunk by chunk
+instead of buffered. Skipped for small bodies, SSE (compression buffers
+would delay events), partial/ranged responses and bodies that already have
+a Content-Encoding. Strong ETags of compressed responses get an encoding
+suffix ("abc" -> "abc-gzip") because those bytes are a different representation;
+etags.etag_matches() strips it again when comparing.
+"""
+
+import gzip
+import zlib
+
+import debug
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip only
+    zstandard = None
+
+SKIP_TYPES = ("text/event-stream", "image/", "application/zip", "application/gzip")
+ETAG_SUFFIXES = ("-zstd", "-gzip")
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick zstd or gzip from an Accept-Encoding header (q=0 means refused)."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    for coding in ("zstd", "gzip"):
+        if coding == "zstd" and zstandard is None:
+            continue
+        if offered.get(coding, offered.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def _compressor(coding: str):
+    if coding == "zstd":
+        c = zstandard.ZstdCompressor(level=3).compressobj()
+        return c.compress, lambda: c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK), c.flush
+    c = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return c.compress, lambda: c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+
+def compress(data: bytes, coding: str) -> bytes:
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def strip_etag_suffix(etag: str) -> str:
+    for suffix in ETAG_SUFFIXES:
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        coding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if coding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        state = {"mode": None}  # None (undecided) | "identity" | "whole" | "stream"
+        stream = None
+
+        async def wrapped(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or state["mode"] == "identity":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if state["mode"] is None:
+                state["mode"] = self._decide(start, body, more)
+                if state["mode"] == "identity":
+                    await send(self._tag(start, coding, compressed=False))
+                    return await send(message)
+                if state["mode"] == "stream":
+                    stream = _compressor(coding)
+                await send(self._tag(start, coding, compressed=True))
+
+            with debug.phase("compress"):
+                if state["mode"] == "whole":
+                    out = compress(body, coding)
+                else:
+                    out = stream[0](body) + (stream[1]() if more else stream[2]())
+            await send({"type": "http.response.body", "body": out, "more_body": more})
+
+        await self.app(scope, receive, wrapped)
+
+    def _decide(self, start: dict, body: bytes, more: bool) -> str:
+        headers = {k.lower(): v for k, v in start["headers"]}
+        ctype = headers.get(b"content-type", b"").decode("latin-1")
+        if (start["status"] != 200 or b"content-encoding" in headers
+                or b"content-range" in headers or any(t in ctype for t in SKIP_TYPES)):
+            return "identity"
+        if not more:
+            return "whole" if len(body) >= self.minimum_size else "identity"
+        return "stream"
+
+    @staticmethod
+    def _tag(start: dict, coding: str, compressed: bool) -> dict:
+        """Vary always; per-encoding ETag and Content-Encoding only when compressing."""
+        out = []
+        for key, value in start["headers"]:
+            k = key.lower()
+            if compressed and k == b"content-length":
+                continue
+            if (compressed and k == b"etag" and value.endswith(b'"')
+                    and not value.startswith(b"W/")):
+                value = value[:-1] + f'-{coding}"'.encode()
+            out.append((key, value))
+        out.append((b"vary", b"Accept-Encoding"))
+        if compressed:
+            out.append((b"content-encoding", coding.encode()))
+        return {**start, "headers": out}
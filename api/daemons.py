@@ -0,0 +1,181 @@
+"""Supervised per-project bd daemons (ATOM_BD_MODE=daemon).
+
+In one-shot mode every bd call is a cold start that loads the JSONL file from
+scratch. In daemon mode the API keeps one long-lived `bd daemon` per project;
+bd clients started without --no-daemon then hand their command to it over
+the project's RPC socket, skipping the load.
+
+A daemon counts as healthy while its process is alive and its socket exists.
+The health loop restarts crashed daemons with exponential backoff. A daemon
+that fails MAX_FAILURES times in a row is parked for a cooldown. Commands for
+a project without a healthy daemon take the one-shot path, so daemon mode
+can only ever be as slow as one-shot mode, never unavailable.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+import metrics
+
+# bd client errors meaning the daemon never saw the command (connect phase)
+CONNECTION_ERRORS = ("connection refused", "no such file", "daemon not running", "dial unix")
+# Errors after the command was sent: the daemon is suspect, but it may have
+# applied the command, so it must not be re-run
+LOST_ERRORS = ("broken pipe", "connection reset")
+
+
+def is_connection_error(stderr: str) -> bool:
+    text = stderr.lower()
+    return any(marker in text for marker in CONNECTION_ERRORS)
+
+
+def is_lost_connection(stderr: str) -> bool:
+    text = stderr.lower()
+    return any(marker in text for marker in LOST_ERRORS)
+
+
+class ProjectDaemon:
+    """One supervised bd daemon process."""
+
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self.proc: asyncio.subprocess.Process | None = None
+        self.state = "stopped"  # stopped | starting | healthy | unhealthy | failed
+        self.restarts = 0
+        self.failures = 0       # consecutive failed starts / crashes
+        self.retry_at = 0.0
+        self.last_error = ""
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "pid": self.proc.pid if self.proc else None,
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class DaemonSupervisor:
+    """Starts, health-checks and restarts one bd daemon per project."""
+
+    MAX_FAILURES = 3
+
+    def __init__(self, bd: str, args: list[str], socket: str = ".beads/bd.sock",
+                 startup_timeout: float = 5, health_interval: float = 5,
+                 cooldown: float = 60):
+        self.bd = bd
+        self.args = args
+        self.socket = socket
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self.cooldown = cooldown
+        self._daemons: dict[str, ProjectDaemon] = {}
+        self._task: asyncio.Task | None = None
+
+    async def start(self, project_paths: list[str]) -> None:
+        for path in project_paths:
+            if (Path(path) / ".beads").is_dir():
+                self._daemons[path] = ProjectDaemon(path)
+        await asyncio.gather(*(self._spawn(d) for d in self._daemons.values()))
+        self._task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for d in self._daemons.values():
+            await self._terminate(d)
+            d.state = "stopped"
+
+    def available(self, cwd: str | None) -> bool:
+        d = self._daemons.get(cwd or "")
+        return d is not None and d.state == "healthy"
+
+    def mark_unhealthy(self, cwd: str, reason: str) -> None:
+        """A client couldn't reach the daemon; the health loop will restart it."""
+        d = self._daemons.get(cwd)
+        if d is not None and d.state == "healthy":
+            d.state = "unhealthy"
+            d.last_error = reason[:200]
+
+    # ---- Lifecycle ----
+
+    def _socket_path(self, d: ProjectDaemon) -> Path:
+        return Path(d.cwd) / self.socket
+
+    def _alive(self, d: ProjectDaemon) -> bool:
+        return d.proc is not None and d.proc.returncode is None and self._socket_path(d).exists()
+
+    async def _spawn(self, d: ProjectDaemon) -> None:
+        await self._terminate(d)
+        d.state = "starting"
+        # A socket left by a dead daemon would pass the readiness check
+        self._socket_path(d).unlink(missing_ok=True)
+        try:
+            d.proc = await asyncio.create_subprocess_exec(
+                self.bd, *self.args, cwd=d.cwd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            self._failed(d, f"spawn failed: {e}")
+            return
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if d.proc.returncode is not None:
+                break
+            if self._socket_path(d).exists():
+                d.state = "healthy"
+                d.failures = 0
+                return
+            await asyncio.sleep(0.05)
+        reason = (f"exited {d.proc.returncode}" if d.proc.returncode is not None
+                  else "socket did not appear")
+        await self._terminate(d)
+        self._failed(d, reason)
+
+    def _failed(self, d: ProjectDaemon, reason: str) -> None:
+        d.failures += 1
+        d.last_error = reason
+        metrics.BD_DAEMON_FAILURES.inc(project=Path(d.cwd).name)
+        if d.failures >= self.MAX_FAILURES:
+            d.state = "failed"
+            d.retry_at = time.monotonic() + self.cooldown
+        else:
+            d.state = "unhealthy"
+            d.retry_at = time.monotonic() + min(self.cooldown, 2 ** d.failures)
+
+    async def _terminate(self, d: ProjectDaemon) -> None:
+        proc, d.proc = d.proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        proc.terminate()
+        try:
+            await asyncio.wait_for(proc.wait(), 5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+
+    async def _check(self, d: ProjectDaemon) -> None:
+        if d.state == "healthy" and self._alive(d):
+            return
+        if d.state == "healthy":
+            self._failed(d, "daemon exited" if d.proc and d.proc.returncode is not None
+                         else "socket missing")
+        if time.monotonic() < d.retry_at:
+            return
+        if d.state == "failed":
+            d.failures = 0  # cooldown over: a fresh round of attempts
+        d.restarts += 1
+        await self._spawn(d)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for d in list(self._daemons.values()):
+                await self._check(d)
+
+    def stats(self) -> dict:
+        return {cwd: d.snapshot() for cwd, d in self._daemons.items()}
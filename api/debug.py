@@ -0,0 +1,135 @@
+"""Production diagnostics: per-request phase timings, slow-request log, profiler.
+
+Every request gets a RequestTimer in a contextvar; instrumented code wraps its
+work in `with debug.phase("name"):` and the time lands on whichever request
+caused it, even across asyncio.to_thread. Requests slower than the threshold
+are kept in a ring buffer (GET /api/v1/debug/slow) and written to stderr as one
+JSON line each.
+
+Phases: auth, project (resolution), index (JSONL reload), bd_queue
+(admission wait), bd_spawn, bd_run, json_decode, serialize, compress. Writes
+are timed on the request whose arrival started the group-commit flush.
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+import encoding
+
+
+class RequestTimer:
+    __slots__ = ("phases",)
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_ms(self) -> dict[str, float]:
+        return {name: round(s * 1000, 3) for name, s in self.phases.items()}
+
+
+_timer: contextvars.ContextVar[RequestTimer | None] = contextvars.ContextVar(
+    "atom_request_timer", default=None)
+
+
+def start() -> RequestTimer:
+    timer = RequestTimer()
+    _timer.set(timer)
+    return timer
+
+
+@contextmanager
+def phase(name: str):
+    """Charge the enclosed time to the current request's `name` phase."""
+    timer = _timer.get()
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - t0)
+
+
+class TimedJSONResponse(JSONResponse):
+    """Default response class: fast encoding (encoding.dumps), timed as serialize."""
+
+    def render(self, content) -> bytes:
+        with phase("serialize"):
+            return encoding.dumps(content)
+
+
+class SlowLog:
+    """Ring buffer of requests slower than threshold_ms (0 disables)."""
+
+    def __init__(self, threshold_ms: float = 1000, size: int = 200, stream=None):
+        self.threshold_ms = threshold_ms
+        self.entries: deque[dict] = deque(maxlen=size)
+        self.stream = stream
+
+    def maybe_record(self, method: str, path: str, route: str, status: int,
+                     seconds: float, timer: RequestTimer, **extra) -> dict | None:
+        total_ms = seconds * 1000
+        if not self.threshold_ms or total_ms < self.threshold_ms:
+            return None
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "total_ms": round(total_ms, 3),
+            "phases": timer.as_ms(),
+            **extra,
+        }
+        self.entries.append(entry)
+        print(json.dumps({"slow_request": entry}), file=self.stream or sys.stderr, flush=True)
+        return entry
+
+    def recent(self, limit: int = 50) -> list[dict]:
+        return list(self.entries)[::-1][:limit]
+
+
+class Profiler:
+    """cProfile over the event-loop thread for a fixed window, one at a time."""
+
+    SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+    def __init__(self, max_seconds: float = 60):
+        self.max_seconds = max_seconds
+        self._running = False
+
+    async def run(self, seconds: float, sort: str = "cumulative", limit: int = 40) -> str:
+        if self._running:
+            raise HTTPException(409, detail="a profile is already running")
+        if sort not in self.SORT_KEYS:
+            raise HTTPException(400, detail=f"sort must be one of {', '.join(self.SORT_KEYS)}")
+        seconds = min(seconds, self.max_seconds)
+        self._running = True
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+        finally:
+            self._running = False
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return f"# {seconds:g}s window, event-loop thread only, sorted by {sort}\n" + out.getvalue()
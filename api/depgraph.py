@@ -0,0 +1,287 @@
+"""Portfolio-wide dependency graph, maintained from index ChangeSets.
+
+Edges come from each bead's `dependencies` array; only blocking edge types
+count towards readiness. Bead IDs carry their project prefix, so one graph
+spans every registered project and cross-project blockers resolve naturally.
+
+Whole-graph answers (ready set, chain depths, cycles, unblock impact) are
+computed lazily and cached per graph version, so queries between changes
+cost a dict lookup.
+"""
+
+import threading
+from collections import defaultdict, deque
+
+import beads_index
+
+BLOCKING_TYPES = {"blocks"}
+RESOLVED_STATUSES = {"closed", "tombstone"}
+
+
+class DepGraph:
+    """Blocking edges and bead status for every indexed bead."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.blockers: dict[str, set[str]] = defaultdict(set)    # id -> what it waits on
+        self.dependents: dict[str, set[str]] = defaultdict(set)  # id -> what waits on it
+        self.beads: dict[str, dict] = {}
+        self.project_of: dict[str, str] = {}                     # id -> project path
+        self.version = 0
+        self._ready_cache: tuple[int, list[str]] | None = None
+        self._cache: dict[str, tuple[int, object]] = {}
+
+    # ---- Maintenance ----
+
+    def apply(self, changes: beads_index.ChangeSet) -> None:
+        """Fold one project's ChangeSet into the graph."""
+        if not changes:
+            return
+        with self._lock:
+            for bead_id in changes.removed:
+                self._drop(bead_id)
+            for bead_id, (_, bead) in changes.updated.items():
+                self._drop(bead_id)
+                self._add(bead_id, bead, changes.project_path)
+            for bead_id, bead in changes.added.items():
+                self._drop(bead_id)  # first load of a project may re-add known IDs
+                self._add(bead_id, bead, changes.project_path)
+            self.version += 1
+
+    def _add(self, bead_id: str, bead: dict, project_path: str) -> None:
+        self.beads[bead_id] = bead
+        self.project_of[bead_id] = project_path
+        for dep in bead.get("dependencies") or []:
+            if dep.get("type", "blocks") not in BLOCKING_TYPES:
+                continue
+            target = dep.get("depends_on_id")
+            if target and target != bead_id:
+                self.blockers[bead_id].add(target)
+                self.dependents[target].add(bead_id)
+
+    def _drop(self, bead_id: str) -> None:
+        self.beads.pop(bead_id, None)
+        self.project_of.pop(bead_id, None)
+        for target in self.blockers.pop(bead_id, ()):
+            waiting = self.dependents.get(target)
+            if waiting is not None:
+                waiting.discard(bead_id)
+                if not waiting:
+                    del self.dependents[target]
+
+    # ---- Queries ----
+
+    def lookup(self, bead_id: str) -> tuple[dict | None, str | None]:
+        """(bead, project path) for one ID, or (None, None) if not in the graph."""
+        with self._lock:
+            return self.beads.get(bead_id), self.project_of.get(bead_id)
+
+    def ids_in(self, project_paths: set[str]) -> set[str]:
+        """IDs of every bead belonging to the given project directories."""
+        with self._lock:
+            return {i for i, p in self.project_of.items() if p in project_paths}
+
+    def is_resolved(self, bead_id: str) -> bool:
+        """A blocker is resolved once closed; unknown IDs can't block."""
+        bead = self.beads.get(bead_id)
+        return bead is None or bead.get("status") in RESOLVED_STATUSES
+
+    def open_blockers(self, bead_id: str) -> list[str]:
+        with self._lock:
+            return sorted(b for b in self.blockers.get(bead_id, ()) if not self.is_resolved(b))
+
+    def ready_ids(self) -> list[str]:
+        """Open beads with no unresolved blockers, in listing order.
+
+        Cached per graph version, so repeated polls between changes are free.
+        """
+        with self._lock:
+            return self._ready()
+
+    def ready_in(self, project_path: str) -> list[dict]:
+        """Ready beads of one project, in listing order, as one consistent snapshot."""
+        with self._lock:
+            return [self.beads[i] for i in self._ready() if self.project_of.get(i) == project_path]
+
+    def _ready(self) -> list[str]:
+        """ready_ids(); caller holds the lock."""
+        cached = self._ready_cache
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        ready = [
+            bead_id for bead_id, bead in self.beads.items()
+            if bead.get("status") == "open"
+            and all(self.is_resolved(b) for b in self.blockers.get(bead_id, ()))
+        ]
+        ready.sort(key=lambda i: beads_index.sort_key(self.beads[i]))
+        self._ready_cache = (self.version, ready)
+        return ready
+
+    def _cached(self, name: str, compute):
+        """Per-version memo for whole-graph computations; caller holds the lock."""
+        hit = self._cache.get(name)
+        if hit is not None and hit[0] == self.version:
+            return hit[1]
+        value = compute()
+        self._cache[name] = (self.version, value)
+        return value
+
+    def _unresolved(self, ids) -> list[str]:
+        return sorted(i for i in ids if not self.is_resolved(i))
+
+    def transitive(self, bead_id: str, direction: str = "blockers",
+                   include_resolved: bool = False) -> list[tuple[str, int]]:
+        """Everything reachable along blocker (or dependent) edges, as (id, depth).
+
+        By default the walk stops at resolved beads: a closed blocker no longer
+        holds anything up, and closed dependents are no longer waiting.
+        """
+        edges = self.blockers if direction == "blockers" else self.dependents
+        with self._lock:
+            seen = {bead_id}
+            out = []
+            queue = deque([(bead_id, 0)])
+            while queue:
+                node, depth = queue.popleft()
+                for nxt in sorted(edges.get(node, ())):
+                    if nxt in seen or (not include_resolved and self.is_resolved(nxt)):
+                        continue
+                    seen.add(nxt)
+                    out.append((nxt, depth + 1))
+                    queue.append((nxt, depth + 1))
+            return out
+
+    def _chain_depths(self) -> tuple[dict[str, int], dict[str, str | None]]:
+        """Longest chain of unresolved blockers under every unresolved bead.
+
+        Iterative post-order DFS; edges that close a cycle are ignored so
+        cyclic beads still get a finite depth.
+        """
+        depth: dict[str, int] = {}
+        nxt: dict[str, str | None] = {}
+        visiting = set()
+        for root in self.beads:
+            if root in depth or self.is_resolved(root):
+                continue
+            visiting.add(root)
+            stack = [(root, iter(self._unresolved(self.blockers.get(root, ()))))]
+            while stack:
+                node, it = stack[-1]
+                for b in it:
+                    if b not in depth and b not in visiting:
+                        visiting.add(b)
+                        stack.append((b, iter(self._unresolved(self.blockers.get(b, ())))))
+                        break
+                else:
+                    stack.pop()
+                    visiting.discard(node)
+                    best, best_b = 0, None
+                    for b in self._unresolved(self.blockers.get(node, ())):
+                        if b in depth and depth[b] + 1 > best:
+                            best, best_b = depth[b] + 1, b
+                    depth[node], nxt[node] = best, best_b
+        return depth, nxt
+
+    def critical_path(self, bead_id: str | None = None, among=None) -> list[str]:
+        """Longest chain of open work ending at bead_id, blocker-first.
+
+        Without bead_id, the longest chain in the whole graph (optionally only
+        chains ending at a bead in `among`). Length in steps is len(path) - 1.
+        """
+        with self._lock:
+            depth, nxt = self._cached("chains", self._chain_depths)
+            if bead_id is None:
+                candidates = [i for i in depth if among is None or i in among]
+                if not candidates:
+                    return []
+                bead_id = max(candidates, key=lambda i: (depth[i], i))
+            elif bead_id not in depth:
+                return []
+            path = [bead_id]
+            while nxt.get(path[-1]) is not None:
+                path.append(nxt[path[-1]])
+            return path[::-1]
+
+    def _find_cycles(self) -> list[list[str]]:
+        """Strongly connected components with more than one bead (Tarjan, iterative)."""
+        index: dict[str, int] = {}
+        low: dict[str, int] = {}
+        on_stack = set()
+        stack: list[str] = []
+        cycles = []
+        counter = 0
+        for root in sorted(self.blockers):
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.blockers.get(root, ()))))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, it = work[-1]
+                for b in it:
+                    if b not in index:
+                        index[b] = low[b] = counter
+                        counter += 1
+                        stack.append(b)
+                        on_stack.add(b)
+                        work.append((b, iter(sorted(self.blockers.get(b, ())))))
+                        break
+                    if b in on_stack:
+                        low[node] = min(low[node], index[b])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1:
+                            cycles.append(sorted(component))
+        return sorted(cycles)
+
+    def cycles(self) -> list[list[str]]:
+        with self._lock:
+            return self._cached("cycles", self._find_cycles)
+
+    def _impact(self) -> dict[str, tuple[int, int]]:
+        """Per unresolved bead: (beads it alone blocks, open beads downstream)."""
+        out = {}
+        for bead_id in self.dependents:
+            if bead_id not in self.beads or self.is_resolved(bead_id):
+                continue
+            waiting = self._unresolved(self.dependents[bead_id])
+            if not waiting:
+                continue
+            direct = sum(1 for d in waiting
+                         if self._unresolved(self.blockers.get(d, ())) == [bead_id])
+            seen = {bead_id}
+            queue = deque(waiting)
+            seen.update(waiting)
+            while queue:
+                for d in self.dependents.get(queue.popleft(), ()):
+                    if d not in seen and not self.is_resolved(d):
+                        seen.add(d)
+                        queue.append(d)
+            out[bead_id] = (direct, len(seen) - 1)
+        return out
+
+    def unblock_impact(self, among=None, limit: int = 20) -> list[tuple[str, int, int]]:
+        """Unresolved beads ranked by what closing them frees up.
+
+        Returns (id, unblocks, downstream): how many beads become unblocked
+        immediately, and how many open beads sit anywhere downstream.
+        """
+        with self._lock:
+            impact = self._cached("impact", self._impact)
+            ranked = sorted(
+                ((i, d, t) for i, (d, t) in impact.items() if among is None or i in among),
+                key=lambda r: (-r[1], -r[2], r[0]))
+            return ranked[:limit] if limit else ranked
@@ -0,0 +1,60 @@
+"""Response encoding without a decode/re-encode round trip.
+
+dumps() assembles JSON bodies from the cheapest source available:
+- RawJSON: bd's stdout, forwarded as-is.
+- Indexed beads: the JSONL line they were parsed from (beads_index.raw_json).
+- Anything else: orjson when it is installed, otherwise the stdlib encoder.
+
+Routes return encoded bodies as Response objects, which also skips FastAPI's
+jsonable_encoder pass over the whole payload.
+"""
+
+import json
+
+import beads_index
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+class RawJSON:
+    """Already-serialized JSON (e.g. bd output) to embed verbatim."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes | str):
+        self.data = data.encode() if isinstance(data, str) else data
+
+
+def _default(obj):
+    if isinstance(obj, RawJSON):  # nested too deep to splice
+        return json.loads(obj.data)
+    return str(obj)
+
+
+def _plain(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+def dumps(obj, _depth: int = 0) -> bytes:
+    """Encode a response body, splicing in raw JSON wherever it is known.
+
+    Handles the shapes routes return: a bead, a list of beads, or an envelope
+    dict whose members are lists of beads ({beads: [...], projects: {...}}).
+    """
+    if isinstance(obj, RawJSON):
+        return obj.data
+    if isinstance(obj, dict):
+        raw = beads_index.raw_json(obj)
+        if raw is not None:
+            return raw
+        if _depth == 0:
+            return b"{" + b",".join(
+                _plain(str(k)) + b":" + dumps(v, 1) for k, v in obj.items()) + b"}"
+    elif isinstance(obj, list) and _depth <= 1:
+        return b"[" + b",".join(dumps(item, 2) for item in obj) + b"]"
+    return _plain(obj)
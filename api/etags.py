@@ -0,0 +1,81 @@
+"""Conditional GET support — strong ETags derived from project state.
+
+A project's read state is fully determined by its .beads/issues.jsonl (bd runs
+with --no-db), so the file's inode/mtime/size plus the request URL identify a
+response. Matching If-None-Match (or If-Modified-Since for artifacts) requests
+get 304 Not Modified before any index lookup or bd process.
+"""
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from fastapi import HTTPException, Request, Response
+
+import compression
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def file_state(path: str | Path) -> str:
+    """Cheap fingerprint of a file: inode, mtime (ns) and size."""
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return "missing"
+    return f"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def project_state(cwd: str) -> str:
+    return file_state(Path(cwd) / ".beads" / "issues.jsonl")
+
+
+def make_etag(*parts: str) -> str:
+    digest = hashlib.sha1("\0".join(parts).encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 9110 weak comparison, as required for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        # Compressed representations carry an encoding suffix (compression.py)
+        if compression.strip_etag_suffix(candidate) == etag:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str | None, mtime: float) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(mtime) <= int(since)
+
+
+def check(request: Request, response: Response, state: str,
+          last_modified: float | None = None) -> None:
+    """Raise 304 if the client's copy is current, else stamp validators on response."""
+    etag = make_etag(state, request.url.path, str(request.query_params))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        fresh = etag_matches(inm, etag)
+    else:
+        fresh = last_modified is not None and _not_modified_since(
+            request.headers.get("if-modified-since"), last_modified)
+    if fresh:
+        raise HTTPException(304, headers=headers)
+    response.headers.update(headers)
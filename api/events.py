@@ -0,0 +1,115 @@
+"""Bead change feed for GET /api/v1/events (Server-Sent Events).
+
+Index ChangeSets are turned into per-bead events — created, updated, closed,
+deleted — carrying only the fields that changed. Events get sequential IDs
+and are kept in a bounded ring buffer so clients can resume with
+Last-Event-ID; a client that fell off the buffer (or predates a restart) gets
+a `reset` event and should re-list.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+
+import beads_index
+
+# Fields that churn on every write and carry no information of their own
+IGNORED_FIELDS = {"updated_at"}
+
+
+def diff_fields(old: dict, new: dict) -> dict:
+    """{field: [old, new]} for every field whose value changed."""
+    out = {}
+    for key in old.keys() | new.keys():
+        if key in IGNORED_FIELDS:
+            continue
+        if old.get(key) != new.get(key):
+            out[key] = [old.get(key), new.get(key)]
+    return out
+
+
+def bead_events(changes: beads_index.ChangeSet) -> list[dict]:
+    """Flatten a ChangeSet into event payloads (without IDs)."""
+    out = []
+    for bead_id, bead in changes.added.items():
+        out.append({"type": "created", "id": bead_id, "bead": bead})
+    for bead_id, (old, new) in changes.updated.items():
+        fields = diff_fields(old, new)
+        if not fields:
+            continue
+        closed = new.get("status") == "closed" and old.get("status") != "closed"
+        out.append({"type": "closed" if closed else "updated", "id": bead_id, "fields": fields})
+    for bead_id in changes.removed:
+        out.append({"type": "deleted", "id": bead_id})
+    return out
+
+
+class EventFeed:
+    """Sequenced, resumable fan-out of bead events to SSE subscribers."""
+
+    def __init__(self, project_name, buffer_size: int = 1000, queue_size: int = 1000):
+        self.project_name = project_name  # fn(project_path) -> name
+        self.epoch = format(int(time.time()), "x")
+        self.seq = 0
+        self.buffer: deque[tuple[int, dict]] = deque(maxlen=buffer_size)
+        self.queue_size = queue_size
+        self.subscribers: set[asyncio.Queue] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def on_change(self, changes: beads_index.ChangeSet) -> None:
+        """Index listener — may run on a worker thread."""
+        if changes.initial or not changes or self._loop is None:
+            return
+        project = self.project_name(changes.project_path)
+        events = [{**e, "project": project} for e in bead_events(changes)]
+        if events:
+            self._loop.call_soon_threadsafe(self._publish, events)
+
+    def _publish(self, events: list[dict]) -> None:
+        for event in events:
+            self.seq += 1
+            item = (self.seq, event)
+            self.buffer.append(item)
+            for q in list(self.subscribers):
+                try:
+                    q.put_nowait(item)
+                except asyncio.QueueFull:
+                    # Too slow — cut it loose; it can resume from Last-Event-ID
+                    self.subscribers.discard(q)
+                    while not q.empty():
+                        q.get_nowait()
+                    q.put_nowait(None)
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def subscribe(self, last_event_id: str | None) -> tuple[asyncio.Queue, list, bool]:
+        """Register a subscriber; returns (queue, backlog, reset_needed)."""
+        q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(q)
+        if not last_event_id:
+            return q, [], False
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return q, [], True
+        seq = int(seq)
+        oldest = self.buffer[0][0] if self.buffer else self.seq + 1
+        if seq < oldest - 1 or seq > self.seq:
+            return q, [], True
+        return q, [item for item in self.buffer if item[0] > seq], False
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self.subscribers.discard(q)
+
+
+def format_sse(event_id: str | None, event: str, data: dict) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,214 @@
+"""Non-blocking bd execution layer.
+
+Runs bd as asyncio subprocesses so a slow command never stalls the event loop.
+Concurrency is bounded globally (through the priority admission gate) and per
+project, and writes to a project are serialized (bd --no-db rewrites the
+whole JSONL file on every mutation).
+Queue depth and wait times are tracked per project for GET /api/v1/executor.
+
+With a DaemonSupervisor attached, commands for projects with a healthy bd
+daemon are sent through it; anything else, or a command the daemon never
+received, runs one-shot.
+"""
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from fastapi import HTTPException
+
+import admission
+import daemons
+import debug
+import metrics
+from encoding import RawJSON
+
+
+class ProjectQueue:
+    """Per-project concurrency limits and counters."""
+
+    def __init__(self, max_concurrency: int):
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.write_lock = asyncio.Lock()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "wait_avg_ms": round(1000 * self.wait_total / self.completed, 2) if self.completed else 0.0,
+            "wait_max_ms": round(1000 * self.wait_max, 2),
+        }
+
+
+class BdExecutor:
+    """Bounded, asyncio-based runner for bd commands."""
+
+    def __init__(self, bd: str, base_args: list[str], max_concurrency: int = 8,
+                 per_project: int = 4, timeout: float = 30,
+                 daemons: "daemons.DaemonSupervisor | None" = None,
+                 daemon_args: list[str] | None = None,
+                 max_waiting: dict[str, int] | None = None, wait_timeout: float = 5.0):
+        self.bd = bd
+        self.base_args = base_args
+        self.daemons = daemons
+        self.daemon_args = daemon_args or []
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.per_project = per_project
+        self.gate = admission.AdmissionGate(max_concurrency, max_waiting, wait_timeout)
+        self._queues: dict[str, ProjectQueue] = defaultdict(lambda: ProjectQueue(self.per_project))
+
+    async def run(self, args: list[str], cwd: str | None = None, write: bool = False,
+                  raw: bool = False, priority: str | None = None) -> dict | list | RawJSON:
+        """Run a bd command and return parsed JSON (or raw text on failure).
+
+        With raw=True, JSON output is returned unparsed as RawJSON for
+        callers that only forward it. priority defaults to the request's
+        admission class (admission.current_priority).
+
+        Raises 503 (with Retry-After) instead of queueing past the admission
+        gate's limits.
+        """
+        q = self._queues[cwd or ""]
+        priority = priority or admission.current_priority.get()
+        q.waiting += 1
+        queued_at = time.monotonic()
+        started = False
+        try:
+            if write:
+                await q.write_lock.acquire()
+            try:
+                # The admission deadline starts once the write lock is held, so
+                # waiting behind an earlier (serialized) write is not a reason to shed
+                with debug.phase("bd_queue"):
+                    await self._admit(q, priority, time.monotonic())
+                try:
+                    waited = time.monotonic() - queued_at
+                    q.waiting -= 1
+                    q.running += 1
+                    started = True
+                    sub = metrics.bd_subcommand(args)
+                    project = Path(cwd).name if cwd else ""
+                    metrics.BD_SPAWNS.inc(subcommand=sub, project=project)
+                    spawned = time.monotonic()
+                    try:
+                        returncode, stdout, stderr = await self._exec(args, cwd)
+                    except HTTPException as e:
+                        if e.status_code == 504:
+                            metrics.BD_TIMEOUTS.inc(subcommand=sub, project=project)
+                        raise
+                    finally:
+                        duration = time.monotonic() - spawned
+                        self.gate.observe(duration)
+                        metrics.BD_DURATION.observe(duration, subcommand=sub, project=project)
+                        q.running -= 1
+                        q.completed += 1
+                        q.wait_total += waited
+                        q.wait_max = max(q.wait_max, waited)
+                finally:
+                    self.gate.release()
+                    q.slots.release()
+            finally:
+                if write:
+                    q.write_lock.release()
+        finally:
+            if not started:
+                # Rejected, or cancelled (client went away) before a slot was granted
+                q.waiting -= 1
+        if returncode != 0:
+            metrics.BD_FAILURES.inc(subcommand=sub, project=project)
+        return parse_output(returncode, stdout, stderr, subcommand=sub, raw=raw)
+
+    async def _admit(self, q: ProjectQueue, priority: str, queued_at: float) -> None:
+        """Take a per-project slot, then a global one, within the wait deadline
+        (gate.wait_timeout counted from queued_at)."""
+        remaining = self.gate.wait_timeout - (time.monotonic() - queued_at)
+        try:
+            await asyncio.wait_for(q.slots.acquire(), max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise self.gate.reject(priority, "project busy")
+        try:
+            remaining = self.gate.wait_timeout - (time.monotonic() - queued_at)
+            await self.gate.acquire(priority, timeout=max(remaining, 0))
+        except BaseException:
+            q.slots.release()
+            raise
+
+    async def _exec(self, args: list[str], cwd: str | None) -> tuple[int, str, str]:
+        if self.daemons is not None and self.daemons.available(cwd):
+            result = await self._spawn([self.bd] + self.daemon_args + args, cwd)
+            if result[0] == 0 or not daemons.is_connection_error(result[2]):
+                metrics.BD_ROUTED.inc(path="daemon")
+                if result[0] != 0 and daemons.is_lost_connection(result[2]):
+                    # Dropped mid-command: may have been applied, so surface the error
+                    self.daemons.mark_unhealthy(cwd, result[2])
+                return result
+            # The daemon never saw the command, so running it again is safe
+            self.daemons.mark_unhealthy(cwd, result[2])
+        metrics.BD_ROUTED.inc(path="oneshot")
+        return await self._spawn([self.bd] + self.base_args + args, cwd)
+
+    async def _spawn(self, cmd: list[str], cwd: str | None) -> tuple[int, str, str]:
+        try:
+            with debug.phase("bd_spawn"):
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    cwd=cwd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+        except FileNotFoundError:
+            raise HTTPException(502, detail="bd binary not found")
+        try:
+            with debug.phase("bd_run"):
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise HTTPException(504, detail="bd command timed out")
+        return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_project": self.per_project,
+            "in_flight": sum(q.running for q in self._queues.values()),
+            "waiting": sum(q.waiting for q in self._queues.values()),
+            "projects": {cwd: q.snapshot() for cwd, q in self._queues.items()},
+            "mode": "daemon" if self.daemons is not None else "oneshot",
+            "daemons": self.daemons.stats() if self.daemons is not None else {},
+            "admission": self.gate.stats(),
+        }
+
+
+def parse_output(returncode: int, stdout: str, stderr: str, subcommand: str = "",
+                 raw: bool = False) -> dict | list | RawJSON:
+    """Map a finished bd invocation to JSON or an HTTPException."""
+    if returncode != 0:
+        stderr = stderr.strip()
+        # bd returns 1 for "not found" — map to 404
+        if "not found" in stderr.lower() or "no issue" in stderr.lower():
+            raise HTTPException(404, detail=stderr or "not found")
+        raise HTTPException(502, detail=stderr or f"bd exited {returncode}")
+
+    stdout = stdout.strip()
+    if not stdout:
+        return {}
+
+    if raw and stdout[0] in "[{":
+        return RawJSON(stdout)
+    try:
+        with debug.phase("json_decode"):
+            return json.loads(stdout)
+    except json.JSONDecodeError:
+        metrics.BD_JSON_FAILURES.inc(subcommand=subcommand)
+        # Some bd commands return plain text even with --json
+        return {"output": stdout}
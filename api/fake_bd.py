@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Stand-in for bd, for benchmarks: same commands, JSON output and JSONL file.
+
+Implements the subset the API uses (list, show, ready, create, update, close,
+comments, comments add, dep tree) against ./.beads/issues.jsonl, rewriting the
+file atomically on every mutation like `bd --no-db`. Each call sleeps
+FAKE_BD_LATENCY_MS (plus up to FAKE_BD_JITTER_MS) first, to model bd's cold
+start, so the API's own overhead can be measured separately from bd's.
+
+Usage: BD_PATH=api/fake_bd.py python3 api/main.py
+"""
+
+import fcntl
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+JSONL = Path(".beads") / "issues.jsonl"
+# Flags that take a value; everything else starting with -- is a switch
+VALUE_FLAGS = {"--actor", "--status", "--priority", "--label", "--labels", "--assignee",
+               "--type", "--limit", "--title", "--description", "--reason",
+               "--add-label", "--remove-label", "--db"}
+
+
+def parse(argv: list[str]) -> tuple[list[str], dict]:
+    positional, flags = [], {}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in VALUE_FLAGS and i + 1 < len(argv):
+            flags.setdefault(arg, []).append(argv[i + 1])
+            i += 2
+            continue
+        if arg.startswith("--"):
+            flags[arg] = [True]
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, flags
+
+
+def flag(flags: dict, name: str, default=None):
+    return flags.get(name, [default])[-1]
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def load() -> list[dict]:
+    try:
+        with open(JSONL) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def save(beads: list[dict]) -> None:
+    tmp = JSONL.with_suffix(".jsonl.tmp")
+    with open(tmp, "w") as f:
+        f.writelines(json.dumps(b, separators=(",", ":")) + "\n" for b in beads)
+    os.replace(tmp, JSONL)
+
+
+def fail(message: str) -> None:
+    print(message, file=sys.stderr)
+    sys.exit(1)
+
+
+def find(beads: list[dict], bead_id: str) -> dict:
+    for bead in beads:
+        if bead["id"] == bead_id:
+            return bead
+    fail(f"Error: no issue found matching {bead_id!r}")
+
+
+def matches(bead: dict, flags: dict) -> bool:
+    status = flag(flags, "--status")
+    if status and bead.get("status") != status:
+        return False
+    if not status and not flag(flags, "--all") and bead.get("status") in ("closed", "tombstone"):
+        return False
+    priority = flag(flags, "--priority")
+    if priority is not None and bead.get("priority") != int(priority):
+        return False
+    label = flag(flags, "--label")
+    if label and label not in (bead.get("labels") or []):
+        return False
+    assignee = flag(flags, "--assignee")
+    if assignee and bead.get("assignee") != assignee:
+        return False
+    kind = flag(flags, "--type")
+    return not kind or bead.get("issue_type", "task") == kind
+
+
+def ordered(beads: list[dict], flags: dict) -> list[dict]:
+    out = sorted(beads, key=lambda b: (b.get("priority", 99), b.get("created_at", ""), b["id"]))
+    limit = int(flag(flags, "--limit", 0))
+    return out[:limit] if limit else out
+
+
+def main(argv: list[str]) -> None:
+    latency = float(os.environ.get("FAKE_BD_LATENCY_MS", "0"))
+    jitter = float(os.environ.get("FAKE_BD_JITTER_MS", "0"))
+    if latency or jitter:
+        time.sleep((latency + random.uniform(0, jitter)) / 1000)
+
+    pos, flags = parse(argv)
+    if not pos:
+        fail("usage: fake_bd.py <command> ...")
+    cmd, args = pos[0], pos[1:]
+    actor = flag(flags, "--actor", "fake")
+
+    JSONL.parent.mkdir(exist_ok=True)
+    with open(JSONL.parent / "fake_bd.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if cmd in ("create", "update", "close", "comments") else fcntl.LOCK_SH)
+        beads = load()
+
+        if cmd == "list":
+            out = ordered([b for b in beads if matches(b, flags)], flags)
+        elif cmd == "show":
+            out = [find(beads, args[0])]
+        elif cmd == "ready":
+            by_id = {b["id"]: b for b in beads}
+            out = ordered([
+                b for b in beads if b.get("status") == "open" and matches(b, flags)
+                and all(by_id.get(d["depends_on_id"], {}).get("status", "closed") in ("closed", "tombstone")
+                        for d in b.get("dependencies") or [] if d.get("type", "blocks") == "blocks")
+            ], flags)
+        elif cmd == "dep" and args[:1] == ["tree"]:
+            root = find(beads, args[1])
+            out = [{"id": root["id"], "depth": 0}] + [
+                {"id": d["depends_on_id"], "depth": 1} for d in root.get("dependencies") or []]
+        elif cmd == "comments" and args[:1] == ["add"]:
+            bead = find(beads, args[1])
+            comments = bead.setdefault("comments", [])
+            comment = {"id": len(comments) + 1, "issue_id": bead["id"], "author": actor,
+                       "text": args[2], "created_at": now()}
+            comments.append(comment)
+            save(beads)
+            out = comment
+        elif cmd == "comments":
+            out = find(beads, args[0]).get("comments") or []
+        elif cmd == "create":
+            prefix = beads[0]["id"].rsplit("-", 1)[0] if beads else "bench"
+            bead = {"id": f"{prefix}-{os.urandom(3).hex()}", "title": args[0], "status": "open",
+                    "priority": int(flag(flags, "--priority", 2)),
+                    "issue_type": flag(flags, "--type", "task"),
+                    "created_at": now(), "updated_at": now()}
+            if flag(flags, "--description"):
+                bead["description"] = flag(flags, "--description")
+            if flag(flags, "--labels"):
+                bead["labels"] = flag(flags, "--labels").split(",")
+            if flag(flags, "--assignee"):
+                bead["assignee"] = flag(flags, "--assignee")
+            beads.append(bead)
+            save(beads)
+            out = bead
+        elif cmd in ("update", "close"):
+            out = []
+            for bead_id in args:
+                bead = find(beads, bead_id)
+                if cmd == "close":
+                    bead["status"] = "closed"
+                    bead["closed_at"] = now()
+                    if flag(flags, "--reason"):
+                        bead["close_reason"] = flag(flags, "--reason")
+                else:
+                    for name, field in (("--status", "status"), ("--title", "title"),
+                                        ("--description", "description"), ("--assignee", "assignee")):
+                        if flag(flags, name) is not None:
+                            bead[field] = flag(flags, name)
+                    if flag(flags, "--priority") is not None:
+                        bead["priority"] = int(flag(flags, "--priority"))
+                    if flag(flags, "--claim"):
+                        bead["status"], bead["assignee"] = "in_progress", actor
+                    labels = [l for l in bead.get("labels") or [] if l not in flags.get("--remove-label", [])]
+                    bead["labels"] = labels + [l for l in flags.get("--add-label", []) if l not in labels]
+                bead["updated_at"] = now()
+                out.append(bead)
+            save(beads)
+        else:
+            fail(f"fake_bd: unsupported command: {' '.join(pos)}")
+
+    print(json.dumps(out))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
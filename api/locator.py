@@ -0,0 +1,49 @@
+"""Bead ID -> owning project, so clients can omit `project` on per-bead routes.
+
+IDs seen in any loaded index map straight to their project (kept current
+from index ChangeSets). IDs not indexed yet — just created, or in a project
+whose index is off — fall back to the registered prefixes: bead IDs are
+"<prefix>-<hash>", and prefixes may themselves contain hyphens (mag-shield).
+"""
+
+import threading
+
+import beads_index
+
+
+class BeadLocator:
+    def __init__(self, project_name):
+        self.project_name = project_name  # fn(project_path) -> name
+        self._lock = threading.Lock()
+        self.ids: dict[str, str] = {}
+        self.prefixes: dict[str, str] = {}
+
+    def set_prefixes(self, projects: dict[str, dict]) -> None:
+        """Register each project's bead prefix (projects.yml `prefix`)."""
+        self.prefixes = {info["prefix"]: name for name, info in projects.items()}
+
+    def apply(self, changes: beads_index.ChangeSet) -> None:
+        if not changes:
+            return
+        name = self.project_name(changes.project_path)
+        with self._lock:
+            for bead_id in changes.removed:
+                if self.ids.get(bead_id) == name:
+                    del self.ids[bead_id]
+            for bead_id in changes.updated:
+                self.ids[bead_id] = name
+            for bead_id in changes.added:
+                self.ids[bead_id] = name
+
+    def resolve(self, bead_id: str) -> str | None:
+        """Project name owning bead_id, or None if nothing matches."""
+        name = self.ids.get(bead_id)
+        if name is not None:
+            return name
+        head = bead_id
+        while "-" in head:
+            head = head.rsplit("-", 1)[0]
+            name = self.prefixes.get(head)
+            if name is not None:
+                return name
+        return None
@@ -1,20 +1,49 @@
 """Atom API — thin REST wrapper around bd (beads CLI).
 
-Single-file FastAPI server. Every endpoint shells out to `bd` and returns JSON.
+FastAPI server. Writes shell out to `bd` and return JSON; reads are served from
+an in-memory index of each project's .beads/issues.jsonl (beads_index.py),
+falling back to `bd` when the index can't answer.
 Auth: static bearer token from ATOM_API_TOKEN env var.
 Config: projects.yml in the same directory lists registered projects.
 """
 
-import json
+import asyncio
+import heapq
+import itertools
 import os
-import subprocess
+import shlex
 import sys
+import time
+import traceback
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
 import yaml
-from fastapi import Depends, FastAPI, HTTPException, Header, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Header, Query, Request, Response
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+
+import admission
+import artifacts
+import batch
+import daemons
+import debug
+import bd_args
+import beads_index
+import compression
+import depgraph
+import encoding
+import etags
+import events
+import locator
+import metrics
+import paging
+import search
+import stats
+from beads_index import IndexUnavailable
+from executor import BdExecutor
+from watcher import Watcher
+from writes import WritePipeline
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -25,9 +54,50 @@ PROJECTS_BASE = Path(os.environ.get("PROJECTS_BASE", "/home/baron/projects"))
 BD = os.environ.get("BD_PATH", "bd")
 API_TOKEN = os.environ.get("ATOM_API_TOKEN", "")
 LISTEN_PORT = int(os.environ.get("ATOM_API_PORT", "3131"))
+# Serve reads from the in-memory JSONL index (set to 0 to always shell out)
+USE_INDEX = os.environ.get("ATOM_API_INDEX", "1") != "0"
+# Per-project deadline (s) for portfolio-wide (project=*) queries
+PROJECT_DEADLINE = float(os.environ.get("ATOM_PROJECT_DEADLINE", "5"))
+# Change feed: events kept for Last-Event-ID resume, SSE keepalive (s),
+# stat-poll interval (s) when inotify is unavailable
+EVENTS_BUFFER = int(os.environ.get("ATOM_EVENTS_BUFFER", "1000"))
+EVENTS_HEARTBEAT = float(os.environ.get("ATOM_EVENTS_HEARTBEAT", "15"))
+WATCH_POLL_INTERVAL = float(os.environ.get("ATOM_WATCH_POLL_INTERVAL", "2"))
+# bd subprocess limits: global cap, per-project cap, per-command timeout (s)
+BD_MAX_CONCURRENCY = int(os.environ.get("ATOM_BD_MAX_CONCURRENCY", "8"))
+BD_PER_PROJECT = int(os.environ.get("ATOM_BD_PER_PROJECT", "4"))
+BD_TIMEOUT = float(os.environ.get("ATOM_BD_TIMEOUT", "30"))
+# Admission control: queued bd commands allowed per priority class
+# (X-Atom-Priority: interactive|normal|batch) and max queue wait (s) before 503
+BD_QUEUE_INTERACTIVE = int(os.environ.get("ATOM_BD_QUEUE_INTERACTIVE", "64"))
+BD_QUEUE_NORMAL = int(os.environ.get("ATOM_BD_QUEUE_NORMAL", "32"))
+BD_QUEUE_BATCH = int(os.environ.get("ATOM_BD_QUEUE_BATCH", "16"))
+BD_QUEUE_TIMEOUT = float(os.environ.get("ATOM_BD_QUEUE_TIMEOUT", "5"))
+# Diagnostics: /api/v1/debug/* routes (off by default), slow-request log
+# threshold (ms, 0 = off) and ring-buffer size
+DEBUG_ENDPOINTS = os.environ.get("ATOM_DEBUG", "0") == "1"
+SLOW_REQUEST_MS = float(os.environ.get("ATOM_SLOW_REQUEST_MS", "1000"))
+SLOW_LOG_SIZE = int(os.environ.get("ATOM_SLOW_LOG_SIZE", "200"))
+# Responses at least this large (bytes) are gzip/zstd-compressed when the
+# client accepts it
+COMPRESS_MIN_BYTES = int(os.environ.get("ATOM_COMPRESS_MIN_BYTES", "1024"))
+# bd execution: "oneshot" (cold process per command) or "daemon" (supervised
+# per-project bd daemons, one-shot fallback). Daemon command line and socket
+# are configurable to track bd releases.
+BD_MODE = os.environ.get("ATOM_BD_MODE", "oneshot")
+BD_DAEMON_ARGS = shlex.split(os.environ.get("ATOM_BD_DAEMON_ARGS", "daemon --foreground"))
+BD_DAEMON_SOCKET = os.environ.get("ATOM_BD_DAEMON_SOCKET", ".beads/bd.sock")
+BD_DAEMON_HEALTH_INTERVAL = float(os.environ.get("ATOM_BD_DAEMON_HEALTH_INTERVAL", "5"))
+# Write group commit: how long to gather writes (ms) and max ops per flush
+WRITE_WINDOW_MS = float(os.environ.get("ATOM_WRITE_WINDOW_MS", "5"))
+WRITE_MAX_BATCH = int(os.environ.get("ATOM_WRITE_MAX_BATCH", "32"))
+# Writes queued per project before new ones are refused with 503
+WRITE_MAX_PENDING = int(os.environ.get("ATOM_WRITE_MAX_PENDING", "256"))
+# Memory bound (MB) for cached artifact bodies
+ARTIFACT_CACHE_MB = float(os.environ.get("ATOM_ARTIFACT_CACHE_MB", "64"))
 
 # Load project registry
-_projects_file = API_DIR / "projects.yml"
+_projects_file = Path(os.environ.get("ATOM_PROJECTS_FILE", API_DIR / "projects.yml"))
 if _projects_file.exists():
     with open(_projects_file) as f:
         _cfg = yaml.safe_load(f) or {}
@@ -42,42 +112,85 @@ for name, info in (_cfg.get("projects") or {}).items():
         "prefix": info.get("prefix", name),
     }
 
+DAEMONS = daemons.DaemonSupervisor(
+    BD, BD_DAEMON_ARGS,
+    socket=BD_DAEMON_SOCKET,
+    health_interval=BD_DAEMON_HEALTH_INTERVAL,
+) if BD_MODE == "daemon" else None
+
+EXECUTOR = BdExecutor(
+    BD, ["--no-daemon", "--no-db"],
+    max_concurrency=BD_MAX_CONCURRENCY,
+    per_project=BD_PER_PROJECT,
+    timeout=BD_TIMEOUT,
+    daemons=DAEMONS,
+    max_waiting={"interactive": BD_QUEUE_INTERACTIVE, "normal": BD_QUEUE_NORMAL,
+                 "batch": BD_QUEUE_BATCH},
+    wait_timeout=BD_QUEUE_TIMEOUT,
+)
+
+# Portfolio-wide dependency graph, kept current by index reloads
+GRAPH = depgraph.DepGraph()
+beads_index.on_change(GRAPH.apply)
+
+
+def _project_name_for_path(path: str) -> str:
+    for name, info in PROJECTS.items():
+        if info["path"] == path:
+            return name
+    return Path(path).name
+
+
+# Bead ID -> owning project for routes called without `project`
+LOCATOR = locator.BeadLocator(_project_name_for_path)
+LOCATOR.set_prefixes(PROJECTS)
+beads_index.on_change(LOCATOR.apply)
+
+# Per-bead change feed for /api/v1/events
+FEED = events.EventFeed(_project_name_for_path, buffer_size=EVENTS_BUFFER)
+beads_index.on_change(FEED.on_change)
+
+SLOW_LOG = debug.SlowLog(SLOW_REQUEST_MS, SLOW_LOG_SIZE)
+PROFILER = debug.Profiler()
+
+ARTIFACT_CACHE = artifacts.ContentCache(int(ARTIFACT_CACHE_MB * 1024 * 1024))
+
+# Full-text search over beads, comments and docs/ artifacts
+SEARCH = search.SearchIndex(_project_name_for_path)
+beads_index.on_change(SEARCH.apply)
+
+# Bead counts by status/priority/type/label/assignee for /api/v1/stats
+STATS = stats.BeadStats()
+beads_index.on_change(STATS.apply)
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _run_bd(args: list[str], cwd: str | None = None) -> dict | list | str:
-    """Run a bd command and return parsed JSON (or raw text on failure)."""
-    cmd = [BD, "--no-daemon", "--no-db"] + args
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=cwd,
-            timeout=30,
-        )
-    except FileNotFoundError:
-        raise HTTPException(502, detail="bd binary not found")
-    except subprocess.TimeoutExpired:
-        raise HTTPException(504, detail="bd command timed out")
-
-    if result.returncode != 0:
-        stderr = result.stderr.strip()
-        # bd returns 1 for "not found" — map to 404
-        if "not found" in stderr.lower() or "no issue" in stderr.lower():
-            raise HTTPException(404, detail=stderr or "not found")
-        raise HTTPException(502, detail=stderr or f"bd exited {result.returncode}")
-
-    stdout = result.stdout.strip()
-    if not stdout:
-        return {}
+async def _run_bd(args: list[str], cwd: str | None = None, write: bool = False,
+                  raw: bool = False, priority: str | None = None) -> dict | list | encoding.RawJSON:
+    """Run a bd command on the executor and return parsed JSON.
 
-    try:
-        return json.loads(stdout)
-    except json.JSONDecodeError:
-        # Some bd commands return plain text even with --json
-        return {"output": stdout}
+    raw=True skips the decode for output that is only forwarded to the client.
+    """
+    return await EXECUTOR.run(args, cwd=cwd, write=write, raw=raw, priority=priority)
+
+
+def _respond(content, response: Response) -> Response:
+    """Encode a read body directly (encoding.dumps), keeping the headers set
+    on `response` — skips jsonable_encoder and lets raw bd/JSONL bytes through."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return debug.TimedJSONResponse(content, headers=headers)
+
+
+# All mutations go through the per-project group-commit pipeline
+PIPELINE = WritePipeline(
+    lambda args, cwd, write, priority: _run_bd(args, cwd=cwd, write=write, priority=priority),
+    window=WRITE_WINDOW_MS / 1000,
+    max_batch=WRITE_MAX_BATCH,
+    max_pending=WRITE_MAX_PENDING,
+    retry_after=lambda: EXECUTOR.gate.retry_after(),
+)
 
 
 def _project_cwd(project: str | None) -> str:
@@ -88,11 +201,200 @@ def _project_cwd(project: str | None) -> str:
     if project not in PROJECTS:
         raise HTTPException(404, detail=f"unknown project: {project}")
     path = PROJECTS[project]["path"]
-    if not Path(path).is_dir():
-        raise HTTPException(404, detail=f"project directory not found: {path}")
+    with debug.phase("project"):
+        if not Path(path).is_dir():
+            raise HTTPException(404, detail=f"project directory not found: {path}")
     return path
 
 
+def _bead_project(bead_id: str, project: str | None) -> str | None:
+    """The explicit project, else the one owning bead_id (None: default)."""
+    if project is not None:
+        return project
+    owner = LOCATOR.resolve(bead_id)
+    return owner if owner in PROJECTS else None
+
+
+def _bead_cwd(bead_id: str, project: str | None) -> str:
+    return _project_cwd(_bead_project(bead_id, project))
+
+
+def _index(cwd: str) -> beads_index.ProjectIndex | None:
+    """Index for a project directory, or None when index reads are disabled."""
+    if not USE_INDEX:
+        return None
+    return beads_index.get_index(cwd)
+
+
+async def _fresh_index(cwd: str) -> beads_index.ProjectIndex | None:
+    """Like _index, but reloads a changed file off the event loop."""
+    idx = _index(cwd)
+    if idx is not None and idx.stale():
+        try:
+            with debug.phase("index"):
+                await asyncio.to_thread(idx.refresh)
+        except IndexUnavailable:
+            return None
+    return idx
+
+
+def _project_names(project: str) -> list[str]:
+    """Expand a multi-project selector: "*" or a comma-separated list."""
+    if project.strip() == "*":
+        return list(PROJECTS)
+    names = [p.strip() for p in project.split(",") if p.strip()]
+    for name in names:
+        if name not in PROJECTS:
+            raise HTTPException(404, detail=f"unknown project: {name}")
+    return names
+
+
+def _is_multi(project: str | None) -> bool:
+    return project is not None and (project.strip() == "*" or "," in project)
+
+
+async def _list_portfolio(names: list[str], limit: int, fetch=None, after: tuple | None = None,
+                          **filters) -> dict:
+    """Query several projects concurrently and merge by priority/created date.
+
+    Each project gets PROJECT_DEADLINE seconds; slow or failing projects are
+    reported under "projects" and the response is marked partial.
+    """
+    fetch = fetch or _list
+    fetch_limit = limit + 1 if limit else 0  # one extra to detect a next page
+
+    async def one(name: str) -> list:
+        cwd = _project_cwd(name)
+        beads = await asyncio.wait_for(fetch(cwd, limit=fetch_limit, after=after, **filters),
+                                       PROJECT_DEADLINE)
+        if not isinstance(beads, list):
+            beads = beads.get("issues", beads.get("beads", []))
+        return sorted(({**b, "project": name} for b in beads), key=beads_index.sort_key)
+
+    outcomes = await asyncio.gather(*(one(n) for n in names), return_exceptions=True)
+    lists = []
+    projects = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            projects[name] = {"ok": False, "error": "deadline exceeded"}
+        elif isinstance(outcome, HTTPException):
+            projects[name] = {"ok": False, "error": outcome.detail}
+        elif isinstance(outcome, Exception):
+            projects[name] = {"ok": False, "error": str(outcome)}
+        else:
+            projects[name] = {"ok": True, "count": len(outcome)}
+            lists.append(outcome)
+
+    merged = heapq.merge(*lists, key=beads_index.sort_key)
+    beads = list(itertools.islice(merged, fetch_limit)) if limit else list(merged)
+    beads, next_cursor = paging.page(beads, limit)
+    return {
+        "beads": beads,
+        "projects": projects,
+        "partial": not all(p["ok"] for p in projects.values()),
+        "next_cursor": next_cursor,
+    }
+
+
+async def _list(cwd: str, status=None, priority=None, label=None, assignee=None,
+                type=None, limit: int = 50, all: bool = False,
+                after: tuple | None = None) -> list | dict:
+    idx = await _fresh_index(cwd)
+    if idx is not None:
+        try:
+            return idx.query(status=status, priority=priority, label=label,
+                             assignee=assignee, type=type, limit=limit, all=all, after=after)
+        except IndexUnavailable:
+            pass
+    # bd neither seeks to a cursor nor lists in sort_key order — fetch
+    # everything and sort/page here, so cursors line up across pages
+    args = bd_args.list_args(status, priority, label, assignee, type, 0, all)
+    result = await _run_bd(args, cwd=cwd)
+    if not isinstance(result, list):
+        return result
+    rest = paging.after(result, after)
+    return rest[:limit] if limit else rest
+
+
+async def _show(cwd: str, bead_id: str) -> dict | list:
+    idx = await _fresh_index(cwd)
+    if idx is not None:
+        try:
+            bead = idx.get(bead_id)
+            if bead is not None:
+                return bead
+        except IndexUnavailable:
+            pass
+    # Not indexed (or a partial ID) — let bd resolve it
+    result = await _run_bd(["show", bead_id, "--json"], cwd=cwd)
+    if isinstance(result, list) and len(result) == 1:
+        return result[0]
+    return result
+
+
+async def _comments(cwd: str, bead_id: str) -> list | dict:
+    idx = await _fresh_index(cwd)
+    if idx is not None:
+        try:
+            comments = idx.comments(bead_id)
+            if comments is not None:
+                return comments
+        except IndexUnavailable:
+            pass
+    return await _run_bd(["comments", bead_id, "--json"], cwd=cwd, raw=True)
+
+
+def _portfolio_state() -> str:
+    """ETag state covering every project (for answers that span projects)."""
+    return ",".join(f"{n}={etags.project_state(info['path'])}" for n, info in PROJECTS.items())
+
+
+async def _refresh_all() -> None:
+    """Bring every registered project's index up to date (feeds GRAPH)."""
+    for info in PROJECTS.values():
+        await _fresh_index(info["path"])
+
+
+async def _ready(cwd: str, limit: int = 50, priority=None, label=None,
+                 assignee=None, type=None, after: tuple | None = None) -> list | dict:
+    """Unblocked open beads in one project, from the dependency graph."""
+    def wanted(bead: dict) -> bool:
+        return ((priority is None or bead.get("priority") == priority)
+                and (not label or label in (bead.get("labels") or []))
+                and (not assignee or bead.get("assignee") == assignee)
+                and (not type or bead.get("issue_type", "task") == type))
+
+    idx = await _fresh_index(cwd)
+    if idx is None:
+        # bd can't seek to a cursor or filter by label/type — fetch every
+        # ready bead and filter and page here
+        args = ["ready", "--json", "--limit", "0"]
+        if priority is not None:
+            args += ["--priority", str(priority)]
+        if assignee:
+            args += ["--assignee", assignee]
+        result = await _run_bd(args, cwd=cwd)
+        if not isinstance(result, list):
+            return result
+        rest = paging.after([b for b in result if isinstance(b, dict) and wanted(b)], after)
+        return rest[:limit] if limit else rest
+
+    out = []
+    for bead in GRAPH.ready_in(cwd):
+        if not wanted(bead):
+            continue
+        if after is not None and beads_index.sort_key(bead) <= after:
+            continue
+        out.append(bead)
+        if limit and len(out) >= limit:
+            break
+    return out
+
+
+async def _deps(cwd: str, bead_id: str) -> dict | list:
+    return await _run_bd(["dep", "tree", bead_id, "--json"], cwd=cwd, raw=True)
+
+
 # ---------------------------------------------------------------------------
 # Auth
 # ---------------------------------------------------------------------------
@@ -101,11 +403,12 @@ async def require_auth(authorization: Optional[str] = Header(None)):
     """Validate bearer token. Skipped when ATOM_API_TOKEN is unset (dev mode)."""
     if not API_TOKEN:
         return  # No auth required in dev mode
-    if not authorization:
-        raise HTTPException(401, detail="missing Authorization header")
-    scheme, _, token = authorization.partition(" ")
-    if scheme.lower() != "bearer" or token != API_TOKEN:
-        raise HTTPException(401, detail="invalid token")
+    with debug.phase("auth"):
+        if not authorization:
+            raise HTTPException(401, detail="missing Authorization header")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or token != API_TOKEN:
+            raise HTTPException(401, detail="invalid token")
 
 
 async def require_write_auth(authorization: Optional[str] = Header(None)):
@@ -119,11 +422,84 @@ async def require_write_auth(authorization: Optional[str] = Header(None)):
 # App
 # ---------------------------------------------------------------------------
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load every index up front, watch the JSONL files for the change feed,
+    and start bd daemons in daemon mode."""
+    FEED.bind(asyncio.get_running_loop())
+    if USE_INDEX:
+        await _refresh_all()
+
+    reloads: set[asyncio.Task] = set()  # strong refs, so tasks can't be GC'd mid-run
+
+    def reloaded(task: asyncio.Task) -> None:
+        reloads.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            exc = task.exception()
+            traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+    def changed(path: str) -> None:
+        task = asyncio.get_running_loop().create_task(_fresh_index(path))
+        reloads.add(task)
+        task.add_done_callback(reloaded)
+
+    watcher = Watcher([info["path"] for info in PROJECTS.values()], changed,
+                      poll_interval=WATCH_POLL_INTERVAL)
+    if USE_INDEX:
+        watcher.start()
+    app.state.watcher = watcher
+    if DAEMONS is not None:
+        await DAEMONS.start([info["path"] for info in PROJECTS.values()])
+    try:
+        yield
+    finally:
+        watcher.stop()
+        for task in list(reloads):
+            task.cancel()
+        await asyncio.gather(*reloads, return_exceptions=True)
+        if DAEMONS is not None:
+            await DAEMONS.stop()
+
+
 app = FastAPI(
     title="Atom API",
     version="0.1.0",
     description="Thin REST wrapper around bd (beads CLI).",
+    default_response_class=debug.TimedJSONResponse,
+    lifespan=lifespan,
 )
+# Added first so it sits innermost, inside the timing middleware
+app.add_middleware(compression.CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    """Per-route latency, status counts and in-flight gauge for /metrics,
+    plus phase timings for the slow-request log.
+
+    Also sets the admission class for any bd work this request causes
+    (X-Atom-Priority). Done here, in the outermost middleware, because a
+    contextvar set further in is not visible out here for the log.
+    """
+    priority = admission.parse_priority(request.headers.get("x-atom-priority"))
+    admission.current_priority.set(priority)
+    metrics.HTTP_IN_FLIGHT.inc()
+    timer = debug.start()
+    start = time.monotonic()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        label = route.path if route is not None else "unmatched"
+        elapsed = time.monotonic() - start
+        metrics.HTTP_LATENCY.observe(elapsed, method=request.method, route=label)
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=label, status=str(status))
+        SLOW_LOG.maybe_record(request.method, request.url.path, label, status, elapsed, timer,
+                              priority=priority)
 
 
 # ---------------------------------------------------------------------------
@@ -135,13 +511,62 @@ async def healthz():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def prometheus_metrics(_=Depends(require_auth)):
+    """Prometheus text exposition of API and bd metrics."""
+    stats = EXECUTOR.stats()
+    metrics.BD_IN_FLIGHT.set(stats["in_flight"])
+    metrics.BD_WAITING.set(stats["waiting"])
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/v1/executor")
+async def executor_stats(_=Depends(require_auth)):
+    """bd executor queue depth, in-flight count and wait times per project."""
+    return {**EXECUTOR.stats(), "writes": PIPELINE.stats(),
+            "artifact_cache": ARTIFACT_CACHE.stats()}
+
+
+# ---------------------------------------------------------------------------
+# Debug
+# ---------------------------------------------------------------------------
+
+async def require_debug(_=Depends(require_auth)):
+    """Debug routes exist only with ATOM_DEBUG=1, and always need auth."""
+    if not DEBUG_ENDPOINTS:
+        raise HTTPException(404, detail="Not Found")
+
+
+@app.get("/api/v1/debug/slow")
+async def debug_slow_requests(
+    _=Depends(require_debug),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Recent requests over ATOM_SLOW_REQUEST_MS with per-phase timings (ms), newest first."""
+    return {"threshold_ms": SLOW_LOG.threshold_ms, "requests": SLOW_LOG.recent(limit)}
+
+
+@app.post("/api/v1/debug/profile")
+async def debug_profile(
+    _=Depends(require_debug),
+    seconds: float = Query(10, gt=0, le=60),
+    sort: str = Query("cumulative", description="cumulative, tottime, calls or ncalls"),
+    limit: int = Query(40, ge=1, le=500),
+):
+    """Profile the event loop for `seconds` while serving normal traffic; returns pstats text."""
+    return PlainTextResponse(await PROFILER.run(seconds, sort, limit))
+
+
 # ---------------------------------------------------------------------------
 # Phase 1 — Read endpoints
 # ---------------------------------------------------------------------------
 
 @app.get("/api/v1/projects")
-async def list_projects(_=Depends(require_auth)):
+async def list_projects(request: Request, response: Response, _=Depends(require_auth)):
     """List registered projects and whether they have a .beads directory."""
+    etags.check(request, response, ",".join(
+        f"{name}:{(Path(info['path']) / '.beads').is_dir()}" for name, info in PROJECTS.items()
+    ))
     out = []
     for name, info in PROJECTS.items():
         beads_dir = Path(info["path"]) / ".beads"
@@ -156,8 +581,10 @@ async def list_projects(_=Depends(require_auth)):
 
 @app.get("/api/v1/beads")
 async def list_beads(
+    request: Request,
+    response: Response,
     _=Depends(require_auth),
-    project: Optional[str] = Query(None, description="Project name (default: os)"),
+    project: Optional[str] = Query(None, description="Project name (default: os), comma-separated list, or *"),
     status: Optional[str] = Query(None),
     priority: Optional[int] = Query(None),
     label: Optional[str] = Query(None),
@@ -165,64 +592,160 @@ async def list_beads(
     type: Optional[str] = Query(None),
     limit: int = Query(50, ge=0, le=500),
     all: bool = Query(False, description="Include closed beads"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor / next_cursor"),
+    format: str = Query("json", pattern="^(json|ndjson|stream)$",
+                        description="json, ndjson (one bead per line) or stream (chunked JSON array)"),
 ):
-    """List beads, optionally filtered."""
+    """List beads, optionally filtered.
+
+    Pages are `limit` beads long; when more remain the cursor for the next
+    page is returned in the X-Next-Cursor header (and a Link rel=next).
+
+    With project=* (or a comma-separated list) every selected project is
+    queried concurrently; the response is then
+    { beads, projects, partial, next_cursor } with each bead annotated with
+    its project (format=json only).
+    """
+    filters = dict(status=status, priority=priority, label=label, assignee=assignee, type=type, all=all)
+    after = paging.decode_cursor(cursor)
+    wanted = paging.parse_fields(fields)
+    if _is_multi(project):
+        if format != "json":
+            raise HTTPException(400, detail="format must be json for multi-project queries")
+        names = _project_names(project)
+        etags.check(request, response, ",".join(
+            f"{n}={etags.project_state(PROJECTS[n]['path'])}" for n in names))
+        result = await _list_portfolio(names, limit, after=after, **filters)
+        if wanted is not None:
+            result["beads"] = [paging.project(b, wanted + ["project"]) for b in result["beads"]]
+        return _respond(result, response)
+
     cwd = _project_cwd(project)
-    args = ["list", "--json"]
-    if all:
-        args.append("--all")
-    if status:
-        args += ["--status", status]
-    if priority is not None:
-        args += ["--priority", str(priority)]
-    if label:
-        args += ["--label", label]
-    if assignee:
-        args += ["--assignee", assignee]
-    if type:
-        args += ["--type", type]
-    if limit:
-        args += ["--limit", str(limit)]
-    return _run_bd(args, cwd=cwd)
+    etags.check(request, response, etags.project_state(cwd))
+    beads = await _list(cwd, limit=limit + 1 if limit else 0, after=after, **filters)
+    if not isinstance(beads, list):
+        return beads
+    beads, next_cursor = paging.page(beads, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if format != "json":
+        headers = {k: v for k, v in response.headers.items()
+                   if k in ("etag", "cache-control", "x-next-cursor", "link")}
+        if format == "ndjson":
+            return StreamingResponse(paging.ndjson(beads, wanted),
+                                     media_type="application/x-ndjson", headers=headers)
+        return StreamingResponse(paging.json_array(beads, wanted),
+                                 media_type="application/json", headers=headers)
+    return _respond([paging.project(b, wanted) for b in beads], response)
 
 
 @app.get("/api/v1/beads/{bead_id}")
 async def show_bead(
     bead_id: str,
+    request: Request,
+    response: Response,
     _=Depends(require_auth),
     project: Optional[str] = Query(None),
 ):
-    """Show details for a single bead."""
-    cwd = _project_cwd(project)
-    return _run_bd(["show", bead_id, "--json"], cwd=cwd)
+    """Show details for a single bead.
+
+    Without `project`, the bead's owning project is looked up from its ID.
+    """
+    cwd = _bead_cwd(bead_id, project)
+    etags.check(request, response, etags.project_state(cwd))
+    return _respond(await _show(cwd, bead_id), response)
 
 
 @app.get("/api/v1/beads/{bead_id}/comments")
 async def list_comments(
     bead_id: str,
+    request: Request,
+    response: Response,
     _=Depends(require_auth),
     project: Optional[str] = Query(None),
 ):
     """List comments on a bead."""
-    cwd = _project_cwd(project)
-    return _run_bd(["comments", bead_id, "--json"], cwd=cwd)
+    cwd = _bead_cwd(bead_id, project)
+    etags.check(request, response, etags.project_state(cwd))
+    return _respond(await _comments(cwd, bead_id), response)
 
 
 @app.get("/api/v1/beads/{bead_id}/deps")
 async def bead_deps(
     bead_id: str,
+    request: Request,
+    response: Response,
     _=Depends(require_auth),
     project: Optional[str] = Query(None),
 ):
-    """Show dependency tree for a bead."""
-    cwd = _project_cwd(project)
-    return _run_bd(["dep", "tree", bead_id, "--json"], cwd=cwd)
+    """Show dependency tree for a bead (via bd; see /api/v1/graph/beads/{id}
+    for the cross-project answer served from memory)."""
+    cwd = _bead_cwd(bead_id, project)
+    etags.check(request, response, etags.project_state(cwd))
+    return _respond(await _deps(cwd, bead_id), response)
+
+
+@app.get("/api/v1/ready")
+async def ready_beads(
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    project: Optional[str] = Query(None, description="Project name, comma-separated list, or * (default: all)"),
+    priority: Optional[int] = Query(None),
+    label: Optional[str] = Query(None),
+    assignee: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    limit: int = Query(50, ge=0, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor"),
+):
+    """Open beads with no open blockers, across projects.
+
+    Readiness follows `blocks` dependencies, including ones that point into
+    another project. Response shape matches list_beads with project=*.
+    """
+    names = _project_names(project or "*")
+    # Blockers may live in any project, so every project's state matters
+    etags.check(request, response, _portfolio_state())
+    await _refresh_all()
+    return _respond(await _list_portfolio(
+        names, limit, fetch=_ready, after=paging.decode_cursor(cursor),
+        priority=priority, label=label, assignee=assignee, type=type), response)
+
+
+@app.get("/api/v1/projects/{name}/artifacts")
+async def list_artifacts(
+    name: str,
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    dir: str = Query("", description="Directory relative to the project root"),
+    recursive: bool = Query(False, description="List files in all subdirectories"),
+):
+    """List readable artifacts in a project directory.
+
+    Entries are { path, name, type: file|dir, size, modified }; `path` is
+    relative to the project, so /api/v1/artifacts/<name>/<path> reads it.
+    """
+    if name not in PROJECTS:
+        raise HTTPException(404, detail=f"unknown project: {name}")
+    entries, truncated = await asyncio.to_thread(
+        artifacts.list_dir, PROJECTS[name]["path"], dir, recursive)
+    etags.check(request, response, ",".join(
+        f"{e['path']}:{e['modified']}:{e.get('size', '')}" for e in entries))
+    return {"project": name, "dir": dir, "entries": entries, "truncated": truncated}
 
 
 @app.get("/api/v1/artifacts/{path:path}")
 async def read_artifact(
     path: str,
+    request: Request,
+    response: Response,
     _=Depends(require_auth),
+    raw: bool = Query(False, description="Return the file itself (supports Range) instead of JSON"),
 ):
     """Read a markdown artifact from a project repo.
 
@@ -237,22 +760,250 @@ async def read_artifact(
     if project_name not in PROJECTS:
         raise HTTPException(404, detail=f"unknown project: {project_name}")
 
-    # Prevent path traversal
-    resolved = (Path(PROJECTS[project_name]["path"]) / file_path).resolve()
-    project_root = Path(PROJECTS[project_name]["path"]).resolve()
-    if not str(resolved).startswith(str(project_root)):
-        raise HTTPException(400, detail="path traversal not allowed")
-
-    if not resolved.is_file():
+    resolved = artifacts.resolve(PROJECTS[project_name]["path"], file_path)
+    try:
+        st = resolved.stat()
+    except OSError:
+        st = None
+    if st is None or not resolved.is_file():
         raise HTTPException(404, detail=f"file not found: {file_path}")
 
     # Only allow text files
-    suffix = resolved.suffix.lower()
-    if suffix not in {".md", ".txt", ".yml", ".yaml", ".json", ".toml"}:
-        raise HTTPException(400, detail=f"unsupported file type: {suffix}")
+    suffix = artifacts.check_suffix(resolved)
 
-    content = resolved.read_text(errors="replace")
-    return {"path": path, "content": content}
+    etags.check(request, response, etags.file_state(resolved), last_modified=st.st_mtime)
+    headers = {k: v for k, v in response.headers.items()
+               if k in ("etag", "cache-control", "last-modified")}
+    if raw:
+        return FileResponse(resolved, media_type=artifacts.MEDIA_TYPES[suffix], headers=headers,
+                            stat_result=st)
+    body = await asyncio.to_thread(
+        ARTIFACT_CACHE.get, resolved, (st.st_mtime_ns, st.st_size),
+        lambda: artifacts.encode(path, resolved))
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# ---------------------------------------------------------------------------
+# Dependency graph
+# ---------------------------------------------------------------------------
+
+async def _graph_request(request: Request, response: Response) -> None:
+    """Common preamble: graph needs the index; validate, then bring it current."""
+    if not USE_INDEX:
+        raise HTTPException(503, detail="graph queries require the bead index (ATOM_API_INDEX=1)")
+    etags.check(request, response, _portfolio_state())
+    await _refresh_all()
+
+
+def _graph_scope(project: str | None) -> set[str] | None:
+    """Bead IDs belonging to the selected projects (None = everything)."""
+    if project is None or project.strip() == "*":
+        return None
+    paths = {PROJECTS[n]["path"] for n in _project_names(project)}
+    return GRAPH.ids_in(paths)
+
+
+def _graph_ref(bead_id: str, **extra) -> dict:
+    bead, path = GRAPH.lookup(bead_id)
+    bead = bead or {}
+    return {
+        "id": bead_id,
+        "title": bead.get("title"),
+        "status": bead.get("status"),
+        "project": _project_name_for_path(path) if path else None,
+        **extra,
+    }
+
+
+def _graph_path(path: list[str]) -> dict:
+    return {"length": max(len(path) - 1, 0), "path": [_graph_ref(i) for i in path]}
+
+
+@app.get("/api/v1/graph/beads/{bead_id}")
+async def graph_bead(
+    bead_id: str,
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    all: bool = Query(False, description="Walk through closed beads too"),
+):
+    """Transitive blockers and dependents of a bead, across projects.
+
+    Each entry carries its `depth` (1 = direct). `critical_path` is the
+    longest chain of open blockers that must finish before this bead can
+    start, blocker-first.
+    """
+    await _graph_request(request, response)
+    if GRAPH.lookup(bead_id)[0] is None:
+        raise HTTPException(404, detail=f"bead not found: {bead_id}")
+    return {
+        **_graph_ref(bead_id),
+        "open_blockers": GRAPH.open_blockers(bead_id),
+        "blockers": [_graph_ref(i, depth=d) for i, d in GRAPH.transitive(bead_id, "blockers", all)],
+        "dependents": [_graph_ref(i, depth=d) for i, d in GRAPH.transitive(bead_id, "dependents", all)],
+        "critical_path": _graph_path(GRAPH.critical_path(bead_id)),
+    }
+
+
+@app.get("/api/v1/graph/critical-path")
+async def graph_critical_path(
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    project: Optional[str] = Query(None, description="Project name, comma-separated list, or * (default: all)"),
+):
+    """Longest chain of open, blocking work ending in the selected projects."""
+    await _graph_request(request, response)
+    scope = _graph_scope(project)
+    return _graph_path(await asyncio.to_thread(GRAPH.critical_path, None, scope))
+
+
+@app.get("/api/v1/graph/cycles")
+async def graph_cycles(
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    project: Optional[str] = Query(None, description="Project name, comma-separated list, or * (default: all)"),
+):
+    """Dependency cycles (beads that transitively block themselves)."""
+    await _graph_request(request, response)
+    scope = _graph_scope(project)
+    cycles = await asyncio.to_thread(GRAPH.cycles)
+    return {"cycles": [[_graph_ref(i) for i in c] for c in cycles
+                       if scope is None or scope.intersection(c)]}
+
+
+@app.get("/api/v1/graph/impact")
+async def graph_impact(
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    project: Optional[str] = Query(None, description="Project name, comma-separated list, or * (default: all)"),
+    limit: int = Query(20, ge=0, le=500),
+):
+    """Open beads ranked by how much work closing them would unblock.
+
+    `unblocks` counts beads whose last open blocker this is; `downstream`
+    counts every open bead transitively waiting on it.
+    """
+    await _graph_request(request, response)
+    scope = _graph_scope(project)
+    ranked = await asyncio.to_thread(GRAPH.unblock_impact, scope, limit)
+    return {"beads": [_graph_ref(i, unblocks=d, downstream=t) for i, d, t in ranked]}
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+@app.get("/api/v1/search")
+async def search_all(
+    _=Depends(require_auth),
+    q: str = Query(..., min_length=1, description="Search terms"),
+    project: Optional[str] = Query(None, description="Project name, comma-separated list, or * (default: all)"),
+    kind: Optional[str] = Query(None, pattern="^(bead|artifact)$"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Ranked full-text search over beads (title, description, close reason,
+    comments) and docs/**/*.md artifacts.
+
+    Bead hits carry `id`; artifact hits carry a `path` for /api/v1/artifacts.
+    """
+    if not USE_INDEX:
+        raise HTTPException(503, detail="search requires the bead index (ATOM_API_INDEX=1)")
+    names = _project_names(project or "*")
+    await _refresh_all()
+    for name in names:
+        await asyncio.to_thread(SEARCH.scan_artifacts, name, PROJECTS[name]["path"])
+    hits = SEARCH.search(q, projects=set(names), kind=kind, limit=limit)
+    return {"query": q, "hits": hits}
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+@app.get("/api/v1/stats")
+async def bead_stats(
+    request: Request,
+    response: Response,
+    _=Depends(require_auth),
+    project: Optional[str] = Query(None, description="Project name, comma-separated list, or * (default: all)"),
+):
+    """Bead counts per project and across the selection.
+
+    Each entry has total, active (not closed), high_priority, signals and
+    by_status / by_priority / by_type / by_label / by_assignee. Breakdowns
+    other than by_status count active beads only.
+    """
+    if not USE_INDEX:
+        raise HTTPException(503, detail="stats require the bead index (ATOM_API_INDEX=1)")
+    names = _project_names(project or "*")
+    etags.check(request, response, ",".join(
+        f"{n}={etags.project_state(PROJECTS[n]['path'])}" for n in names))
+    for name in names:
+        await _fresh_index(PROJECTS[name]["path"])
+    paths = [PROJECTS[n]["path"] for n in names]
+    return {
+        "projects": {n: STATS.project(p) for n, p in zip(names, paths)},
+        "portfolio": STATS.portfolio(paths),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Change feed
+# ---------------------------------------------------------------------------
+
+@app.get("/api/v1/events")
+async def bead_events(
+    request: Request,
+    _=Depends(require_auth),
+    project: Optional[str] = Query(None, description="Project name or comma-separated list (default: all)"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-Sent Events stream of bead changes.
+
+    Event types: created (full bead), updated / closed (changed fields as
+    [old, new]), deleted, and reset (resume point lost — re-list and carry on).
+    Reconnect with Last-Event-ID to resume without gaps.
+    """
+    names = set(_project_names(project)) if project else None
+    queue, backlog, reset = FEED.subscribe(last_event_id)
+
+    def render(seq: int, event: dict) -> str | None:
+        if names is not None and event["project"] not in names:
+            return None
+        return events.format_sse(FEED.event_id(seq), event["type"], event)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if reset:
+                yield events.format_sse(None, "reset", {"last_event_id": last_event_id})
+            for seq, event in backlog:
+                frame = render(seq, event)
+                if frame:
+                    yield frame
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None:
+                    break  # Dropped for falling behind
+                frame = render(*item)
+                if frame:
+                    yield frame
+        finally:
+            FEED.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -269,32 +1020,9 @@ async def create_bead(
     Body JSON: { title, description?, priority?, type?, labels?, assignee?, project? }
     """
     body = await request.json()
-    title = body.get("title")
-    if not title:
-        raise HTTPException(400, detail="title is required")
-
-    project = body.get("project")
-    cwd = _project_cwd(project)
-    actor = body.get("actor", "api")
-
-    args = ["create", title, "--json", "--actor", actor]
-    if body.get("description"):
-        args += ["--description", body["description"]]
-    if body.get("priority") is not None:
-        args += ["--priority", str(body["priority"])]
-    if body.get("type"):
-        args += ["--type", body["type"]]
-    if body.get("labels"):
-        args += ["--labels", ",".join(body["labels"])]
-    if body.get("assignee"):
-        args += ["--assignee", body["assignee"]]
-
-    result = _run_bd(args, cwd=cwd)
-    # --silent returns just the ID as text
-    if isinstance(result, dict) and "output" in result:
-        bead_id = result["output"].strip()
-        return {"id": bead_id}
-    return result
+    bd_args.create_args(body)  # validate before resolving the project
+    cwd = _project_cwd(body.get("project"))
+    return await PIPELINE.submit(cwd, {**body, "op": "create"})
 
 
 @app.patch("/api/v1/beads/{bead_id}")
@@ -309,30 +1037,8 @@ async def update_bead(
                  add_labels?, remove_labels?, project?, actor? }
     """
     body = await request.json()
-    project = body.get("project")
-    cwd = _project_cwd(project)
-    actor = body.get("actor", "api")
-
-    args = ["update", bead_id, "--json", "--actor", actor]
-
-    if body.get("status"):
-        args += ["--status", body["status"]]
-    if body.get("title"):
-        args += ["--title", body["title"]]
-    if body.get("description"):
-        args += ["--description", body["description"]]
-    if body.get("priority") is not None:
-        args += ["--priority", str(body["priority"])]
-    if body.get("assignee"):
-        args += ["--assignee", body["assignee"]]
-    if body.get("claim"):
-        args.append("--claim")
-    for label in body.get("add_labels") or []:
-        args += ["--add-label", label]
-    for label in body.get("remove_labels") or []:
-        args += ["--remove-label", label]
-
-    return _run_bd(args, cwd=cwd)
+    cwd = _bead_cwd(bead_id, body.get("project"))
+    return await PIPELINE.submit(cwd, {**body, "op": "update", "id": bead_id})
 
 
 @app.post("/api/v1/beads/{bead_id}/close")
@@ -346,16 +1052,8 @@ async def close_bead(
     Body JSON: { reason, project?, actor? }
     """
     body = await request.json()
-    reason = body.get("reason", "")
-    project = body.get("project")
-    cwd = _project_cwd(project)
-    actor = body.get("actor", "api")
-
-    args = ["close", bead_id, "--json", "--actor", actor]
-    if reason:
-        args += ["--reason", reason]
-
-    return _run_bd(args, cwd=cwd)
+    cwd = _bead_cwd(bead_id, body.get("project"))
+    return await PIPELINE.submit(cwd, {**body, "op": "close", "id": bead_id})
 
 
 @app.post("/api/v1/beads/{bead_id}/comments")
@@ -369,18 +1067,110 @@ async def add_comment(
     Body JSON: { text, project?, actor? }
     """
     body = await request.json()
-    text = body.get("text")
-    if not text:
-        raise HTTPException(400, detail="text is required")
+    bd_args.comment_args(bead_id, body)  # validate before resolving the project
+    cwd = _bead_cwd(bead_id, body.get("project"))
+    return await PIPELINE.submit(cwd, {**body, "op": "comment", "id": bead_id})
 
-    project = body.get("project")
-    cwd = _project_cwd(project)
-    actor = body.get("actor", "api")
 
-    return _run_bd(
-        ["comments", "add", bead_id, text, "--actor", actor],
-        cwd=cwd,
-    )
+# ---------------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------------
+
+async def _read_op(cwd: str, op: dict) -> dict | list:
+    """Execute a single batch read op against a project."""
+    kind = op["op"]
+    if kind == "list":
+        filters = {k: op.get(k) for k in ("status", "priority", "label", "assignee", "type")}
+        return await _list(cwd, limit=op.get("limit", 50), all=op.get("all", False), **filters)
+    if kind == "show":
+        return await _show(cwd, op["id"])
+    if kind == "comments":
+        return await _comments(cwd, op["id"])
+    return await _deps(cwd, op["id"])
+
+
+def _batch_error(exc: BaseException) -> dict:
+    """Per-op error result; anything unexpected is logged and reported as 500."""
+    if isinstance(exc, HTTPException):
+        return batch.error(exc.status_code, exc.detail)
+    traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+    return batch.error(500, "internal error")
+
+
+async def _run_batch_group(project: str | None, items: list, results: list) -> None:
+    """Run one project's ops in order; runs of writes go to the pipeline together."""
+    try:
+        cwd = _project_cwd(project)
+    except HTTPException as e:
+        for i, _op in items:
+            results[i] = batch.error(e.status_code, e.detail)
+        return
+
+    async def flush(writes: list) -> None:
+        outcomes = await PIPELINE.submit_many(cwd, [op for _, op in writes])
+        for (i, _op), outcome in zip(writes, outcomes):
+            if isinstance(outcome, BaseException):
+                results[i] = _batch_error(outcome)
+            else:
+                results[i] = batch.ok(outcome)
+
+    writes = []
+    for i, op in items:
+        if op["op"] in batch.WRITE_OPS:
+            writes.append((i, op))
+            continue
+        if writes:
+            await flush(writes)
+            writes = []
+        try:
+            results[i] = batch.ok(await _read_op(cwd, op))
+        except Exception as e:
+            results[i] = _batch_error(e)
+    if writes:
+        await flush(writes)
+
+
+@app.post("/api/v1/batch")
+async def run_batch(
+    request: Request,
+    _=Depends(require_write_auth),
+):
+    """Run an ordered list of read/write ops, possibly across projects.
+
+    Body JSON: { ops: [{ op, project?, id?, ...fields }], project?, actor? }
+    op is one of list, show, comments, deps, create, update, close, comment;
+    other fields match the corresponding single-bead endpoint. Top-level
+    project/actor are defaults for ops that omit them; per-bead ops with
+    neither go to the project owning their id.
+
+    Returns { results: [{ ok, result } | { ok, status, error }] } in op order.
+    """
+    body = await request.json()
+    ops = body.get("ops")
+    if not isinstance(ops, list) or not ops:
+        raise HTTPException(400, detail="ops must be a non-empty list")
+    if len(ops) > batch.MAX_OPS:
+        raise HTTPException(400, detail=f"at most {batch.MAX_OPS} ops per batch")
+
+    defaults = {k: body[k] for k in ("project", "actor") if body.get(k)}
+    results: list = [None] * len(ops)
+    valid = []
+    for i, op in enumerate(ops):
+        problem = batch.validate(op)
+        if problem:
+            results[i] = batch.error(400, problem)
+        else:
+            op = {**defaults, **op}
+            if op.get("id") and not op.get("project"):
+                op["project"] = _bead_project(op["id"], None)
+            valid.append((i, op))
+
+    groups = batch.group_by_project(valid)
+    await asyncio.gather(*(
+        _run_batch_group(project, items, results) for project, items in groups.items()
+    ))
+    # Results may hold unparsed bd output (encoding.RawJSON)
+    return debug.TimedJSONResponse({"results": results})
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,176 @@
+"""Minimal Prometheus text-format metrics — no client library needed.
+
+Counters, gauges and histograms keyed by label values, rendered by
+render() for GET /metrics. Everything lives in-process, so a local
+Prometheus (or curl) can scrape it directly.
+"""
+
+import math
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_labels(self.label_names, k)} {_num(v)}"
+                for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, (counts, total, n) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = 'le="' + _num(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {n}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    out = []
+    for metric in REGISTRY:
+        out += metric.header()
+        out += metric.render()
+    return "\n".join(out) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Atom API metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    "atom_http_requests_total", "HTTP requests by route and status code.",
+    ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "atom_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route"))
+HTTP_IN_FLIGHT = Gauge(
+    "atom_http_requests_in_flight", "HTTP requests currently being served.")
+
+BD_SPAWNS = Counter(
+    "atom_bd_spawns_total", "bd processes started.", ("subcommand", "project"))
+BD_DURATION = Histogram(
+    "atom_bd_duration_seconds", "bd process wall time, spawn to exit.",
+    ("subcommand", "project"))
+BD_TIMEOUTS = Counter(
+    "atom_bd_timeouts_total", "bd commands killed at the timeout (HTTP 504).",
+    ("subcommand", "project"))
+BD_FAILURES = Counter(
+    "atom_bd_failures_total", "bd commands that exited non-zero.",
+    ("subcommand", "project"))
+BD_JSON_FAILURES = Counter(
+    "atom_bd_json_parse_failures_total", "bd output that was not valid JSON.",
+    ("subcommand",))
+BD_IN_FLIGHT = Gauge(
+    "atom_bd_in_flight", "bd processes currently running.")
+BD_WAITING = Gauge(
+    "atom_bd_waiting", "bd commands queued for an executor slot.")
+
+BD_REJECTED = Counter(
+    "atom_bd_rejected_total", "bd commands refused by admission control (HTTP 503).",
+    ("priority", "reason"))
+BD_ROUTED = Counter(
+    "atom_bd_routed_total", "bd commands by execution path (daemon or oneshot).",
+    ("path",))
+BD_DAEMON_FAILURES = Counter(
+    "atom_bd_daemon_failures_total", "bd daemon crashes and failed starts.", ("project",))
+ARTIFACT_CACHE = Counter(
+    "atom_artifact_cache_total", "Artifact content cache lookups.", ("result",))
+
+
+def bd_subcommand(args: list[str]) -> str:
+    """Label for a bd invocation: 'list', 'dep_tree', 'comments_add', ..."""
+    if not args:
+        return ""
+    if args[0] in ("dep", "comments") and len(args) > 1 and args[1] in ("tree", "add"):
+        return f"{args[0]}_{args[1]}"
+    return args[0]
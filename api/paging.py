@@ -0,0 +1,85 @@
+"""Cursor pagination, field projection and streamed output for bead listings.
+
+Cursors are opaque to clients: a urlsafe-base64 JSON encoding of the last
+returned bead's sort key (priority, created_at, id). Because that order is
+total and stable, paging never skips or repeats beads when others are added
+before the cursor position.
+"""
+
+import base64
+import json
+
+from fastapi import HTTPException
+
+import beads_index
+import encoding
+
+STREAM_CHUNK = 100  # beads per chunk in streamed responses
+FORMATS = ("json", "ndjson", "stream")
+
+
+def encode_cursor(bead: dict) -> str:
+    raw = json.dumps(list(beads_index.sort_key(bead)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple | None:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not (isinstance(key, list) and len(key) == 3 and isinstance(key[0], int)
+                and isinstance(key[1], str) and isinstance(key[2], str)):
+            raise ValueError
+        return tuple(key)
+    except ValueError:
+        raise HTTPException(400, detail="invalid cursor")
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
+def project(bead: dict, fields: list[str] | None) -> dict:
+    if fields is None:
+        return bead
+    return {f: bead[f] for f in fields if f in bead}
+
+
+def page(beads: list, limit: int) -> tuple[list, str | None]:
+    """Trim a limit+1 fetch to limit and compute the next cursor, if any."""
+    if limit and len(beads) > limit:
+        beads = beads[:limit]
+        return beads, encode_cursor(beads[-1])
+    return beads, None
+
+
+def after(beads: list, key: tuple | None) -> list:
+    """Beads strictly past a cursor key (for sources that can't seek)."""
+    ordered = sorted(beads, key=beads_index.sort_key)
+    if key is None:
+        return ordered
+    return [b for b in ordered if beads_index.sort_key(b) > key]
+
+
+def _encode(bead: dict, fields: list[str] | None) -> bytes:
+    # Unprojected index beads go out as their original JSONL line
+    return encoding.dumps(project(bead, fields), 2)
+
+
+def ndjson(beads: list, fields: list[str] | None):
+    """Yield newline-delimited JSON, one bead per line, in chunks."""
+    for i in range(0, len(beads), STREAM_CHUNK):
+        yield b"".join(_encode(b, fields) + b"\n" for b in beads[i:i + STREAM_CHUNK])
+
+
+def json_array(beads: list, fields: list[str] | None):
+    """Yield a JSON array incrementally, in chunks."""
+    yield b"["
+    for i in range(0, len(beads), STREAM_CHUNK):
+        chunk = b",".join(_encode(b, fields) for b in beads[i:i + STREAM_CHUNK])
+        yield (b"," if i else b"") + chunk
+    yield b"]"
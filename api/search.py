@@ -0,0 +1,193 @@
+"""Full-text search over beads, comments and markdown artifacts.
+
+An inverted index (term -> {doc: weighted term frequency}) ranked with BM25.
+Bead documents are maintained from index ChangeSets, so only beads that
+changed are re-tokenized; artifacts (docs/**/*.md in each project) are
+re-indexed only when their mtime/size changes, checked at most once per
+ARTIFACT_SCAN_INTERVAL per project.
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import beads_index
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+ARTIFACT_DIR = "docs"
+ARTIFACT_SUFFIX = ".md"
+ARTIFACT_MAX_BYTES = 1024 * 1024
+ARTIFACT_SCAN_INTERVAL = 5.0
+
+# Field weights: a title hit outranks the same word buried in a description
+BEAD_FIELDS = (("title", 3.0), ("description", 1.0), ("close_reason", 1.0))
+COMMENT_WEIGHT = 1.0
+ARTIFACT_TITLE_WEIGHT = 2.0
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens; hyphenated words (bead IDs) also yield their parts."""
+    out = []
+    for tok in TOKEN_RE.findall(text.lower()):
+        out.append(tok)
+        if "-" in tok:
+            out += tok.split("-")
+    return out
+
+
+def _doc_terms(weighted_texts) -> dict[str, float]:
+    tf: dict[str, float] = defaultdict(float)
+    for text, weight in weighted_texts:
+        if text:
+            for tok in tokenize(text):
+                tf[tok] += weight
+    return tf
+
+
+def _artifact_title(text: str, fallback: str) -> str:
+    for line in text.splitlines():
+        if line.startswith("#"):
+            return line.lstrip("#").strip()
+    return fallback
+
+
+class SearchIndex:
+    """BM25-ranked inverted index across every project."""
+
+    def __init__(self, project_name):
+        self.project_name = project_name  # fn(project_path) -> name
+        self._lock = threading.Lock()
+        self.postings: dict[str, dict[tuple, float]] = defaultdict(dict)
+        self.doc_terms: dict[tuple, tuple[str, ...]] = {}
+        self.doc_len: dict[tuple, float] = {}
+        self.doc_meta: dict[tuple, dict] = {}
+        self.total_len = 0.0
+        self._artifact_sigs: dict[tuple, tuple] = {}
+        self._scanned_at: dict[str, float] = {}
+
+    # ---- Maintenance ----
+
+    def _remove(self, doc: tuple) -> None:
+        for term in self.doc_terms.pop(doc, ()):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(doc, 0.0)
+        self.doc_meta.pop(doc, None)
+
+    def _add(self, doc: tuple, tf: dict[str, float], meta: dict) -> None:
+        for term, weight in tf.items():
+            self.postings[term][doc] = weight
+        self.doc_terms[doc] = tuple(tf)
+        length = sum(tf.values())
+        self.doc_len[doc] = length
+        self.total_len += length
+        self.doc_meta[doc] = meta
+
+    def apply(self, changes: beads_index.ChangeSet) -> None:
+        """Index listener: re-tokenize only added/updated beads."""
+        if not changes:
+            return
+        project = self.project_name(changes.project_path)
+        with self._lock:
+            for bead_id in changes.removed:
+                self._remove(("bead", project, bead_id))
+            for bead_id, bead in list(changes.added.items()) + [
+                    (i, new) for i, (_, new) in changes.updated.items()]:
+                doc = ("bead", project, bead_id)
+                self._remove(doc)
+                if bead.get("status") in beads_index.HIDDEN_STATUSES:
+                    continue
+                texts = [(bead.get(field), w) for field, w in BEAD_FIELDS]
+                texts += [(c.get("text"), COMMENT_WEIGHT) for c in bead.get("comments") or []]
+                texts.append((bead_id, 1.0))
+                self._add(doc, _doc_terms(texts), {
+                    "kind": "bead",
+                    "project": project,
+                    "id": bead_id,
+                    "title": bead.get("title", ""),
+                    "status": bead.get("status", "open"),
+                })
+
+    def scan_artifacts(self, project: str, project_path: str, force: bool = False) -> int:
+        """Re-index changed docs/**/*.md files. Returns how many were (re)indexed."""
+        now = time.monotonic()
+        if not force and now - self._scanned_at.get(project, -math.inf) < ARTIFACT_SCAN_INTERVAL:
+            return 0
+        self._scanned_at[project] = now
+
+        root = Path(project_path)
+        seen = set()
+        updated = 0
+        for path in (root / ARTIFACT_DIR).rglob(f"*{ARTIFACT_SUFFIX}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            rel = path.relative_to(root).as_posix()
+            doc = ("artifact", project, rel)
+            seen.add(doc)
+            sig = (st.st_mtime_ns, st.st_size)
+            if self._artifact_sigs.get(doc) == sig or st.st_size > ARTIFACT_MAX_BYTES:
+                continue
+            try:
+                text = path.read_text(errors="replace")
+            except OSError:
+                continue
+            title = _artifact_title(text, path.stem)
+            tf = _doc_terms([(title, ARTIFACT_TITLE_WEIGHT), (text, 1.0)])
+            with self._lock:
+                self._remove(doc)
+                self._add(doc, tf, {"kind": "artifact", "project": project,
+                                    "path": f"{project}/{rel}", "title": title})
+            self._artifact_sigs[doc] = sig
+            updated += 1
+
+        with self._lock:
+            for doc in [d for d in self._artifact_sigs if d[1] == project and d not in seen]:
+                self._remove(doc)
+                del self._artifact_sigs[doc]
+        return updated
+
+    # ---- Queries ----
+
+    def search(self, query: str, projects: set[str] | None = None, kind: str | None = None,
+               limit: int = 20) -> list[dict]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            n = len(self.doc_len)
+            if not n:
+                return []
+            avgdl = self.total_len / n
+            scores: dict[tuple, float] = defaultdict(float)
+            matched: dict[tuple, int] = defaultdict(int)
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc, tf in docs.items():
+                    dl = self.doc_len[doc]
+                    scores[doc] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+                    matched[doc] += 1
+
+            def keep(doc):
+                meta = self.doc_meta[doc]
+                return ((projects is None or meta["project"] in projects)
+                        and (kind is None or meta["kind"] == kind))
+
+            # Docs matching every term rank ahead of partial matches
+            top = heapq.nlargest(limit, (d for d in scores if keep(d)),
+                                 key=lambda d: (matched[d], scores[d]))
+            return [{**self.doc_meta[d], "score": round(scores[d], 4)} for d in top]
@@ -0,0 +1,105 @@
+"""Per-project bead counts, maintained from index ChangeSets.
+
+Each bead's contribution (status, priority, type, labels, assignee) is
+remembered when it is counted, so an update or removal subtracts exactly what
+was added. Reading the stats never walks the beads: a project's answer and
+the portfolio total are plain counter copies.
+
+Breakdowns other than status cover active work only (not closed), which is
+what status summaries and the dashboard report on. Tombstoned beads are not
+counted at all.
+"""
+
+import threading
+from collections import Counter
+
+import beads_index
+
+DIMENSIONS = ("status", "priority", "type", "label", "assignee")
+HIGH_PRIORITY = 1   # priority <= this counts as high priority
+SIGNAL_PREFIX = "STAFF-SIGNAL:"
+
+
+def _contribution(bead: dict) -> tuple | None:
+    """(dimension, value) pairs one bead adds, or None if it isn't counted."""
+    status = bead.get("status", "open")
+    if status in beads_index.HIDDEN_STATUSES:
+        return None
+    keys = [("total", ""), ("status", status)]
+    if status in beads_index.CLOSED_STATUSES:
+        return tuple(keys)
+    keys.append(("active", ""))
+    priority = bead.get("priority")
+    if priority is not None:
+        keys.append(("priority", str(priority)))
+        if priority <= HIGH_PRIORITY:
+            keys.append(("high_priority", ""))
+    keys.append(("type", bead.get("issue_type", "task")))
+    keys += [("label", label) for label in bead.get("labels") or []]
+    if bead.get("assignee"):
+        keys.append(("assignee", bead["assignee"]))
+    if (bead.get("title") or "").startswith(SIGNAL_PREFIX):
+        keys.append(("signals", ""))
+    return tuple(keys)
+
+
+def _render(counts: Counter) -> dict:
+    out = {"total": counts[("total", "")], "active": counts[("active", "")],
+           "high_priority": counts[("high_priority", "")], "signals": counts[("signals", "")]}
+    for dim in DIMENSIONS:
+        out[f"by_{dim}"] = {}
+    for (dim, value), n in counts.items():
+        if n and dim in DIMENSIONS:
+            out[f"by_{dim}"][value] = n
+    return out
+
+
+class BeadStats:
+    """Counters per project directory plus a running portfolio total."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: dict[str, Counter] = {}
+        self.total = Counter()
+        self._counted: dict[tuple[str, str], tuple] = {}  # (project, id) -> contribution
+
+    def apply(self, changes: beads_index.ChangeSet) -> None:
+        """Fold one project's ChangeSet into the counters."""
+        if not changes:
+            return
+        project = changes.project_path
+        with self._lock:
+            counts = self.counts.setdefault(project, Counter())
+            for bead_id in changes.removed:
+                self._set(counts, project, bead_id, None)
+            for bead_id, (_, bead) in changes.updated.items():
+                self._set(counts, project, bead_id, bead)
+            for bead_id, bead in changes.added.items():
+                self._set(counts, project, bead_id, bead)
+
+    def _set(self, counts: Counter, project: str, bead_id: str, bead: dict | None) -> None:
+        old = self._counted.pop((project, bead_id), None)
+        for key in old or ():
+            counts[key] -= 1
+            self.total[key] -= 1
+        new = _contribution(bead) if bead is not None else None
+        if new is None:
+            return
+        self._counted[(project, bead_id)] = new
+        for key in new:
+            counts[key] += 1
+            self.total[key] += 1
+
+    def project(self, project_path: str) -> dict:
+        with self._lock:
+            return _render(self.counts.get(project_path, Counter()))
+
+    def portfolio(self, project_paths=None) -> dict:
+        """Totals across `project_paths` (default: every project seen)."""
+        with self._lock:
+            if project_paths is None or set(project_paths) >= set(self.counts):
+                return _render(self.total)
+            combined = Counter()
+            for path in project_paths:
+                combined.update(self.counts.get(path, Counter()))
+            return _render(combined)
@@ -0,0 +1,1068 @@
+"""Tests for the Atom API — JSONL index and read endpoints."""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import artifacts
+import admission
+import batch
+import bench
+import compression
+import daemons
+import depgraph
+import beads_index
+import encoding
+import events
+import main
+import metrics
+from executor import BdExecutor
+from watcher import Watcher
+from writes import WritePipeline
+
+
+# ---- Fixtures ----
+
+def _bead(bead_id, **kw):
+    bead = {
+        "id": bead_id,
+        "title": kw.pop("title", f"Bead {bead_id}"),
+        "status": "open",
+        "priority": 2,
+        "issue_type": "task",
+        "created_at": "2026-02-14T10:00:00Z",
+    }
+    bead.update(kw)
+    return bead
+
+
+def _write_jsonl(project_dir: Path, beads: list) -> None:
+    beads_dir = project_dir / ".beads"
+    beads_dir.mkdir(parents=True, exist_ok=True)
+    path = beads_dir / "issues.jsonl"
+    tmp = beads_dir / "issues.jsonl.tmp"
+    tmp.write_text("".join(json.dumps(b) + "\n" for b in beads))
+    os.replace(tmp, path)  # bd rewrites atomically — new inode every time
+
+
+SAMPLE = [
+    _bead("os-a", priority=1, labels=["api"], assignee="baron"),
+    _bead("os-b", priority=0, issue_type="bug", created_at="2026-02-15T10:00:00Z"),
+    _bead("os-c", status="closed", close_reason="done"),
+    _bead("os-d", status="in_progress", labels=["api", "bot"],
+          comments=[{"id": 1, "issue_id": "os-d", "author": "x", "text": "hi"}]),
+    _bead("os-e", status="tombstone"),
+]
+
+
+def _setup_projects(beads_by_project: dict) -> tempfile.TemporaryDirectory:
+    tmp = tempfile.TemporaryDirectory()
+    base = Path(tmp.name)
+    main.PROJECTS_BASE = base
+    main.PROJECTS.clear()
+    for name, beads in beads_by_project.items():
+        _write_jsonl(base / name, beads)
+        main.PROJECTS[name] = {"path": str(base / name), "prefix": name}
+    # Drop earlier tests' beads from the graph, stats, search, etc. too
+    for idx in beads_index._indexes.values():
+        gone = beads_index.ChangeSet(idx.project_path)
+        gone.removed = dict(idx.by_id)
+        for listener in beads_index._listeners:
+            listener(gone)
+    beads_index._indexes.clear()
+    return tmp
+
+
+# ---- Index ----
+
+def test_index_query_default_hides_closed():
+    with tempfile.TemporaryDirectory() as d:
+        _write_jsonl(Path(d), SAMPLE)
+        idx = beads_index.ProjectIndex(d)
+        idx.refresh()
+        ids = [b["id"] for b in idx.query()]
+        assert ids == ["os-b", "os-a", "os-d"]
+
+
+def test_index_query_filters():
+    with tempfile.TemporaryDirectory() as d:
+        _write_jsonl(Path(d), SAMPLE)
+        idx = beads_index.ProjectIndex(d)
+        idx.refresh()
+        assert [b["id"] for b in idx.query(label="api")] == ["os-a", "os-d"]
+        assert [b["id"] for b in idx.query(label="api", assignee="baron")] == ["os-a"]
+        assert [b["id"] for b in idx.query(type="bug")] == ["os-b"]
+        assert [b["id"] for b in idx.query(status="closed")] == ["os-c"]
+        assert len(idx.query(all=True)) == 4
+        assert len(idx.query(limit=2)) == 2
+
+
+def test_index_refreshes_on_change():
+    with tempfile.TemporaryDirectory() as d:
+        _write_jsonl(Path(d), SAMPLE[:1])
+        idx = beads_index.ProjectIndex(d)
+        try:
+            idx.get("os-a")
+            assert False, "expected IndexUnavailable before the first load"
+        except beads_index.IndexUnavailable:
+            pass
+        assert idx.refresh() is True
+        assert idx.get("os-b") is None
+        assert idx.refresh() is False
+        _write_jsonl(Path(d), SAMPLE)
+        # Reads serve the last load until someone refreshes (never on their own)
+        assert idx.get("os-b") is None and idx.stale()
+        assert idx.refresh() is True
+        assert idx.get("os-b")["priority"] == 0
+
+        # A failing listener doesn't keep later ones from seeing the change
+        seen = []
+
+        def broken(changes):
+            raise RuntimeError("boom")
+
+        listeners = list(beads_index._listeners)
+        beads_index._listeners[:] = [broken, seen.append]
+        try:
+            time.sleep(0.01)
+            _write_jsonl(Path(d), SAMPLE[:2])
+            assert idx.refresh() is True
+        finally:
+            beads_index._listeners[:] = listeners
+        assert len(seen) == 1 and set(seen[0].removed) == {"os-c", "os-d", "os-e"}
+
+
+def test_index_missing_file():
+    with tempfile.TemporaryDirectory() as d:
+        idx = beads_index.ProjectIndex(d)
+        try:
+            idx.query()
+            assert False, "expected IndexUnavailable"
+        except beads_index.IndexUnavailable:
+            pass
+
+
+# ---- Endpoints ----
+
+def test_list_beads_from_index():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        client = TestClient(main.app)
+        resp = client.get("/api/v1/beads", params={"label": "api"})
+        assert resp.status_code == 200
+        assert [b["id"] for b in resp.json()] == ["os-a", "os-d"]
+
+
+def test_show_bead_and_comments_from_index():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        client = TestClient(main.app)
+        assert client.get("/api/v1/beads/os-a").json()["id"] == "os-a"
+        comments = client.get("/api/v1/beads/os-d/comments").json()
+        assert comments[0]["text"] == "hi"
+
+
+def test_bead_routes_resolve_owning_project():
+    tmp = _setup_projects({"os": SAMPLE, "mag-shield": [_bead("mag-shield-x1")],
+                           "3dl": [_bead("legacy-7", title="imported")]})
+    with tmp:
+        main.LOCATOR.set_prefixes(main.PROJECTS)
+        client = TestClient(main.app)
+        # Prefix match (hyphenated prefix) before the project is even loaded
+        assert main.LOCATOR.resolve("mag-shield-x1") == "mag-shield"
+        assert client.get("/api/v1/beads/mag-shield-x1").json()["id"] == "mag-shield-x1"
+        # IDs that don't match their project's prefix are found once indexed
+        client.get("/api/v1/beads", params={"project": "3dl"})
+        assert client.get("/api/v1/beads/legacy-7").json()["title"] == "imported"
+        # Explicit project still wins; unknown IDs keep the default project
+        main.EXECUTOR = BdExecutor(_script('echo "no issue found" >&2; exit 1\n'), [])
+        assert client.get("/api/v1/beads/legacy-7", params={"project": "os"}).status_code == 404
+        assert client.get("/api/v1/beads/os-a").json()["id"] == "os-a"
+        assert main.LOCATOR.resolve("zzz-1") is None
+
+        script, log = _logging_bd('[{"id": "legacy-7"}]')
+        main.EXECUTOR = BdExecutor(script, [])
+        body = client.post("/api/v1/batch", json={"ops": [
+            {"op": "show", "id": "mag-shield-x1"}, {"op": "close", "id": "legacy-7", "reason": "r"}]}).json()
+        assert [r["ok"] for r in body["results"]] == [True, True]
+
+
+def test_conditional_get_etag():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        client = TestClient(main.app)
+        resp = client.get("/api/v1/beads")
+        etag = resp.headers["etag"]
+        again = client.get("/api/v1/beads", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        # Different query → different representation
+        other = client.get("/api/v1/beads", params={"all": "true"}, headers={"If-None-Match": etag})
+        assert other.status_code == 200
+        # Project state changes invalidate the tag
+        time.sleep(0.01)
+        _write_jsonl(Path(tmp.name) / "os", SAMPLE[:2])
+        changed = client.get("/api/v1/beads", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+
+def test_compressed_passthrough_responses():
+    many = [_bead(f"os-z{i:03d}", description="y" * 100) for i in range(40)]
+    tmp = _setup_projects({"os": many})
+    with tmp:
+        client = TestClient(main.app)
+        resp = client.get("/api/v1/beads", params={"limit": 0})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["vary"] == "Accept-Encoding"
+        etag = resp.headers["etag"]
+        assert etag.endswith('-gzip"') and len(resp.json()) == 40
+        assert client.get("/api/v1/beads", params={"limit": 0},
+                          headers={"If-None-Match": etag}).status_code == 304
+        plain = client.get("/api/v1/beads", params={"limit": 0},
+                           headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.json() == resp.json()
+        # Streamed listings are compressed chunk by chunk
+        stream = client.get("/api/v1/beads", params={"format": "ndjson", "limit": 0})
+        assert stream.headers["content-encoding"] == "gzip"
+        assert len(stream.text.splitlines()) == 40
+
+        # Indexed beads go out as their original JSONL line, byte for byte
+        line = (Path(tmp.name) / "os" / ".beads" / "issues.jsonl").read_bytes().splitlines()[0]
+        shown = client.get("/api/v1/beads/os-z000", headers={"Accept-Encoding": "identity"})
+        assert shown.content == line
+        # Too small to compress: same bytes, so the same ETag as identity
+        small = client.get("/api/v1/beads/os-z000")
+        assert "content-encoding" not in small.headers
+        assert small.headers["etag"] == shown.headers["etag"]
+        assert not small.headers["etag"].endswith('-gzip"')
+
+        # bd output that is only forwarded is never decoded
+        main.EXECUTOR = BdExecutor(_script('echo \'{"id": "os-z000", "children": []}\'\n'), [])
+        deps = client.get("/api/v1/beads/os-z000/deps", headers={"Accept-Encoding": "identity"})
+        assert deps.content == b'{"id": "os-z000", "children": []}'
+        body = client.post("/api/v1/batch", json={"ops": [
+            {"op": "deps", "id": "os-z000"}, {"op": "show", "id": "os-z001"}]}).json()
+        assert body["results"][0]["result"] == {"id": "os-z000", "children": []}
+        assert body["results"][1]["result"]["id"] == "os-z001"
+
+    assert encoding.dumps({"beads": [encoding.RawJSON('{"a":1}')], "n": 1}) == b'{"beads":[{"a":1}],"n":1}'
+    assert compression.negotiate("gzip;q=0, identity") is None
+    assert compression.negotiate("br, gzip") == "gzip"
+
+
+def test_artifact_last_modified():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        doc = Path(tmp.name) / "os" / "docs" / "vision.md"
+        doc.parent.mkdir()
+        doc.write_text("# Vision")
+        client = TestClient(main.app)
+        resp = client.get("/api/v1/artifacts/os/docs/vision.md")
+        assert resp.json()["content"] == "# Vision"
+        lm = resp.headers["last-modified"]
+        again = client.get("/api/v1/artifacts/os/docs/vision.md", headers={"If-Modified-Since": lm})
+        assert again.status_code == 304
+
+
+def test_artifact_raw_cache_and_listing():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        root = Path(tmp.name) / "os"
+        (root / "docs" / "logs").mkdir(parents=True)
+        doc = root / "docs" / "exec-log.md"
+        doc.write_text("0123456789" * 100)
+        (root / "docs" / "logs" / "day1.md").write_text("# Day 1")
+        (root / "docs" / "diagram.png").write_bytes(b"\x89PNG")
+        client = TestClient(main.app)
+
+        raw = client.get("/api/v1/artifacts/os/docs/exec-log.md",
+                         params={"raw": "true"}, headers={"Range": "bytes=10-19"})
+        assert raw.status_code == 206
+        assert raw.text == "0123456789"
+        assert raw.headers["content-type"].startswith("text/markdown")
+
+        hits = metrics.ARTIFACT_CACHE.value(result="hit")
+        for _ in range(2):
+            body = client.get("/api/v1/artifacts/os/docs/exec-log.md").json()
+            assert len(body["content"]) == 1000
+        assert metrics.ARTIFACT_CACHE.value(result="hit") == hits + 1
+        doc.write_text("changed")
+        os.utime(doc, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert client.get("/api/v1/artifacts/os/docs/exec-log.md").json()["content"] == "changed"
+        assert client.get("/api/v1/artifacts/os/../os/docs/../../x.md").status_code in (400, 404)
+
+        listing = client.get("/api/v1/projects/os/artifacts", params={"dir": "docs"}).json()
+        assert [(e["path"], e["type"]) for e in listing["entries"]] == [
+            ("docs/logs", "dir"), ("docs/exec-log.md", "file")]
+        deep = client.get("/api/v1/projects/os/artifacts", params={"recursive": "true"}).json()
+        assert {e["path"] for e in deep["entries"]} == {"docs/exec-log.md", "docs/logs/day1.md"}
+        assert client.get("/api/v1/projects/os/artifacts", params={"dir": "../.."}).status_code == 400
+
+
+def test_content_cache_evicts_lru():
+    cache = artifacts.ContentCache(max_bytes=40)
+    for name in "abcd":
+        cache.get(Path(name), (1,), lambda: b"x" * 10)
+    cache.get(Path("a"), (1,), lambda: b"unused")  # hit: a becomes most recent
+    cache.get(Path("e"), (1,), lambda: b"y" * 10)
+    assert cache.size <= 40
+    assert list(cache._entries) == ["c", "d", "a", "e"]
+    assert cache.get(Path("a"), (2,), lambda: b"new") == b"new"  # sig change misses
+
+
+def test_list_beads_portfolio():
+    other = [_bead("web-a", priority=0), _bead("web-b", priority=3)]
+    tmp = _setup_projects({"os": SAMPLE, "web": other})
+    with tmp:
+        main.PROJECTS["gone"] = {"path": str(Path(tmp.name) / "gone"), "prefix": "gone"}
+        client = TestClient(main.app)
+        body = client.get("/api/v1/beads", params={"project": "*", "limit": 4}).json()
+        assert [(b["project"], b["id"]) for b in body["beads"]] == [
+            ("web", "web-a"), ("os", "os-b"), ("os", "os-a"), ("os", "os-d"),
+        ]
+        assert body["partial"] is True
+        assert body["projects"]["web"] == {"ok": True, "count": 2}
+        assert body["projects"]["gone"]["ok"] is False
+        # Index records are not mutated by the annotation
+        assert "project" not in beads_index.get_index(main.PROJECTS["os"]["path"]).by_id["os-a"]
+
+        body = client.get("/api/v1/beads", params={"project": "web,os", "priority": 0}).json()
+        assert [b["id"] for b in body["beads"]] == ["web-a", "os-b"]
+        assert body["partial"] is False
+        assert client.get("/api/v1/beads", params={"project": "web,nope"}).status_code == 404
+        assert client.get("/api/v1/beads", params={"project": "*", "format": "ndjson"}).status_code == 400
+
+
+def _dep(bead_id, on):
+    return {"issue_id": bead_id, "depends_on_id": on, "type": "blocks"}
+
+
+def test_ready_follows_blockers_across_projects():
+    os_beads = [
+        _bead("os-a", dependencies=[_dep("os-a", "os-b")]),   # blocked by open os-b
+        _bead("os-b", priority=1),
+        _bead("os-c", dependencies=[_dep("os-c", "os-x")]),   # blocker closed
+        _bead("os-x", status="closed"),
+        _bead("os-d", dependencies=[_dep("os-d", "web-a")]),  # cross-project blocker
+    ]
+    tmp = _setup_projects({"os": os_beads, "web": [_bead("web-a")]})
+    with tmp:
+        client = TestClient(main.app)
+        body = client.get("/api/v1/ready").json()
+        assert [b["id"] for b in body["beads"]] == ["os-b", "os-c", "web-a"]
+        assert [b["id"] for b in client.get("/api/v1/ready", params={"project": "os"}).json()["beads"]] == ["os-b", "os-c"]
+
+        # Closing the cross-project blocker frees os-d without a full rebuild
+        time.sleep(0.01)
+        _write_jsonl(Path(tmp.name) / "web", [_bead("web-a", status="closed")])
+        body = client.get("/api/v1/ready", params={"project": "os"}).json()
+        assert [b["id"] for b in body["beads"]] == ["os-b", "os-c", "os-d"]
+
+
+def test_ready_and_list_page_without_index():
+    ready = [_bead(f"os-r{i}", priority=i % 2, labels=["api"] if i != 2 else []) for i in range(5)]
+    tmp = _setup_projects({"os": []})
+    with tmp:
+        script, log = _logging_bd(json.dumps(ready))
+        main.EXECUTOR = BdExecutor(script, [])
+        main.USE_INDEX = False
+        try:
+            client = TestClient(main.app)
+            seen = []
+            cursor = None
+            for _ in range(3):
+                params = {"project": "os", "label": "api", "limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                body = client.get("/api/v1/ready", params=params).json()
+                seen += [b["id"] for b in body["beads"]]
+                cursor = body["next_cursor"]
+                if not cursor:
+                    break
+            # Each Next moves on; label is applied even though bd can't filter on it
+            assert seen == ["os-r0", "os-r4", "os-r1", "os-r3"]
+            assert cursor is None
+
+            # bd lists in its own order; every page (the first too) is cut from
+            # the sort_key order, so paging neither skips nor repeats beads
+            seen, params = [], {"project": "os", "limit": 2}
+            while True:
+                resp = client.get("/api/v1/beads", params=params)
+                seen += [b["id"] for b in resp.json()]
+                if "x-next-cursor" not in resp.headers:
+                    break
+                params["cursor"] = resp.headers["x-next-cursor"]
+            assert seen == ["os-r0", "os-r2", "os-r4", "os-r1", "os-r3"]
+            # ...and bd's default --limit never cuts the listing short
+            calls = log.read_text().splitlines()
+            assert all("--limit 0" in c for c in calls)
+        finally:
+            main.USE_INDEX = True
+
+
+def test_graph_reads_are_safe_during_reloads():
+    graph = depgraph.DepGraph()
+    stop = threading.Event()
+
+    def churn():
+        n = 0
+        while not stop.is_set():
+            changes = beads_index.ChangeSet("/p")
+            changes.added = {f"c-{n}-{i}": _bead(f"c-{n}-{i}") for i in range(20)}
+            graph.apply(changes)
+            gone = beads_index.ChangeSet("/p")
+            gone.removed = changes.added
+            graph.apply(gone)
+            n += 1
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(300):
+            graph.ids_in({"/p"})
+            graph.ready_in("/p")
+    finally:
+        stop.set()
+        writer.join()
+
+
+def test_graph_queries():
+    # g1 <- g2 <- g3 (chain), g2 <- g4, web g5 <- g1 (cross-project), g6 <-> g7 cycle
+    os_beads = [
+        _bead("g1", dependencies=[_dep("g1", "g5")]),
+        _bead("g2", dependencies=[_dep("g2", "g1")]),
+        _bead("g3", dependencies=[_dep("g3", "g2")]),
+        _bead("g4", dependencies=[_dep("g4", "g2")]),
+        _bead("g6", dependencies=[_dep("g6", "g7")]),
+        _bead("g7", dependencies=[_dep("g7", "g6")]),
+    ]
+    tmp = _setup_projects({"os": os_beads, "web": [_bead("g5")]})
+    with tmp:
+        client = TestClient(main.app)
+        body = client.get("/api/v1/graph/beads/g3").json()
+        assert [(b["id"], b["depth"]) for b in body["blockers"]] == [("g2", 1), ("g1", 2), ("g5", 3)]
+        assert body["blockers"][-1]["project"] == "web"
+        assert body["critical_path"]["length"] == 3
+        assert [b["id"] for b in body["critical_path"]["path"]] == ["g5", "g1", "g2", "g3"]
+        deps = client.get("/api/v1/graph/beads/g5").json()["dependents"]
+        assert [b["id"] for b in deps] == ["g1", "g2", "g3", "g4"]
+
+        cycles = client.get("/api/v1/graph/cycles").json()["cycles"]
+        assert [[b["id"] for b in c] for c in cycles] == [["g6", "g7"]]
+        assert client.get("/api/v1/graph/cycles", params={"project": "web"}).json()["cycles"] == []
+
+        impact = client.get("/api/v1/graph/impact", params={"limit": 2}).json()["beads"]
+        # Closing g2 frees g3 and g4 at once; g5 has the most work downstream
+        assert [(b["id"], b["unblocks"], b["downstream"]) for b in impact] == [
+            ("g2", 2, 2), ("g5", 1, 4)]
+        path = client.get("/api/v1/graph/critical-path", params={"project": "os"}).json()
+        assert path["length"] == 3
+
+        time.sleep(0.01)
+        _write_jsonl(Path(tmp.name) / "web", [_bead("g5", status="closed")])
+        body = client.get("/api/v1/graph/beads/g3").json()
+        assert [b["id"] for b in body["blockers"]] == ["g2", "g1"]
+        assert body["critical_path"]["length"] == 2
+        assert client.get("/api/v1/graph/beads/nope").status_code == 404
+
+
+def test_index_changeset():
+    with tempfile.TemporaryDirectory() as d:
+        seen = []
+        _write_jsonl(Path(d), SAMPLE)
+        idx = beads_index.ProjectIndex(d)
+        beads_index._listeners.append(seen.append)
+        try:
+            idx.refresh()
+            first = idx.get("os-a")
+            _write_jsonl(Path(d), [SAMPLE[0], _bead("os-b", priority=3), _bead("os-z")])
+            idx.refresh()
+        finally:
+            beads_index._listeners.remove(seen.append)
+        changes = seen[-1]
+        assert set(changes.added) == {"os-z"}
+        assert set(changes.updated) == {"os-b"}
+        assert set(changes.removed) == {"os-c", "os-d", "os-e"}
+        assert idx.get("os-a") is first  # unchanged line was not re-parsed
+        assert idx.by_priority[3] == {"os-b"}
+        assert 0 not in idx.by_priority
+
+
+def test_list_beads_cursor_fields_and_stream():
+    many = [_bead(f"os-{i:03d}", priority=i % 3, description="x" * 50) for i in range(25)]
+    tmp = _setup_projects({"os": many})
+    with tmp:
+        client = TestClient(main.app)
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 10, "fields": "id,priority"}
+            if cursor:
+                params["cursor"] = cursor
+            resp = client.get("/api/v1/beads", params=params)
+            page = resp.json()
+            assert all(set(b) == {"id", "priority"} for b in page)
+            seen += [b["id"] for b in page]
+            cursor = resp.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        assert len(seen) == 25 and len(set(seen)) == 25
+        assert seen == [b["id"] for b in sorted(many, key=beads_index.sort_key)]
+
+        resp = client.get("/api/v1/beads", params={"format": "ndjson", "limit": 0, "fields": "id"})
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line)["id"] for line in resp.text.splitlines()] == seen
+        resp = client.get("/api/v1/beads", params={"format": "stream", "limit": 0})
+        assert len(resp.json()) == 25
+        assert client.get("/api/v1/beads", params={"cursor": "garbage!"}).status_code == 400
+
+        body = client.get("/api/v1/beads", params={"project": "*", "limit": 20}).json()
+        rest = client.get("/api/v1/beads", params={"project": "*", "cursor": body["next_cursor"]}).json()
+        assert [b["id"] for b in body["beads"] + rest["beads"]] == seen
+        assert rest["next_cursor"] is None
+
+
+# ---- Stats ----
+
+def test_stats_counts_incrementally():
+    beads = [_bead(f"os-s{i:03d}", priority=i % 3, labels=["api"] if i % 2 else [],
+                   assignee="baron" if i < 10 else None) for i in range(60)]
+    beads += [_bead("os-sc", status="closed"), _bead("os-st", status="tombstone"),
+              _bead("os-sig", title="STAFF-SIGNAL: look", priority=0)]
+    tmp = _setup_projects({"os": beads, "3dl": [_bead("3dl-s1", issue_type="bug")]})
+    with tmp:
+        client = TestClient(main.app)
+        body = client.get("/api/v1/stats").json()
+        os_stats = body["projects"]["os"]
+        assert os_stats["total"] == 62 and os_stats["active"] == 61
+        assert os_stats["by_status"] == {"open": 61, "closed": 1}
+        assert os_stats["by_priority"] == {"0": 21, "1": 20, "2": 20}
+        assert os_stats["by_label"] == {"api": 30} and os_stats["by_assignee"] == {"baron": 10}
+        assert os_stats["high_priority"] == 41 and os_stats["signals"] == 1
+        assert body["portfolio"]["total"] == 63
+        assert body["portfolio"]["by_type"] == {"task": 61, "bug": 1}
+
+        # An update moves exactly one bead between buckets
+        time.sleep(0.01)
+        beads[0] = _bead("os-s000", status="closed", priority=0)
+        _write_jsonl(Path(tmp.name) / "os", beads[:-1])
+        os_stats = client.get("/api/v1/stats", params={"project": "os"}).json()["projects"]["os"]
+        assert os_stats["by_status"] == {"open": 59, "closed": 2}
+        assert os_stats["by_priority"]["0"] == 19 and os_stats["signals"] == 0
+        assert os_stats["by_assignee"] == {"baron": 9}
+
+
+# ---- Search ----
+
+def test_search_ranks_and_updates_incrementally():
+    beads = [
+        _bead("os-s1", title="Flaky websocket reconnect", description="drops under load"),
+        _bead("os-s2", title="Docs pass", description="mention websocket once",
+              comments=[{"id": 1, "issue_id": "os-s2", "author": "x", "text": "zanzibar reconnect"}]),
+        _bead("os-s3", status="closed", close_reason="fixed by websocket backoff"),
+    ]
+    tmp = _setup_projects({"os": beads})
+    with tmp:
+        docs = Path(tmp.name) / "os" / "docs"
+        docs.mkdir()
+        (docs / "runbook.md").write_text("# Websocket runbook\n\nRestart the relay.\n")
+        client = TestClient(main.app)
+
+        hits = client.get("/api/v1/search", params={"q": "websocket reconnect"}).json()["hits"]
+        # Title match with both terms first; closed beads and artifacts still searchable
+        assert hits[0]["id"] == "os-s1"
+        assert {h.get("id") for h in hits} >= {"os-s2", "os-s3"}
+        artifact = [h for h in hits if h["kind"] == "artifact"]
+        assert artifact[0]["path"] == "os/docs/runbook.md"
+        assert artifact[0]["title"] == "Websocket runbook"
+
+        hits = client.get("/api/v1/search", params={"q": "zanzibar"}).json()["hits"]
+        assert [h["id"] for h in hits] == ["os-s2"]  # comment text is indexed
+
+        _write_jsonl(Path(tmp.name) / "os", [beads[0], _bead("os-s4", title="zanzibar rollout")])
+        time.sleep(0.01)
+        hits = client.get("/api/v1/search", params={"q": "zanzibar", "kind": "bead"}).json()["hits"]
+        assert [h["id"] for h in hits] == ["os-s4"]
+
+        (docs / "runbook.md").unlink()
+        main.SEARCH.scan_artifacts("os", str(Path(tmp.name) / "os"), force=True)
+        assert client.get("/api/v1/search", params={"q": "relay"}).json()["hits"] == []
+        assert client.get("/api/v1/search", params={"q": "x", "project": "nope"}).status_code == 404
+
+
+# ---- Change feed ----
+
+def test_event_feed_diffs_and_resume():
+    async def go():
+        feed = events.EventFeed(lambda path: "os", buffer_size=3)
+        feed.bind(asyncio.get_running_loop())
+        changes = beads_index.ChangeSet("/p")
+        changes.added["os-n"] = _bead("os-n")
+        changes.updated["os-a"] = (_bead("os-a"), _bead("os-a", status="closed", close_reason="done"))
+        changes.updated["os-b"] = (_bead("os-b"), _bead("os-b", priority=0))
+        q, backlog, reset = feed.subscribe(None)
+        feed.on_change(changes)
+        await asyncio.sleep(0)
+        got = [q.get_nowait() for _ in range(3)]
+        assert [e["type"] for _, e in got] == ["created", "closed", "updated"]
+        assert got[1][1]["fields"]["close_reason"] == [None, "done"]
+        assert got[2][1]["fields"] == {"priority": [2, 0]}
+
+        # Resume from the first event replays the rest
+        _, backlog, reset = feed.subscribe(feed.event_id(1))
+        assert [seq for seq, _ in backlog] == [2, 3] and not reset
+        # Unknown epoch or an ID older than the buffer forces a reset
+        assert feed.subscribe("0-1")[2] is True
+        feed.on_change(changes)
+        await asyncio.sleep(0)
+        assert feed.subscribe(feed.event_id(1))[2] is True
+
+        initial = beads_index.ChangeSet("/p", initial=True)
+        initial.added["os-q"] = _bead("os-q")
+        feed.on_change(initial)
+        await asyncio.sleep(0)
+        assert feed.seq == 6
+
+    asyncio.run(go())
+
+
+def test_watcher_sees_rewrite():
+    async def go(project):
+        seen = []
+        w = Watcher([project], seen.append, poll_interval=0.05, debounce=0.01)
+        w.start()
+        try:
+            await asyncio.sleep(0.1)
+            _write_jsonl(Path(project), SAMPLE[:1])
+            for _ in range(50):
+                if seen:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            w.stop()
+        return seen
+
+    with tempfile.TemporaryDirectory() as d:
+        _write_jsonl(Path(d), SAMPLE)
+        assert asyncio.run(go(d)) == [d]
+
+
+# ---- Executor ----
+
+def _script(body: str) -> str:
+    """Write an executable stand-in for bd and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".sh")
+    with os.fdopen(fd, "w") as f:
+        f.write("#!/bin/sh\n" + body)
+    os.chmod(path, 0o755)
+    return path
+
+
+def test_executor_parses_json():
+    bd = _script('echo \'[{"id": "os-a"}]\'\n')
+    ex = BdExecutor(bd, [])
+    assert asyncio.run(ex.run(["list"])) == [{"id": "os-a"}]
+    assert ex.stats()["projects"][""]["completed"] == 1
+
+
+def test_executor_maps_errors():
+    ex = BdExecutor(_script('echo "no issue found" >&2; exit 1\n'), [])
+    try:
+        asyncio.run(ex.run(["show", "x"]))
+        assert False, "expected 404"
+    except HTTPException as e:
+        assert e.status_code == 404
+    ex = BdExecutor(_script("exec sleep 5\n"), [], timeout=0.2)
+    try:
+        asyncio.run(ex.run(["list"]))
+        assert False, "expected 504"
+    except HTTPException as e:
+        assert e.status_code == 504
+
+
+_DAEMON_BD = """case "$1" in
+  daemon) touch .beads/bd.sock; exec sleep 30;;
+  --no-daemon) echo '{"via": "oneshot"}';;
+  create) echo "write unix .beads/bd.sock: broken pipe" >&2; exit 1;;
+  *) if [ -e .beads/bd.sock ]; then echo '{"via": "daemon"}'
+     else echo "dial unix .beads/bd.sock: connect: connection refused" >&2; exit 1; fi;;
+esac
+"""
+
+
+def test_executor_daemon_mode_restarts_and_falls_back():
+    bd = _script(_DAEMON_BD)
+
+    async def go(project):
+        sup = daemons.DaemonSupervisor(bd, ["daemon"], health_interval=60)
+        ex = BdExecutor(bd, ["--no-daemon"], daemons=sup)
+        await sup.start([project])
+        try:
+            assert sup.available(project)
+            assert await ex.run(["list"], cwd=project) == {"via": "daemon"}
+
+            # Daemon dies: the next command falls back, then the daemon comes back
+            sup._daemons[project].proc.kill()
+            (Path(project) / ".beads" / "bd.sock").unlink()
+            assert await ex.run(["list"], cwd=project) == {"via": "oneshot"}
+            assert not sup.available(project)
+            await sup._check(sup._daemons[project])
+            assert sup.available(project)
+            assert sup.stats()[project]["restarts"] == 1
+            assert ex.stats()["mode"] == "daemon"
+
+            # Dropped after sending: the write may have landed, so no one-shot rerun
+            try:
+                await ex.run(["create", "x"], cwd=project, write=True)
+                assert False, "expected 502"
+            except HTTPException as e:
+                assert e.status_code == 502
+            assert not sup.available(project)
+        finally:
+            await sup.stop()
+
+        # A daemon that can't start is parked; everything runs one-shot
+        broken = daemons.DaemonSupervisor(_script("exit 3\n"), ["daemon"])
+        broken.MAX_FAILURES = 1
+        ex = BdExecutor(bd, ["--no-daemon"], daemons=broken)
+        await broken.start([project])
+        try:
+            assert broken.stats()[project]["state"] == "failed"
+            assert await ex.run(["list"], cwd=project) == {"via": "oneshot"}
+        finally:
+            await broken.stop()
+
+    with tempfile.TemporaryDirectory() as d:
+        (Path(d) / ".beads").mkdir()
+        asyncio.run(go(d))
+
+
+def test_bench_fake_bd_round_trip():
+    with tempfile.TemporaryDirectory() as d:
+        info = bench.generate(Path(d), projects=2, beads=40, seed=7)
+        assert info["projects"] == ["p0", "p1"]
+        cwd = str(Path(d) / "p0")
+        ex = BdExecutor(str(Path(main.API_DIR) / "fake_bd.py"), ["--no-daemon", "--no-db"])
+
+        async def go():
+            listed = await ex.run(["list", "--json", "--all"], cwd=cwd)
+            assert len(listed) == 20
+            bead_id = listed[0]["id"]
+            await ex.run(["update", bead_id, "--json", "--priority", "4"], cwd=cwd, write=True)
+            await ex.run(["comments", "add", bead_id, "hello", "--actor", "b"], cwd=cwd, write=True)
+            shown = (await ex.run(["show", bead_id, "--json"], cwd=cwd))[0]
+            assert shown["priority"] == 4 and shown["comments"][-1]["text"] == "hello"
+            # The index sees fake bd's rewrite like a real one
+            idx = beads_index.get_index(cwd)
+            idx.refresh()
+            assert idx.get(bead_id)["priority"] == 4
+
+        asyncio.run(go())
+
+    row = bench.summarize([0.001 * i for i in range(1, 101)], errors=2, elapsed=2.0)
+    assert (row["p50_ms"], row["p95_ms"], row["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert row["rps"] == 50.0
+
+
+def test_admission_priority_and_shedding():
+    async def go():
+        gate = admission.AdmissionGate(1, {"batch": 1}, wait_timeout=1)
+        await gate.acquire("normal")
+        order = []
+
+        async def wait(priority):
+            await gate.acquire(priority)
+            order.append(priority)
+            gate.release()
+
+        batch_task = asyncio.create_task(wait("batch"))
+        await asyncio.sleep(0)
+        interactive_task = asyncio.create_task(wait("interactive"))
+        await asyncio.sleep(0)
+        try:
+            await gate.acquire("batch")  # batch queue (1) is full
+            assert False, "expected 503"
+        except HTTPException as e:
+            assert e.status_code == 503 and int(e.headers["Retry-After"]) >= 1
+        gate.release()
+        await asyncio.gather(batch_task, interactive_task)
+        assert order == ["interactive", "batch"]
+        assert gate.in_use == 0 and gate.rejected["batch"] == 1
+
+        # Saturated executor: a queued command gives up at the wait deadline
+        ex = BdExecutor(_script("sleep 0.3; echo '[]'\n"), [], max_concurrency=1, wait_timeout=0.05)
+        admission.current_priority.set("batch")
+        results = await asyncio.gather(ex.run(["list"]), ex.run(["list"]), return_exceptions=True)
+        assert results[0] == []
+        assert isinstance(results[1], HTTPException) and results[1].status_code == 503
+        stats = ex.stats()
+        assert stats["admission"]["rejected"]["batch"] == 1 and stats["waiting"] == 0
+
+    asyncio.run(go())
+
+
+def test_executor_serializes_writes_not_reads():
+    ex = BdExecutor(_script('sleep 0.3; echo "{}"\n'), [])
+
+    async def go(write):
+        start = time.monotonic()
+        await asyncio.gather(*(ex.run(["x"], cwd="/tmp", write=write) for _ in range(3)))
+        return time.monotonic() - start
+
+    assert asyncio.run(go(False)) < 0.8
+    assert asyncio.run(go(True)) >= 0.9
+    assert ex.stats()["projects"]["/tmp"]["wait_max_ms"] > 0
+
+    # Waiting for the write lock doesn't use up the admission wait
+    ex = BdExecutor(_script('sleep 0.3; echo "{}"\n'), [], wait_timeout=0.2)
+    assert asyncio.run(go(True)) >= 0.9
+
+
+# ---- Metrics ----
+
+def test_metrics_endpoint():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        main.EXECUTOR = BdExecutor(_script('echo "not json"\n'), [])
+        client = TestClient(main.app)
+        client.get("/api/v1/beads/os-a")
+        client.get("/api/v1/beads/os-a/deps")
+        text = client.get("/metrics").text
+        assert 'atom_http_requests_total{method="GET",route="/api/v1/beads/{bead_id}",status="200"}' in text
+        assert 'atom_bd_spawns_total{subcommand="dep_tree",project="os"}' in text
+        assert 'atom_bd_json_parse_failures_total{subcommand="dep_tree"}' in text
+        assert 'atom_http_request_duration_seconds_bucket{method="GET",route="/api/v1/beads/{bead_id}",le="+Inf"}' in text
+        assert "atom_http_requests_in_flight 1" in text  # the scrape itself
+
+
+def test_debug_slow_log_and_profile():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        client = TestClient(main.app)
+        assert client.get("/api/v1/debug/slow").status_code == 404  # off by default
+
+        main.DEBUG_ENDPOINTS = True
+        main.SLOW_LOG.threshold_ms, main.SLOW_LOG.stream = 0.001, io.StringIO()
+        main.EXECUTOR = BdExecutor(_script('echo \'{"id": "os-q"}\'\n'), [])
+        try:
+            client.get("/api/v1/beads/os-a/deps", headers={"X-Atom-Priority": "interactive"})
+            slow = client.get("/api/v1/debug/slow").json()["requests"]
+            entry = next(e for e in slow if e["route"] == "/api/v1/beads/{bead_id}/deps")
+            # dep tree output is forwarded undecoded, so no json_decode phase
+            assert {"bd_queue", "bd_spawn", "bd_run", "serialize"} <= set(entry["phases"])
+            assert entry["status"] == 200 and entry["total_ms"] > 0
+            assert entry["priority"] == "interactive"
+            assert "slow_request" in main.SLOW_LOG.stream.getvalue()
+
+            report = client.post("/api/v1/debug/profile", params={"seconds": 0.05}).text
+            assert "function calls" in report
+            assert client.post("/api/v1/debug/profile",
+                               params={"seconds": 0.05, "sort": "bogus"}).status_code == 400
+        finally:
+            main.DEBUG_ENDPOINTS = False
+            main.SLOW_LOG.threshold_ms, main.SLOW_LOG.stream = main.SLOW_REQUEST_MS, None
+
+
+def test_histogram_buckets():
+    h = metrics.Histogram("t_seconds", "test", ("x",), buckets=(0.1, 1))
+    metrics.REGISTRY.remove(h)
+    h.observe(0.05, x="a")
+    h.observe(0.5, x="a")
+    h.observe(5, x="a")
+    lines = h.render()
+    assert 't_seconds_bucket{x="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{x="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{x="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{x="a"} 3' in lines
+
+
+# ---- Batch ----
+
+def _logging_bd(output: str = "{}") -> tuple[str, Path]:
+    """Fake bd that records each invocation's args, one line per call."""
+    log = Path(tempfile.mkstemp(suffix=".log")[1])
+    script = _script(f'echo "$@" >> {log}\necho \'{output}\'\n')
+    return script, log
+
+
+def test_batch_merges_writes_and_serves_reads():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        script, log = _logging_bd('[{"id": "os-a"}, {"id": "os-b"}]')
+        main.EXECUTOR = BdExecutor(script, [])
+        client = TestClient(main.app)
+        resp = client.post("/api/v1/batch", json={"actor": "triage", "ops": [
+            {"op": "close", "id": "os-a", "reason": "dup"},
+            {"op": "close", "id": "os-b", "reason": "dup"},
+            {"op": "show", "id": "os-d"},
+            {"op": "comment", "id": "os-d", "text": "note"},
+            {"op": "bogus"},
+            {"op": "show", "id": "x-1", "project": "nope"},
+        ]})
+        results = resp.json()["results"]
+        assert [r["ok"] for r in results] == [True, True, True, True, False, False]
+        assert results[1]["result"]["id"] == "os-b"
+        assert results[2]["result"]["status"] == "in_progress"
+        assert results[4]["status"] == 400
+        assert results[5]["status"] == 404
+        calls = log.read_text().splitlines()
+        assert len(calls) == 2
+        assert calls[0].startswith("close os-a os-b --json --actor triage")
+        assert calls[1].startswith("comments add os-d note")
+
+
+def test_batch_coerces_fields_and_isolates_failures():
+    tmp = _setup_projects({"os": SAMPLE})
+    with tmp:
+        client = TestClient(main.app)
+        show = main._show
+
+        async def broken_show(cwd, bead_id):
+            raise RuntimeError("boom")
+
+        main._show = broken_show
+        try:
+            resp = client.post("/api/v1/batch", json={"project": "os", "ops": [
+                {"op": "list", "limit": "abc"},
+                {"op": "list", "priority": "1", "all": "true"},
+                {"op": "list", "status": ["open"]},
+                {"op": "show", "id": "os-a"},
+                {"op": "comments", "id": "os-d"},
+                {"op": "create", "title": 123},
+                {"op": "update", "id": "os-a", "add_labels": "api"},
+            ]})
+        finally:
+            main._show = show
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert results[0] == {"ok": False, "status": 400, "error": "limit must be an integer"}
+        assert [b["id"] for b in results[1]["result"]] == ["os-a"]
+        assert results[2]["status"] == 400
+        assert results[3] == {"ok": False, "status": 500, "error": "internal error"}
+        assert results[4]["ok"]
+        assert results[5] == {"ok": False, "status": 400, "error": "title must be a string"}
+        assert results[6]["error"] == "add_labels must be a list of strings"
+
+
+def test_coalesce_keeps_per_bead_order():
+    ops = list(enumerate([
+        {"op": "close", "id": "a", "reason": "r"},
+        {"op": "comment", "id": "b", "text": "x"},
+        {"op": "close", "id": "c", "reason": "r"},   # joins run 0 (b untouched)
+        {"op": "comment", "id": "d", "text": "y"},
+        {"op": "close", "id": "d", "reason": "r"},   # d touched since run 0 — new run
+    ]))
+    runs = [[i for i, _ in run] for run in batch.coalesce(ops)]
+    assert runs == [[0, 2], [1], [3], [4]]
+
+
+def test_write_pipeline_group_commit():
+    calls = []
+
+    priorities = []
+
+    async def run(args, cwd, write, priority):
+        calls.append(args)
+        priorities.append(priority)
+        await asyncio.sleep(0.01)
+        if "bad" in args:
+            raise HTTPException(404, detail="no issue bad")
+        if "slow" in args:
+            raise HTTPException(504, detail="bd command timed out")
+        if "odd" in args:
+            raise TypeError("expected str")
+        return [{"id": a} for a in args if a.startswith("os-")]
+
+    async def go():
+        pipe = WritePipeline(run, window=0.01)
+        claim = {"op": "update", "status": "in_progress", "claim": True, "actor": "bot"}
+        results = await asyncio.gather(
+            *(pipe.submit("/p", {**claim, "id": f"os-{i}"}) for i in range(5)),
+            pipe.submit("/p", {"op": "comment", "id": "os-1", "text": "hi"}),
+            return_exceptions=True,
+        )
+        assert [r["id"] for r in results[:5]] == [f"os-{i}" for i in range(5)]
+        assert len(calls) == 2
+        assert calls[0][:6] == ["update", "os-0", "os-1", "os-2", "os-3", "os-4"]
+
+        # A failing merged call is retried per op so errors stay per caller
+        calls.clear()
+        results = await asyncio.gather(
+            pipe.submit("/p", {"op": "close", "id": "os-9"}),
+            pipe.submit("/p", {"op": "close", "id": "bad"}),
+            return_exceptions=True,
+        )
+        assert results[0] == [{"id": "os-9"}]
+        assert isinstance(results[1], HTTPException) and results[1].status_code == 404
+        assert len(calls) == 3
+
+        # A timeout may have been applied: every op gets it, nothing is re-run
+        calls.clear()
+        results = await asyncio.gather(
+            *(pipe.submit("/p", {"op": "close", "id": i}) for i in ("os-7", "slow", "os-8")),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, HTTPException) and r.status_code == 504 for r in results)
+        assert len(calls) == 1
+
+        # An unexpected error fails only its own op
+        results = await asyncio.gather(
+            pipe.submit("/p", {"op": "comment", "id": "odd", "text": "x"}),
+            pipe.submit("/p", {"op": "comment", "id": "os-5", "text": "y"}),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], TypeError) and results[1] == [{"id": "os-5"}]
+        assert pipe.stats()["ops"] == 13
+
+        # Each op runs at its own caller's priority, whichever caller started the flush
+        async def at(priority, op):
+            admission.current_priority.set(priority)
+            return await pipe.submit("/p", op)
+
+        calls.clear()
+        priorities.clear()
+        await asyncio.gather(at("batch", {"op": "comment", "id": "os-1", "text": "a"}),
+                             at("interactive", {"op": "comment", "id": "os-2", "text": "b"}),
+                             at("batch", {"op": "close", "id": "os-3"}),
+                             at("interactive", {"op": "close", "id": "os-4"}))
+        assert priorities == ["batch", "interactive", "interactive"]  # merged close: most urgent
+
+        # Past max_pending, writes are refused instead of queued
+        pipe.max_pending = 2
+        results = await pipe.submit_many("/p", [{"op": "close", "id": f"os-{i}"} for i in range(3)])
+        assert all(r.status_code == 503 and "Retry-After" in r.headers for r in results)
+        assert pipe.stats()["rejected"] == 3
+
+    asyncio.run(go())
+
+
+# ---- Run ----
+
+if __name__ == "__main__":
+    tests = [v for k, v in sorted(globals().items()) if k.startswith("test_")]
+    passed = 0
+    failed = 0
+    for t in tests:
+        try:
+            t()
+            passed += 1
+            print(f"  PASS  {t.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"  FAIL  {t.__name__}: {e}")
+    print(f"\n{passed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,131 @@
+"""Filesystem watcher for project .beads/issues.jsonl files.
+
+Uses Linux inotify (via ctypes, no extra dependency) on each project's .beads
+directory — bd replaces issues.jsonl by rename, so the directory is watched
+rather than the file. Falls back to stat polling where inotify is unavailable.
+Either way the callback receives the project path whose JSONL changed.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT = struct.Struct("iIII")
+JSONL_NAME = "issues.jsonl"
+
+
+def _libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        libc.inotify_init1  # noqa: B018 — raises AttributeError if missing
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class Watcher:
+    """Calls on_change(project_path) when a project's JSONL is rewritten."""
+
+    def __init__(self, project_paths: list[str], on_change, poll_interval: float = 2.0,
+                 debounce: float = 0.05):
+        self.project_paths = project_paths
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.mode = "stopped"
+        self._fd: int | None = None
+        self._wds: dict[int, str] = {}
+        self._pending: dict[str, asyncio.TimerHandle] = {}
+        self._poll_task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if sys.platform.startswith("linux") and self._start_inotify():
+            self.mode = "inotify"
+        else:
+            self.mode = "poll"
+            self._poll_task = self._loop.create_task(self._poll())
+
+    def stop(self) -> None:
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+        self.mode = "stopped"
+
+    # ---- inotify ----
+
+    def _start_inotify(self) -> bool:
+        libc = _libc()
+        if libc is None:
+            return False
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+        for path in self.project_paths:
+            beads_dir = Path(path) / ".beads"
+            if not beads_dir.is_dir():
+                continue
+            wd = libc.inotify_add_watch(fd, str(beads_dir).encode(), WATCH_MASK)
+            if wd >= 0:
+                self._wds[wd] = path
+        self._fd = fd
+        self._loop.add_reader(fd, self._read_events)
+        return True
+
+    def _read_events(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if name.decode(errors="replace") == JSONL_NAME and wd in self._wds:
+                self._schedule(self._wds[wd])
+
+    def _schedule(self, path: str) -> None:
+        """Coalesce bursts of events (write + rename) into one callback."""
+        if path in self._pending:
+            return
+
+        def fire():
+            self._pending.pop(path, None)
+            self.on_change(path)
+
+        self._pending[path] = self._loop.call_later(self.debounce, fire)
+
+    # ---- polling fallback ----
+
+    async def _poll(self) -> None:
+        last: dict[str, tuple | None] = {}
+        while True:
+            for path in self.project_paths:
+                try:
+                    st = (Path(path) / ".beads" / JSONL_NAME).stat()
+                    sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+                except OSError:
+                    sig = None
+                if path in last and last[path] != sig:
+                    self.on_change(path)
+                last[path] = sig
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,152 @@
+"""Per-project write pipeline with group commit.
+
+Every mutation (single-bead endpoints and /api/v1/batch alike) is queued on
+its project's pipeline. A flusher waits a short window for more writes to
+arrive, then applies the pending ops in one pass: identical update/close ops
+become a single multi-ID bd call (one JSONL rewrite), the rest run back to
+back. Only one flush per project runs at a time, so writes never race each
+other into lost updates. Each caller still gets its own result or error.
+
+Each op keeps the admission priority of the request that queued it; a
+merged run goes in at the most urgent of its ops' classes. Pending ops per
+project are capped (max_pending): past that, new writes get 503 with
+Retry-After rather than queueing without bound in front of the executor.
+
+A merged call that bd rejected up front (bad arguments, an ID that doesn't
+resolve) is re-run op by op so only the offending caller sees the error. Any
+other failure (timeout, admission shed, bd crash) may come after some beads
+were written, so it is handed to every op in the run as-is, never retried.
+"""
+
+import asyncio
+import contextvars
+
+from fastapi import HTTPException
+
+import admission
+import batch
+import bd_args
+
+# Merged-call errors raised before bd changed anything, so safe to split and retry
+SPLIT_STATUSES = {400, 404}
+
+
+class WritePipeline:
+    """Queues bd mutations per project and applies them in small batches."""
+
+    def __init__(self, run, window: float = 0.005, max_batch: int = 32,
+                 max_pending: int = 256, retry_after=lambda: 1):
+        self.run = run  # async fn(args, cwd=..., write=True, priority=...)
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.retry_after = retry_after  # fn() -> seconds, for the 503's Retry-After
+        self._pending: dict[str, list[tuple[dict, asyncio.Future, str]]] = {}
+        self._flushers: dict[str, asyncio.Task] = {}
+        self.flushes = 0
+        self.ops = 0
+        self.bd_calls = 0
+        self.max_seen_batch = 0
+        self.rejected = 0
+
+    async def submit(self, cwd: str, op: dict):
+        """Queue one write op and wait for its result."""
+        return (await self.submit_many(cwd, [op]))[0]
+
+    async def submit_many(self, cwd: str, ops: list[dict]) -> list:
+        """Queue ordered ops; returns per-op results (HTTPException instances on error)."""
+        pending = self._pending.setdefault(cwd, [])
+        if len(pending) + len(ops) > self.max_pending:
+            self.rejected += len(ops)
+            results = [HTTPException(503, detail="write queue full; retry later",
+                                     headers={"Retry-After": str(self.retry_after())})] * len(ops)
+        else:
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future() for _ in ops]
+            priority = admission.current_priority.get()
+            pending.extend((op, fut, priority) for op, fut in zip(ops, futures))
+            if cwd not in self._flushers:
+                # Neutral context: the flusher serves every caller, not just the one that started it
+                self._flushers[cwd] = loop.create_task(self._flush_loop(cwd),
+                                                       context=contextvars.Context())
+            results = await asyncio.gather(*futures, return_exceptions=True)
+        if len(ops) == 1 and isinstance(results[0], BaseException):
+            raise results[0]
+        return results
+
+    async def _flush_loop(self, cwd: str) -> None:
+        try:
+            await asyncio.sleep(self.window)
+            pending = self._pending[cwd]
+            while pending:
+                group = pending[:self.max_batch]
+                del pending[:self.max_batch]
+                try:
+                    await self._apply(cwd, group)
+                except Exception as e:
+                    for _, fut, _ in group:
+                        if not fut.done():
+                            fut.set_exception(e)
+        finally:
+            del self._flushers[cwd]
+
+    async def _apply(self, cwd: str, group: list[tuple[dict, asyncio.Future, str]]) -> None:
+        self.flushes += 1
+        self.ops += len(group)
+        self.max_seen_batch = max(self.max_seen_batch, len(group))
+        for run in batch.coalesce(list(enumerate(op for op, _, _ in group))):
+            futures = [group[i][1] for i, _ in run]
+            priorities = [group[i][2] for i, _ in run]
+            ops = [op for _, op in run]
+            if len(run) > 1:
+                ids = [op["id"] for op in ops]
+                build = bd_args.update_args if ops[0]["op"] == "update" else bd_args.close_args
+                try:
+                    args = build(ids, ops[0])
+                    self.bd_calls += 1
+                    merged = await self.run(args, cwd=cwd, write=True,
+                                            priority=min(priorities, key=admission.PRIORITIES.get))
+                except Exception as e:
+                    if not isinstance(e, HTTPException) or e.status_code not in SPLIT_STATUSES:
+                        for fut in futures:
+                            _resolve(fut, exc=e)
+                        continue
+                    # Nothing was applied: retry one by one so each op gets its own error
+                else:
+                    for fut, result in zip(futures, batch.split_result(merged, ids)):
+                        _resolve(fut, result)
+                    continue
+
+            for op, fut, priority in zip(ops, futures, priorities):
+                try:
+                    args = bd_args.op_args(op)
+                    self.bd_calls += 1
+                    result = await self.run(args, cwd=cwd, write=True, priority=priority)
+                    if op["op"] == "create":
+                        result = bd_args.create_result(result)
+                    _resolve(fut, result)
+                except Exception as e:
+                    # Only this op failed; the rest of the group still runs
+                    _resolve(fut, exc=e)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "flushes": self.flushes,
+            "ops": self.ops,
+            "bd_calls": self.bd_calls,
+            "max_seen_batch": self.max_seen_batch,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "pending": {cwd: len(p) for cwd, p in self._pending.items() if p},
+        }
+
+
+def _resolve(fut: asyncio.Future, result=None, exc: BaseException | None = None) -> None:
+    if fut.done():  # caller went away
+        return
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(result)
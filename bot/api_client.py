@@ -1,51 +1,169 @@
 """HTTP client for the Atom API."""
 
+import time
+
 import aiohttp
-from config import API_BASE, API_TOKEN
+from cache import ResponseCache
+from config import (API_BASE, API_DNS_TTL, API_KEEPALIVE, API_POOL_SIZE, API_TIMEOUT, API_TOKEN,
+                    CACHE_PROJECTS_TTL, CACHE_SIZE, CACHE_TTL)
 
 
 def _headers() -> dict:
-    h = {"Content-Type": "application/json"}
+    # Chat users are waiting on the reply: ask the API to admit us first
+    h = {"Content-Type": "application/json", "X-Atom-Priority": "interactive"}
     if API_TOKEN:
         h["Authorization"] = f"Bearer {API_TOKEN}"
     return h
 
 
+class ApiClient:
+    """One aiohttp session for the bot's lifetime, so commands reuse pooled
+    keep-alive connections instead of paying a handshake per call.
+
+    app.py starts and closes it; a call made before start() opens it lazily.
+    GETs made through cached_get() are served from a ResponseCache.
+    """
+
+    def __init__(self, pool_size: int = API_POOL_SIZE, keepalive: float = API_KEEPALIVE,
+                 dns_ttl: int = API_DNS_TTL, timeout: float = API_TIMEOUT):
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout
+        self._session = None
+        self.counters = {"requests": 0, "errors": 0, "connections_created": 0,
+                         "connections_reused": 0, "pool_waits": 0}
+        self.pool_wait_s = 0.0
+        self.in_flight = 0
+        self.cache = ResponseCache(CACHE_SIZE)
+
+    async def start(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_create)
+        trace.on_connection_reuseconn.append(self._on_reuse)
+        trace.on_connection_queued_start.append(self._on_queued_start)
+        trace.on_connection_queued_end.append(self._on_queued_end)
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,  # every call goes to one API host
+            keepalive_timeout=self.keepalive,
+            ttl_dns_cache=self.dns_ttl,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=_headers(),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace],
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _send(self, method: str, path: str, **kwargs) -> tuple[int, dict | list | None, dict]:
+        """(status, body, headers); errors come back as an {"error": True, ...} body."""
+        if self._session is None or self._session.closed:
+            await self.start()
+        self.counters["requests"] += 1
+        self.in_flight += 1
+        try:
+            async with self._session.request(method, f"{API_BASE}{path}", **kwargs) as resp:
+                if resp.status == 304:
+                    return resp.status, None, resp.headers
+                if resp.status >= 400:
+                    self.counters["errors"] += 1
+                    text = await resp.text()
+                    return resp.status, {"error": True, "status": resp.status, "detail": text}, {}
+                return resp.status, await resp.json(), resp.headers
+        finally:
+            self.in_flight -= 1
+
+    async def request(self, method: str, path: str, **kwargs) -> dict | list:
+        return (await self._send(method, path, **kwargs))[1]
+
+    async def cached_get(self, path: str, params: dict | None = None, ttl: float = CACHE_TTL,
+                         page: bool = False):
+        """GET through the cache, revalidating expired entries by ETag.
+
+        page=True returns listings as {beads, next_cursor}, whether the API
+        sent the cursor in the body or in the X-Next-Cursor header.
+        """
+        async def load(stale):
+            headers = {"If-None-Match": stale.etag} if stale is not None and stale.etag else None
+            status, body, resp_headers = await self._send("GET", path, params=params, headers=headers)
+            etag = resp_headers.get("ETag")
+            if status == 304 and stale is not None:
+                return stale.value, etag or stale.etag, True
+            if page and status < 300:
+                body = _as_page(body, resp_headers)
+            return body, etag, status < 300
+
+        if ttl <= 0:
+            return (await load(None))[0]
+        return await self.cache.get(self.cache.key(path, params), load, ttl)
+
+    def invalidate_bead(self, bead_id: str) -> None:
+        """Forget the bead itself and every cached listing/count it may appear in."""
+        bead_path = f"/api/v1/beads/{bead_id}"
+        self.cache.invalidate(lambda path: path == bead_path or path.startswith(bead_path + "/")
+                              or path in LISTING_PATHS)
+
+    def stats(self) -> dict:
+        return {**self.counters, "in_flight": self.in_flight, "pool_size": self.pool_size,
+                "pool_wait_ms": round(self.pool_wait_s * 1000, 3), "cache": self.cache.stats()}
+
+    # ---- Trace hooks ----
+
+    async def _on_create(self, session, ctx, params) -> None:
+        self.counters["connections_created"] += 1
+
+    async def _on_reuse(self, session, ctx, params) -> None:
+        self.counters["connections_reused"] += 1
+
+    async def _on_queued_start(self, session, ctx, params) -> None:
+        self.counters["pool_waits"] += 1
+        ctx.queued_at = time.monotonic()
+
+    async def _on_queued_end(self, session, ctx, params) -> None:
+        self.pool_wait_s += time.monotonic() - getattr(ctx, "queued_at", time.monotonic())
+
+
+def _as_page(body: dict | list, headers) -> dict:
+    if isinstance(body, list):
+        return {"beads": body, "next_cursor": headers.get("X-Next-Cursor")}
+    return {"beads": body.get("beads", []), "next_cursor": body.get("next_cursor")}
+
+
+# Cached responses that any bead change may alter
+LISTING_PATHS = {"/api/v1/beads", "/api/v1/ready", "/api/v1/stats"}
+
+CLIENT = ApiClient()
+
+# Paged listings for list cards: beads per API page and the fields fetched
+PAGE_SIZE = 25
+PAGE_FIELDS = "id,title,status,priority"
+
+
 async def api_get(path: str, params: dict | None = None) -> dict | list:
-    url = f"{API_BASE}{path}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=_headers(), params=params, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-            if resp.status >= 400:
-                text = await resp.text()
-                return {"error": True, "status": resp.status, "detail": text}
-            return await resp.json()
+    return await CLIENT.request("GET", path, params=params)
 
 
 async def api_post(path: str, body: dict | None = None) -> dict:
-    url = f"{API_BASE}{path}"
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=_headers(), json=body or {}, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-            if resp.status >= 400:
-                text = await resp.text()
-                return {"error": True, "status": resp.status, "detail": text}
-            return await resp.json()
+    return await CLIENT.request("POST", path, json=body or {})
 
 
 async def api_patch(path: str, body: dict | None = None) -> dict:
-    url = f"{API_BASE}{path}"
-    async with aiohttp.ClientSession() as session:
-        async with session.patch(url, headers=_headers(), json=body or {}, timeout=aiohttp.ClientTimeout(total=15)) as resp:
-            if resp.status >= 400:
-                text = await resp.text()
-                return {"error": True, "status": resp.status, "detail": text}
-            return await resp.json()
+    return await CLIENT.request("PATCH", path, json=body or {})
 
 
 async def get_bead(bead_id: str, project: str | None = None) -> dict:
     params = {}
     if project:
         params["project"] = project
-    return await api_get(f"/api/v1/beads/{bead_id}", params)
+    return await CLIENT.cached_get(f"/api/v1/beads/{bead_id}", params)
 
 
 async def list_beads(project: str | None = None, status: str | None = None,
@@ -57,11 +175,39 @@ async def list_beads(project: str | None = None, status: str | None = None,
         params["status"] = status
     if priority is not None:
         params["priority"] = str(priority)
-    return await api_get("/api/v1/beads", params)
+    return await CLIENT.cached_get("/api/v1/beads", params)
+
+
+async def list_page(project: str | None = None, cursor: str | None = None,
+                    limit: int = PAGE_SIZE) -> dict:
+    """One page of open beads, trimmed to the fields a list card shows."""
+    params = {"limit": str(limit), "fields": PAGE_FIELDS}
+    if project:
+        params["project"] = project
+    if cursor:
+        params["cursor"] = cursor
+    return await CLIENT.cached_get("/api/v1/beads", params, page=True)
+
+
+async def ready_page(project: str | None = None, cursor: str | None = None,
+                     limit: int = PAGE_SIZE) -> dict:
+    params = {"limit": str(limit)}
+    if project:
+        params["project"] = project
+    if cursor:
+        params["cursor"] = cursor
+    return await CLIENT.cached_get("/api/v1/ready", params, page=True)
+
+
+async def get_stats(project: str | None = None) -> dict:
+    params = {}
+    if project:
+        params["project"] = project
+    return await CLIENT.cached_get("/api/v1/stats", params)
 
 
 async def list_projects() -> list:
-    return await api_get("/api/v1/projects")
+    return await CLIENT.cached_get("/api/v1/projects", ttl=CACHE_PROJECTS_TTL)
 
 
 async def update_bead(bead_id: str, project: str | None = None, **kwargs) -> dict:
@@ -69,14 +215,18 @@ async def update_bead(bead_id: str, project: str | None = None, **kwargs) -> dic
     if project:
         body["project"] = project
     body["actor"] = "teams-bot"
-    return await api_patch(f"/api/v1/beads/{bead_id}", body)
+    result = await api_patch(f"/api/v1/beads/{bead_id}", body)
+    CLIENT.invalidate_bead(bead_id)
+    return result
 
 
 async def close_bead(bead_id: str, reason: str, project: str | None = None) -> dict:
     body = {"reason": reason, "actor": "teams-bot"}
     if project:
         body["project"] = project
-    return await api_post(f"/api/v1/beads/{bead_id}/close", body)
+    result = await api_post(f"/api/v1/beads/{bead_id}/close", body)
+    CLIENT.invalidate_bead(bead_id)
+    return result
 
 
 async def create_bead(title: str, project: str | None = None, **kwargs) -> dict:
@@ -84,4 +234,6 @@ async def create_bead(title: str, project: str | None = None, **kwargs) -> dict:
     if project:
         body["project"] = project
     body.update({k: v for k, v in kwargs.items() if v is not None})
-    return await api_post("/api/v1/beads", body)
+    result = await api_post("/api/v1/beads", body)
+    CLIENT.cache.invalidate(lambda path: path in LISTING_PATHS)
+    return result
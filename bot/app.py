@@ -15,8 +15,10 @@ from botbuilder.core import (
 )
 from botbuilder.schema import Activity
 
+import api_client
 import config
 from bot import AtomBot
+from tasks import TaskQueue
 
 # Adapter
 settings = BotFrameworkAdapterSettings(
@@ -35,8 +37,10 @@ async def on_error(context: TurnContext, error: Exception):
 
 adapter.on_turn_error = on_error
 
-# Bot instance
-bot = AtomBot()
+# Bot instance: API-backed commands are acknowledged at once and finished
+# on the task queue, replying proactively
+tasks = TaskQueue(concurrency=config.BOT_WORKERS, max_pending=config.BOT_QUEUE_SIZE)
+bot = AtomBot(adapter=adapter, app_id=config.APP_ID, tasks=tasks)
 
 
 # ---- Routes ----
@@ -59,14 +63,27 @@ async def messages(request: web.Request) -> web.Response:
 
 async def health(request: web.Request) -> web.Response:
     """Health check."""
-    return web.json_response({"status": "ok", "service": "atom-teams-bot"})
+    return web.json_response({"status": "ok", "service": "atom-teams-bot",
+                              "api_pool": api_client.CLIENT.stats(), "tasks": tasks.stats()})
 
 
 # ---- App ----
 
+async def start_background(app: web.Application) -> None:
+    await api_client.CLIENT.start()
+    tasks.start()
+
+
+async def stop_background(app: web.Application) -> None:
+    await tasks.stop()  # let queued commands reply before the client closes
+    await api_client.CLIENT.close()
+
+
 app = web.Application()
 app.router.add_post("/api/messages", messages)
 app.router.add_get("/healthz", health)
+app.on_startup.append(start_background)
+app.on_cleanup.append(stop_background)
 
 
 if __name__ == "__main__":
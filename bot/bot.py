@@ -1,14 +1,20 @@
 """Teams activity handler — command parsing and card action routing."""
 
+import asyncio
 import re
+import sys
 from botbuilder.core import TurnContext, CardFactory
 from botbuilder.schema import Activity, ActivityTypes
 from botbuilder.core.teams import TeamsActivityHandler
 
 import api_client as api
 import cards
+import config
 
 
+# turn_state key: activity ID of the "working" card a result should replace
+REPLACE_ACTIVITY = "atom.replace_activity_id"
+
 # Regex patterns for bead IDs (e.g., os-mjb, 3dl-k3e)
 BEAD_ID_RE = re.compile(r"\b([a-z0-9]+-[a-z0-9]+)\b")
 
@@ -29,6 +35,36 @@ def _extract_project(text: str) -> str | None:
     return None
 
 
+def _wants_all(lower: str) -> bool:
+    """True for commands aimed at every project: "list all", "status *"."""
+    return any(word in ("all", "*", "everything") for word in lower.split()[1:])
+
+
+async def _fan_out(names: list[str], fetch, timeout: float) -> tuple[dict, dict]:
+    """Call fetch(name) for every project at once, each under `timeout`.
+
+    Returns ({name: result}, {name: reason}); projects that time out or
+    error end up in the second dict instead of sinking the whole answer.
+    """
+    async def one(name):
+        try:
+            return await asyncio.wait_for(fetch(name), timeout)
+        except asyncio.TimeoutError:
+            return {"error": True, "detail": "timed out"}
+        except Exception as e:
+            return {"error": True, "detail": str(e) or type(e).__name__}
+
+    results = await asyncio.gather(*(one(name) for name in names))
+    ok, failed = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, dict) and result.get("error"):
+            status = result.get("status")
+            failed[name] = f"HTTP {status}" if status else result.get("detail", "error")
+        else:
+            ok[name] = result
+    return ok, failed
+
+
 def _strip_mention(text: str) -> str:
     """Remove @mention tags from Teams message text."""
     # Teams wraps mentions in <at>...</at> tags
@@ -37,7 +73,18 @@ def _strip_mention(text: str) -> str:
 
 
 class AtomBot(TeamsActivityHandler):
-    """Main bot handler for Teams interactions."""
+    """Main bot handler for Teams interactions.
+
+    With an adapter and a TaskQueue, API-backed commands are acknowledged
+    with a "working" card and finished in the background; without them
+    (tests, scripts) every command runs inline.
+    """
+
+    def __init__(self, adapter=None, app_id: str = "", tasks=None):
+        super().__init__()
+        self.adapter = adapter
+        self.app_id = app_id
+        self.tasks = tasks
 
     async def on_message_activity(self, turn_context: TurnContext):
         """Handle incoming messages — parse commands, dispatch to handlers."""
@@ -54,23 +101,25 @@ class AtomBot(TeamsActivityHandler):
             await self._send_card(turn_context, cards.help_card())
 
         elif lower in ("ready", "what's ready", "whats ready", "what is ready"):
-            await self._handle_ready(turn_context)
+            await self._run(turn_context, self._handle_ready)
 
         elif lower.startswith("show ") or lower.startswith("bead "):
             bead_id = _extract_bead_id(text)
             if bead_id:
-                await self._handle_show(turn_context, bead_id)
+                await self._run(turn_context, self._handle_show, bead_id)
             else:
                 await self._send_card(turn_context, cards.error_card("No bead ID found. Usage: show <bead-id>"))
 
         elif lower.startswith("list"):
-            project = _extract_project(text)
-            await self._handle_list(turn_context, project)
+            if _wants_all(lower):
+                await self._run(turn_context, self._handle_list_all)
+            else:
+                await self._run(turn_context, self._handle_list, _extract_project(text))
 
         elif lower.startswith("claim "):
             bead_id = _extract_bead_id(text)
             if bead_id:
-                await self._handle_claim(turn_context, bead_id)
+                await self._run(turn_context, self._handle_claim, bead_id)
             else:
                 await self._send_card(turn_context, cards.error_card("No bead ID found. Usage: claim <bead-id>"))
 
@@ -86,7 +135,7 @@ class AtomBot(TeamsActivityHandler):
                     if idx >= 0:
                         reason = text[idx + len(bead_id):].strip()
                     if reason:
-                        await self._handle_close(turn_context, bead_id, reason)
+                        await self._run(turn_context, self._handle_close, bead_id, reason)
                         return
                 # No inline reason — prompt for one
                 await self._send_card(turn_context, cards.close_prompt_card(bead_id))
@@ -94,17 +143,19 @@ class AtomBot(TeamsActivityHandler):
                 await self._send_card(turn_context, cards.error_card("No bead ID found. Usage: done <bead-id> [reason]"))
 
         elif lower in ("projects", "repos"):
-            await self._handle_projects(turn_context)
+            await self._run(turn_context, self._handle_projects)
 
         elif lower.startswith("status"):
-            project = _extract_project(text)
-            await self._handle_status(turn_context, project)
+            if _wants_all(lower):
+                await self._run(turn_context, self._handle_status_all)
+            else:
+                await self._run(turn_context, self._handle_status, _extract_project(text))
 
         else:
             # Try to detect a bead ID in freeform text
             bead_id = _extract_bead_id(text)
             if bead_id:
-                await self._handle_show(turn_context, bead_id)
+                await self._run(turn_context, self._handle_show, bead_id)
             else:
                 await self._send_card(turn_context, cards.text_card(
                     "I didn't understand that. Type **help** to see available commands.",
@@ -118,7 +169,7 @@ class AtomBot(TeamsActivityHandler):
 
         if action == "claim":
             bead_id = data.get("bead_id", "")
-            await self._handle_claim(turn_context, bead_id)
+            await self._run(turn_context, self._handle_claim, bead_id)
 
         elif action == "close_prompt":
             bead_id = data.get("bead_id", "")
@@ -127,7 +178,11 @@ class AtomBot(TeamsActivityHandler):
         elif action == "close":
             bead_id = data.get("bead_id", "")
             reason = data.get("close_reason", "Closed via Teams")
-            await self._handle_close(turn_context, bead_id, reason)
+            await self._run(turn_context, self._handle_close, bead_id, reason)
+
+        elif action == "page":
+            await self._run(turn_context, self._handle_page, data,
+                            replace_id=turn_context.activity.reply_to_id)
 
     async def on_invoke_activity(self, turn_context: TurnContext):
         """Handle invoke activities (card actions come through here in Teams)."""
@@ -136,51 +191,71 @@ class AtomBot(TeamsActivityHandler):
             data = (activity.value or {}).get("action", {}).get("data", {})
             action = data.get("action")
             if action == "claim":
-                await self._handle_claim(turn_context, data.get("bead_id", ""))
+                await self._run(turn_context, self._handle_claim, data.get("bead_id", ""))
             elif action == "close_prompt":
                 await self._send_card(turn_context, cards.close_prompt_card(data.get("bead_id", "")))
             elif action == "close":
-                await self._handle_close(turn_context, data.get("bead_id", ""), data.get("close_reason", "Closed via Teams"))
+                await self._run(turn_context, self._handle_close, data.get("bead_id", ""), data.get("close_reason", "Closed via Teams"))
+            elif action == "page":
+                await self._run(turn_context, self._handle_page, data, replace_id=activity.reply_to_id)
             return self._create_invoke_response(200)
         return await super().on_invoke_activity(turn_context)
 
     # ---- Command handlers ----
 
-    async def _handle_ready(self, turn_context: TurnContext):
-        """Show ready work across all projects."""
-        # The API doesn't have a /ready endpoint — use list with status filter
-        # For now, get open beads sorted by priority
-        result = await api.list_beads(status="open", limit=20)
-        if isinstance(result, dict) and result.get("error"):
-            await self._send_card(turn_context, cards.error_card(result.get("detail", "API error")))
-            return
-        beads = result if isinstance(result, list) else result.get("issues", result.get("beads", []))
-        await self._send_card(turn_context, cards.ready_card(beads))
+    async def _handle_ready(self, turn_context: TurnContext, cursor: str | None = None,
+                            history: list | None = None):
+        """Show ready work across all projects, a page at a time."""
+        nav = {"kind": "ready", "project": None, "cursor": cursor, "history": history or []}
+        await self._send_page(turn_context, "Ready Work", nav,
+                              lambda limit: api.ready_page(cursor=cursor, limit=limit))
 
     async def _handle_show(self, turn_context: TurnContext, bead_id: str):
         """Show details for a single bead."""
-        # Guess project from bead prefix
-        project = self._project_from_bead_id(bead_id)
-        result = await api.get_bead(bead_id, project=project)
+        # The API resolves the owning project from the bead ID
+        result = await api.get_bead(bead_id)
         if isinstance(result, dict) and result.get("error"):
             await self._send_card(turn_context, cards.error_card(f"Bead {bead_id}: {result.get('detail', 'not found')}"))
             return
         await self._send_card(turn_context, cards.bead_card(result))
 
-    async def _handle_list(self, turn_context: TurnContext, project: str | None):
-        """List open beads, optionally filtered by project."""
-        result = await api.list_beads(project=project, limit=20)
-        if isinstance(result, dict) and result.get("error"):
-            await self._send_card(turn_context, cards.error_card(result.get("detail", "API error")))
-            return
-        beads = result if isinstance(result, list) else result.get("issues", result.get("beads", []))
+    async def _handle_list(self, turn_context: TurnContext, project: str | None,
+                           cursor: str | None = None, history: list | None = None):
+        """List open beads, optionally filtered by project, a page at a time."""
         title = f"Open Beads — {project}" if project else "Open Beads"
-        await self._send_card(turn_context, cards.bead_list_card(beads, title=title))
+        nav = {"kind": "list", "project": project, "cursor": cursor, "history": history or []}
+        await self._send_page(turn_context, title, nav,
+                              lambda limit: api.list_page(project=project, cursor=cursor, limit=limit))
+
+    async def _handle_page(self, turn_context: TurnContext, data: dict):
+        """Prev/Next on a paged list card."""
+        history = data.get("history") or []
+        if data.get("kind") == "ready":
+            await self._handle_ready(turn_context, data.get("cursor"), history)
+        else:
+            await self._handle_list(turn_context, data.get("project"), data.get("cursor"), history)
+
+    async def _send_page(self, turn_context: TurnContext, title: str, nav: dict, fetch):
+        """Fetch one API page and send it as a size-budgeted card.
+
+        If the budget cut the page short, the page is fetched again with
+        exactly that many rows so Next resumes after the last row shown.
+        """
+        page = await fetch(api.PAGE_SIZE)
+        if isinstance(page, dict) and page.get("error"):
+            await self._send_card(turn_context, cards.error_card(page.get("detail", "API error")))
+            return
+        card, shown = cards.bead_page_card(page["beads"], title, nav=nav, next_cursor=page["next_cursor"])
+        if 0 < shown < len(page["beads"]):
+            page = await fetch(shown)
+            if not (isinstance(page, dict) and page.get("error")):
+                card, _ = cards.bead_page_card(page["beads"], title, nav=nav,
+                                               next_cursor=page["next_cursor"])
+        await self._send_card(turn_context, card)
 
     async def _handle_claim(self, turn_context: TurnContext, bead_id: str):
         """Claim a bead (set status to in_progress, assign to current user)."""
-        project = self._project_from_bead_id(bead_id)
-        result = await api.update_bead(bead_id, project=project, status="in_progress", claim=True)
+        result = await api.update_bead(bead_id, status="in_progress", claim=True)
         if isinstance(result, dict) and result.get("error"):
             await self._send_card(turn_context, cards.error_card(f"Failed to claim {bead_id}: {result.get('detail', 'error')}"))
             return
@@ -188,8 +263,7 @@ class AtomBot(TeamsActivityHandler):
 
     async def _handle_close(self, turn_context: TurnContext, bead_id: str, reason: str):
         """Close a bead with reason."""
-        project = self._project_from_bead_id(bead_id)
-        result = await api.close_bead(bead_id, reason=reason, project=project)
+        result = await api.close_bead(bead_id, reason=reason)
         if isinstance(result, dict) and result.get("error"):
             await self._send_card(turn_context, cards.error_card(f"Failed to close {bead_id}: {result.get('detail', 'error')}"))
             return
@@ -206,49 +280,121 @@ class AtomBot(TeamsActivityHandler):
 
     async def _handle_status(self, turn_context: TurnContext, project: str | None):
         """Show project status summary."""
-        result = await api.list_beads(project=project, limit=50)
+        result = await api.get_stats(project)
         if isinstance(result, dict) and result.get("error"):
             await self._send_card(turn_context, cards.error_card(result.get("detail", "API error")))
             return
-        beads = result if isinstance(result, list) else result.get("issues", result.get("beads", []))
 
-        # Count by status
-        counts = {}
-        for b in beads:
-            s = b.get("status", "open")
-            counts[s] = counts.get(s, 0) + 1
+        # Counts are maintained by the API over every bead, not a page of them
+        if project:
+            stats = result.get("projects", {}).get(project, {})
+            title = f"Status — {project}"
+        else:
+            stats = result.get("portfolio", {})
+            title = "Status — All Projects"
+        await self._send_card(turn_context, cards.status_card(stats, title=title))
 
-        summary_lines = [f"**{s}**: {c}" for s, c in sorted(counts.items())]
-        summary = "\n".join(summary_lines) if summary_lines else "No beads found."
-        title = f"Status — {project}" if project else "Status — All Projects"
-        await self._send_card(turn_context, cards.text_card(summary, title=title))
+    async def _project_names(self, turn_context: TurnContext) -> list[str] | None:
+        result = await api.list_projects()
+        if isinstance(result, dict) and result.get("error"):
+            await self._send_card(turn_context, cards.error_card(result.get("detail", "API error")))
+            return None
+        return [p["name"] for p in result if p.get("has_beads", True)]
+
+    async def _handle_list_all(self, turn_context: TurnContext):
+        """Open beads from every project, queried concurrently."""
+        names = await self._project_names(turn_context)
+        if names is None:
+            return
+        results, failed = await _fan_out(
+            names, lambda name: api.list_beads(project=name, limit=20), config.BOT_PROJECT_TIMEOUT)
+        beads = [b for result in results.values()
+                 for b in (result if isinstance(result, list) else result.get("beads", []))]
+        beads.sort(key=lambda b: (b.get("priority", 9), b.get("created_at", ""), b.get("id", "")))
+        await self._send_card(turn_context, cards.bead_list_card(
+            beads, title="Open Beads — All Projects", failures=failed))
+
+    async def _handle_status_all(self, turn_context: TurnContext):
+        """Per-project counts for every project, queried concurrently."""
+        names = await self._project_names(turn_context)
+        if names is None:
+            return
+        results, failed = await _fan_out(names, api.get_stats, config.BOT_PROJECT_TIMEOUT)
+        per_project = {name: result.get("projects", {}).get(name, {})
+                       for name, result in results.items()}
+        await self._send_card(turn_context, cards.portfolio_status_card(per_project, failed))
 
     # ---- Helpers ----
 
+    async def _run(self, turn_context: TurnContext, handler, *args, replace_id: str | None = None):
+        """Run a command handler inline, or queue it and acknowledge now.
+
+        replace_id: a card the result should update in place (paging)
+        instead of posting a "working" card first.
+        """
+        if self.tasks is None or self.adapter is None:
+            if replace_id:
+                turn_context.turn_state[REPLACE_ACTIVITY] = replace_id
+            return await handler(turn_context, *args)
+        activity_id = turn_context.activity.id
+        # Claimed up front so a concurrent redelivery can't also queue it;
+        # released again below unless the command is actually queued
+        if self.tasks.is_duplicate(activity_id):
+            return  # redelivery of an activity we already accepted
+        queued = False
+        try:
+            reference = TurnContext.get_conversation_reference(turn_context.activity)
+            ack_id = replace_id
+            if not ack_id:
+                ack = await self._send_card(turn_context, cards.working_card())
+                ack_id = getattr(ack, "id", None)
+
+            async def job():
+                failure = None
+
+                async def deliver(context: TurnContext):
+                    nonlocal failure
+                    if ack_id:
+                        context.turn_state[REPLACE_ACTIVITY] = ack_id
+                    try:
+                        await handler(context, *args)
+                    except Exception as e:
+                        # Reported here; kept from on_turn_error, which would reply again
+                        await self._send_card(context, cards.error_card(f"Command failed: {e}"))
+                        failure = e
+
+                await self.adapter.continue_conversation(reference, deliver, self.app_id)
+                if failure is not None:
+                    raise failure  # counted and logged by the task queue
+
+            queued = self.tasks.submit(job)
+            if not queued:
+                if ack_id:
+                    turn_context.turn_state[REPLACE_ACTIVITY] = ack_id
+                await self._send_card(turn_context, cards.error_card(
+                    "Atom is busy right now — please try again in a moment."))
+        finally:
+            if not queued:
+                self.tasks.forget(activity_id)
+
     async def _send_card(self, turn_context: TurnContext, card_content: dict):
-        """Send an Adaptive Card as a response."""
+        """Send an Adaptive Card as a response, or swap it in for the
+        "working" card of a background command."""
         attachment = CardFactory.adaptive_card(card_content)
         activity = Activity(
             type=ActivityTypes.message,
             attachments=[attachment],
         )
-        await turn_context.send_activity(activity)
-
-    @staticmethod
-    def _project_from_bead_id(bead_id: str) -> str | None:
-        """Guess project from bead ID prefix."""
-        prefix_map = {
-            "os": "os",
-            "3dl": "3dl",
-            "website": "website",
-            "mag": "mag-shield",
-            "galtrader": "galtrader",
-            "vms": "vms",
-        }
-        parts = bead_id.split("-", 1)
-        if parts[0] in prefix_map:
-            return prefix_map[parts[0]]
-        return None
+        replace_id = turn_context.turn_state.pop(REPLACE_ACTIVITY, None)
+        if replace_id:
+            activity.id = replace_id
+            try:
+                return await turn_context.update_activity(activity)
+            except Exception as e:
+                # Not every channel supports edits: post the result instead
+                print(f"[bot] card update failed, sending new message: {e}", file=sys.stderr)
+                activity.id = None
+        return await turn_context.send_activity(activity)
 
     @staticmethod
     def _create_invoke_response(status_code: int):
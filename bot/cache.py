@@ -0,0 +1,94 @@
+"""Read-through cache for API GETs made by the bot.
+
+Entries are keyed by (path, params), live for a per-endpoint TTL and are
+evicted least-recently-used past max_entries. Identical lookups that arrive
+while one is already in flight share its result instead of issuing their own
+call. Expired entries are kept until evicted so the next lookup can send
+their ETag as If-None-Match and reuse the body on 304. A load that was in
+flight when invalidate() ran still answers its callers but is not stored.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class Entry:
+    __slots__ = ("value", "etag", "expires")
+
+    def __init__(self, value, etag: str | None, expires: float):
+        self.value = value
+        self.etag = etag
+        self.expires = expires
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, Entry] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._generation = 0
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "coalesced": 0,
+                         "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def key(path: str, params: dict | None = None) -> tuple:
+        return (path, tuple(sorted((params or {}).items())))
+
+    async def get(self, key: tuple, load, ttl: float):
+        """Cached value for key, else `await load(stale_entry)`.
+
+        load returns (value, etag, cacheable); on a 304 it returns the stale
+        entry's value, which is then counted as revalidated.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() < entry.expires:
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["misses"] += 1
+            task = asyncio.ensure_future(self._fill(key, load, ttl, entry))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        # Shielded: one caller giving up must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _fill(self, key: tuple, load, ttl: float, stale: Entry | None):
+        generation = self._generation
+        value, etag, cacheable = await load(stale)
+        if stale is not None and value is stale.value:
+            self.counters["revalidated"] += 1
+        if cacheable and generation == self._generation:
+            self._entries[key] = Entry(value, etag, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        else:
+            self._entries.pop(key, None)
+        return value
+
+    def invalidate(self, match) -> int:
+        """Drop every entry whose path satisfies match(path)."""
+        self._generation += 1
+        doomed = [k for k in self._entries if match(k[0])]
+        for k in doomed:
+            del self._entries[k]
+        # Later lookups must not join a load that started before the change
+        for k in [k for k in self._inflight if match(k[0])]:
+            del self._inflight[k]
+        self.counters["invalidations"] += len(doomed)
+        return len(doomed)
+
+    def stats(self) -> dict:
+        return {**self.counters, "entries": len(self._entries), "max_entries": self.max_entries,
+                "in_flight": len(self._inflight)}
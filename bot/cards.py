@@ -1,5 +1,12 @@
 """Adaptive Card builders for Teams bot responses."""
 
+import json
+
+# Teams rejects message payloads over ~28KB; list cards stop adding rows at
+# this many bytes of card JSON, leaving room for the activity envelope
+CARD_BYTE_BUDGET = 25 * 1024
+TITLE_MAX = 200
+
 
 def _priority_color(priority: int | str | None) -> str:
     p = int(priority) if priority is not None else 9
@@ -19,6 +26,18 @@ def _status_emoji(status: str | None) -> str:
     return "⬚"
 
 
+def _partial_note(failures: dict[str, str]) -> dict:
+    """Warning line naming the projects missing from a multi-project answer."""
+    missing = ", ".join(f"{name} ({reason})" for name, reason in sorted(failures.items()))
+    return {
+        "type": "TextBlock",
+        "text": f"⚠ Partial results — no answer from {missing}",
+        "color": "warning",
+        "wrap": True,
+        "size": "small",
+    }
+
+
 def bead_card(bead: dict) -> dict:
     """Build an Adaptive Card for a single bead."""
     bead_id = bead.get("id", bead.get("key", "?"))
@@ -112,8 +131,88 @@ def bead_card(bead: dict) -> dict:
     return card
 
 
-def bead_list_card(beads: list, title: str = "Beads") -> dict:
-    """Build an Adaptive Card showing a list of beads."""
+def _bead_row(b: dict) -> dict:
+    bead_id = b.get("id", b.get("key", "?"))
+    t = b.get("title", b.get("summary", "Untitled"))
+    s = b.get("status", "open")
+    p = b.get("priority", "?")
+    if len(t) > TITLE_MAX:
+        t = t[:TITLE_MAX - 3] + "..."
+    return {
+        "type": "ColumnSet",
+        "separator": True,
+        "columns": [
+            {
+                "type": "Column",
+                "width": "auto",
+                "items": [{
+                    "type": "TextBlock",
+                    "text": f"`{bead_id}`",
+                    "fontType": "monospace",
+                    "size": "small",
+                }],
+            },
+            {
+                "type": "Column",
+                "width": "auto",
+                "items": [{
+                    "type": "TextBlock",
+                    "text": f"P{p}",
+                    "color": _priority_color(p),
+                    "weight": "bolder",
+                    "size": "small",
+                }],
+            },
+            {
+                "type": "Column",
+                "width": "stretch",
+                "items": [{
+                    "type": "TextBlock",
+                    "text": t,
+                    "wrap": True,
+                    "size": "small",
+                }],
+            },
+            {
+                "type": "Column",
+                "width": "auto",
+                "items": [{
+                    "type": "TextBlock",
+                    "text": _status_emoji(s),
+                    "size": "small",
+                }],
+            },
+        ],
+    }
+
+
+def _page_actions(nav: dict, next_cursor: str | None) -> list:
+    """Prev/Next buttons. Cursors only go forward, so each button carries the
+    trail of earlier page cursors needed to step back."""
+    history = nav.get("history") or []
+    base = {"action": "page", "kind": nav["kind"], "project": nav.get("project")}
+    actions = []
+    if history:
+        actions.append({"type": "Action.Submit", "title": "◀ Prev",
+                        "data": {**base, "cursor": history[-1], "history": history[:-1]}})
+    if next_cursor:
+        actions.append({"type": "Action.Submit", "title": "Next ▶",
+                        "data": {**base, "cursor": next_cursor,
+                                 "history": history + [nav.get("cursor")]}})
+    return actions
+
+
+def bead_page_card(beads: list, title: str = "Beads", failures: dict[str, str] | None = None,
+                   nav: dict | None = None, next_cursor: str | None = None,
+                   budget: int | None = None) -> tuple[dict, int]:
+    """List card packed to `budget` bytes of serialized JSON (default
+    CARD_BYTE_BUDGET).
+
+    Returns (card, rows shown). With nav ({kind, project, cursor, history})
+    the card gets Prev/Next buttons; the caller must make sure next_cursor
+    resumes after the last row shown. Without nav, rows that don't fit are
+    summarized as "... and N more".
+    """
     card = {
         "type": "AdaptiveCard",
         "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
@@ -129,80 +228,53 @@ def bead_list_card(beads: list, title: str = "Beads") -> dict:
         "actions": [],
     }
 
+    if failures:
+        card["body"].append(_partial_note(failures))
+
     if not beads:
         card["body"].append({
             "type": "TextBlock",
             "text": "No beads found.",
             "isSubtle": True,
         })
-        return card
+        return card, 0
 
-    for b in beads[:15]:  # Cap at 15 to keep card readable
-        bead_id = b.get("id", b.get("key", "?"))
-        t = b.get("title", b.get("summary", "Untitled"))
-        s = b.get("status", "open")
-        p = b.get("priority", "?")
-        card["body"].append({
-            "type": "ColumnSet",
-            "separator": True,
-            "columns": [
-                {
-                    "type": "Column",
-                    "width": "auto",
-                    "items": [{
-                        "type": "TextBlock",
-                        "text": f"`{bead_id}`",
-                        "fontType": "monospace",
-                        "size": "small",
-                    }],
-                },
-                {
-                    "type": "Column",
-                    "width": "auto",
-                    "items": [{
-                        "type": "TextBlock",
-                        "text": f"P{p}",
-                        "color": _priority_color(p),
-                        "weight": "bolder",
-                        "size": "small",
-                    }],
-                },
-                {
-                    "type": "Column",
-                    "width": "stretch",
-                    "items": [{
-                        "type": "TextBlock",
-                        "text": t,
-                        "wrap": True,
-                        "size": "small",
-                    }],
-                },
-                {
-                    "type": "Column",
-                    "width": "auto",
-                    "items": [{
-                        "type": "TextBlock",
-                        "text": _status_emoji(s),
-                        "size": "small",
-                    }],
-                },
-            ],
-        })
+    if nav is not None:
+        card["actions"] = _page_actions(nav, next_cursor)
+        footer = {"type": "TextBlock", "text": f"Page {len(nav.get('history') or []) + 1}",
+                  "isSubtle": True, "size": "small"}
+    else:
+        footer = {"type": "TextBlock", "text": f"... and {len(beads)} more",
+                  "isSubtle": True, "size": "small"}
 
-    if len(beads) > 15:
-        card["body"].append({
-            "type": "TextBlock",
-            "text": f"... and {len(beads) - 15} more",
-            "isSubtle": True,
-            "size": "small",
-        })
+    budget = budget or CARD_BYTE_BUDGET
+    # Sizes add up exactly: each row costs its own JSON plus one separator
+    used = len(json.dumps(card)) + len(json.dumps(footer)) + 1
+    rows = []
+    for b in beads:
+        row = _bead_row(b)
+        cost = len(json.dumps(row)) + 1
+        if rows and used + cost > budget:
+            break
+        rows.append(row)
+        used += cost
+    card["body"] += rows
+
+    if nav is not None:
+        card["body"].append(footer)
+    elif len(rows) < len(beads):
+        footer["text"] = f"... and {len(beads) - len(rows)} more"
+        card["body"].append(footer)
+    return card, len(rows)
 
-    return card
 
+def bead_list_card(beads: list, title: str = "Beads", failures: dict[str, str] | None = None) -> dict:
+    """Build an Adaptive Card showing a list of beads (as many as fit the
+    payload budget).
 
-def ready_card(beads: list) -> dict:
-    """Build a card specifically for 'ready' results."""
-    return bead_list_card(beads, title="Ready Work")
+    failures: projects missing from a multi-project list, name -> reason.
+    """
+    return bead_page_card(beads, title, failures)[0]
 
 
 def text_card(text: str, title: str | None = None) -> dict:
@@ -228,6 +300,87 @@ def text_card(text: str, title: str | None = None) -> dict:
     return card
 
 
+def status_card(stats: dict, title: str = "Status") -> dict:
+    """Bead counts from /api/v1/stats (one project's or the portfolio entry)."""
+    card = {
+        "type": "AdaptiveCard",
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "version": "1.4",
+        "body": [
+            {
+                "type": "TextBlock",
+                "text": title,
+                "weight": "bolder",
+                "size": "medium",
+            },
+        ],
+    }
+    if not stats.get("total"):
+        card["body"].append({"type": "TextBlock", "text": "No beads found.", "isSubtle": True})
+        return card
+
+    by_status = stats.get("by_status", {})
+    card["body"].append({
+        "type": "FactSet",
+        "facts": [{"title": f"{_status_emoji(s)} {s}", "value": str(n)}
+                  for s, n in sorted(by_status.items())],
+    })
+    by_priority = stats.get("by_priority", {})
+    summary = [f"**{stats.get('active', 0)}** active",
+               f"**{stats.get('high_priority', 0)}** high priority"]
+    if by_priority:
+        summary.append(" · ".join(f"P{p}: {n}" for p, n in sorted(by_priority.items())))
+    card["body"].append({"type": "TextBlock", "text": " — ".join(summary), "wrap": True,
+                         "separator": True})
+    return card
+
+
+def portfolio_status_card(per_project: dict[str, dict], failures: dict[str, str] | None = None) -> dict:
+    """One line of counts per project (from /api/v1/stats), plus totals."""
+    card = {
+        "type": "AdaptiveCard",
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "version": "1.4",
+        "body": [
+            {
+                "type": "TextBlock",
+                "text": "Status — All Projects",
+                "weight": "bolder",
+                "size": "medium",
+            },
+        ],
+    }
+    if failures:
+        card["body"].append(_partial_note(failures))
+
+    facts = []
+    totals = {"active": 0, "high_priority": 0, "in_progress": 0}
+    for name, stats in sorted(per_project.items()):
+        in_progress = stats.get("by_status", {}).get("in_progress", 0)
+        totals["active"] += stats.get("active", 0)
+        totals["high_priority"] += stats.get("high_priority", 0)
+        totals["in_progress"] += in_progress
+        facts.append({"title": name, "value": f"{stats.get('active', 0)} active · "
+                      f"{stats.get('high_priority', 0)} high priority · {in_progress} in progress"})
+    if not facts:
+        card["body"].append({"type": "TextBlock", "text": "No projects answered.", "isSubtle": True})
+        return card
+    card["body"].append({"type": "FactSet", "facts": facts})
+    card["body"].append({
+        "type": "TextBlock",
+        "text": f"**Total:** {totals['active']} active — {totals['high_priority']} high priority — "
+                f"{totals['in_progress']} in progress",
+        "wrap": True,
+        "separator": True,
+    })
+    return card
+
+
+def working_card(text: str = "Working on it…") -> dict:
+    """Placeholder for a command running in the background; replaced by its result."""
+    return text_card(f"⏳ {text}")
+
+
 def close_prompt_card(bead_id: str) -> dict:
     """Card with input field to collect close reason."""
     return {
@@ -283,7 +436,8 @@ def help_card() -> dict:
                 "facts": [
                     {"title": "ready", "value": "Show actionable work (no blockers)"},
                     {"title": "show <id>", "value": "Show bead details"},
-                    {"title": "list [project]", "value": "List open beads"},
+                    {"title": "list [project|all]", "value": "List open beads"},
+                    {"title": "status [project|all]", "value": "Bead counts"},
                     {"title": "claim <id>", "value": "Claim a bead"},
                     {"title": "done <id> <reason>", "value": "Close a bead"},
                     {"title": "projects", "value": "List registered projects"},
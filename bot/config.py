@@ -10,6 +10,24 @@ TENANT_ID = os.environ.get("AZURE_TENANT_ID", "")
 # Atom API
 API_BASE = os.environ.get("ATOM_API_URL", "http://localhost:3131")
 API_TOKEN = os.environ.get("ATOM_API_TOKEN", "")
+# Connection pool to the API: max open connections, idle keep-alive (s),
+# DNS cache lifetime (s) and per-request timeout (s)
+API_POOL_SIZE = int(os.environ.get("ATOM_API_POOL_SIZE", "32"))
+API_KEEPALIVE = float(os.environ.get("ATOM_API_KEEPALIVE", "30"))
+API_DNS_TTL = int(os.environ.get("ATOM_API_DNS_TTL", "300"))
+API_TIMEOUT = float(os.environ.get("ATOM_API_TIMEOUT", "15"))
+# Bot-side response cache: entry bound, TTL (s) for beads/lists/status, and
+# TTL for the project registry (changes only on deploy); 0 disables caching
+CACHE_SIZE = int(os.environ.get("ATOM_BOT_CACHE_SIZE", "512"))
+CACHE_TTL = float(os.environ.get("ATOM_BOT_CACHE_TTL", "15"))
+CACHE_PROJECTS_TTL = float(os.environ.get("ATOM_BOT_CACHE_PROJECTS_TTL", "300"))
 
 # Bot server
 BOT_PORT = int(os.environ.get("BOT_PORT", "3978"))
+# Background command execution: concurrent commands and queued commands
+# beyond which new ones are refused with a "busy" card
+BOT_WORKERS = int(os.environ.get("ATOM_BOT_WORKERS", "4"))
+BOT_QUEUE_SIZE = int(os.environ.get("ATOM_BOT_QUEUE_SIZE", "100"))
+# "list all" / "status all": per-project deadline (s); slower projects are
+# reported as missing from a partial answer
+BOT_PROJECT_TIMEOUT = float(os.environ.get("ATOM_BOT_PROJECT_TIMEOUT", "5"))
@@ -0,0 +1,103 @@
+"""Background execution of slow bot commands.
+
+Bot Framework wants each activity acknowledged quickly and redelivers ones
+that aren't, so API-backed commands are answered with a "working" card and
+run here instead; results go back as proactive messages (bot.py). A fixed
+number of workers bounds concurrent commands, the queue is bounded too, and
+recently seen activity IDs are remembered so a redelivered activity doesn't
+run its command twice.
+"""
+
+import asyncio
+import sys
+import time
+import traceback
+from collections import OrderedDict
+
+
+class TaskQueue:
+    def __init__(self, concurrency: int = 4, max_pending: int = 100,
+                 dedupe_ttl: float = 600, dedupe_size: int = 2048):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.dedupe_ttl = dedupe_ttl
+        self.dedupe_size = dedupe_size
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._recent: OrderedDict[str, float] = OrderedDict()
+        self.running = 0
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0,
+                         "duplicates": 0}
+
+    def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(self.max_pending)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain_timeout: float = 10) -> None:
+        """Give queued commands a chance to finish, then cancel the workers."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue, self._workers = None, []
+
+    def is_duplicate(self, activity_id: str | None) -> bool:
+        """True if this activity ID was seen within dedupe_ttl (and record it)."""
+        if not activity_id:
+            return False
+        now = time.monotonic()
+        while self._recent and (len(self._recent) > self.dedupe_size
+                                or next(iter(self._recent.values())) < now - self.dedupe_ttl):
+            self._recent.popitem(last=False)
+        if activity_id in self._recent:
+            self.counters["duplicates"] += 1
+            return True
+        self._recent[activity_id] = now
+        return False
+
+    def forget(self, activity_id: str | None) -> None:
+        """Un-record an activity whose command was not queued, so a
+        redelivery of it runs."""
+        if activity_id:
+            self._recent.pop(activity_id, None)
+
+    def submit(self, job) -> bool:
+        """Queue `await job()`; False when the queue is full."""
+        self.start()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            return False
+        self.counters["submitted"] += 1
+        return True
+
+    async def join(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self.running += 1
+            try:
+                await job()
+                self.counters["completed"] += 1
+            except Exception:
+                self.counters["failed"] += 1
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {**self.counters, "running": self.running, "concurrency": self.concurrency,
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                "max_pending": self.max_pending}
@@ -1,8 +1,10 @@
 """Tests for the Atom Teams Bot — card builders and command parsing."""
 
+import asyncio
 import json
 import sys
 import os
+import time
 import types
 
 # Add bot directory to path
@@ -18,7 +20,8 @@ for mod_name in [
         m = types.ModuleType(mod_name)
         # Add stub classes that bot.py imports
         if mod_name == "botbuilder.core":
-            m.TurnContext = type("TurnContext", (), {})
+            m.TurnContext = type("TurnContext", (), {
+                "get_conversation_reference": staticmethod(lambda activity: activity.conversation)})
             m.CardFactory = type("CardFactory", (), {"adaptive_card": staticmethod(lambda x: x)})
             m.BotFrameworkAdapter = type("BotFrameworkAdapter", (), {})
             m.BotFrameworkAdapterSettings = type("BotFrameworkAdapterSettings", (), {})
@@ -26,12 +29,16 @@ for mod_name in [
         if mod_name == "botbuilder.core.teams":
             m.TeamsActivityHandler = type("TeamsActivityHandler", (), {})
         if mod_name == "botbuilder.schema":
-            m.Activity = type("Activity", (), {})
+            m.Activity = type("Activity", (), {
+                "__init__": lambda self, **kw: self.__dict__.update({"id": None, **kw})})
             m.ActivityTypes = type("ActivityTypes", (), {"message": "message"})
         sys.modules[mod_name] = m
 
 import cards
-from bot import _extract_bead_id, _strip_mention, _extract_project, AtomBot
+import api_client
+from bot import _extract_bead_id, _strip_mention, _extract_project, _wants_all, AtomBot
+import bot as bot_module
+from tasks import TaskQueue
 
 
 # ---- Unit tests for helpers ----
@@ -58,14 +65,6 @@ def test_extract_project():
     assert _extract_project("hello") is None
 
 
-def test_project_from_bead_id():
-    assert AtomBot._project_from_bead_id("os-mjb") == "os"
-    assert AtomBot._project_from_bead_id("3dl-k3e") == "3dl"
-    assert AtomBot._project_from_bead_id("galtrader-d0a") == "galtrader"
-    assert AtomBot._project_from_bead_id("vms-123") == "vms"
-    assert AtomBot._project_from_bead_id("unknown-xyz") is None
-
-
 # ---- Unit tests for card builders ----
 
 def test_bead_card():
@@ -116,11 +115,6 @@ def test_bead_list_card_empty():
     assert any("No beads found" in str(item) for item in card["body"])
 
 
-def test_ready_card():
-    card = cards.ready_card([{"id": "x-1", "title": "Test", "status": "open", "priority": 0}])
-    assert card["body"][0]["text"] == "Ready Work"
-
-
 def test_help_card():
     card = cards.help_card()
     assert card["type"] == "AdaptiveCard"
@@ -162,12 +156,30 @@ def test_text_card():
     assert card["body"][1]["text"] == "Hello"
 
 
+def test_status_card():
+    stats = {"total": 120, "active": 70, "high_priority": 9,
+             "by_status": {"open": 60, "in_progress": 10, "closed": 50},
+             "by_priority": {"0": 2, "1": 7, "2": 61}}
+    card = cards.status_card(stats, title="Status — os")
+    assert card["body"][0]["text"] == "Status — os"
+    facts = {f["title"].split()[-1]: f["value"] for f in card["body"][1]["facts"]}
+    assert facts == {"closed": "50", "in_progress": "10", "open": "60"}
+    assert "9** high priority" in card["body"][2]["text"]
+    assert "No beads found" in str(cards.status_card({"total": 0}))
+
+
 def test_bead_list_truncation():
-    """List card should cap at 15 beads."""
+    """List cards fit as many rows as the byte budget allows."""
     beads = [{"id": f"x-{i}", "title": f"Bead {i}", "status": "open", "priority": 2} for i in range(25)]
     card = cards.bead_list_card(beads)
-    # Header + 15 beads + "...and N more" text
-    assert len(card["body"]) == 17
+    # Header + all 25 beads: short rows fit easily
+    assert len(card["body"]) == 26
+
+    long = [{"id": f"x-{i}", "title": "é" * 500, "status": "open", "priority": 2} for i in range(200)]
+    card, shown = cards.bead_page_card(long)
+    assert 0 < shown < 200 and len(json.dumps(card)) <= cards.CARD_BYTE_BUDGET
+    assert card["body"][-1]["text"] == f"... and {200 - shown} more"
+    assert len(card["body"][1]["columns"][2]["items"][0]["text"]) == cards.TITLE_MAX
 
 
 def test_all_cards_valid_json():
@@ -180,8 +192,8 @@ def test_all_cards_valid_json():
         cards.close_prompt_card("x-1"),
         cards.bead_card({"id": "x-1", "title": "t", "status": "open", "priority": 1}),
         cards.bead_list_card([]),
-        cards.ready_card([]),
         cards.projects_card([]),
+        cards.status_card({}),
     ]
     for c in test_cards:
         serialized = json.dumps(c)
@@ -190,6 +202,308 @@ def test_all_cards_valid_json():
         assert parsed["type"] == "AdaptiveCard"
 
 
+# ---- API client ----
+
+class _FakeResponse:
+    def __init__(self, status, body, headers=None):
+        self.status, self.body, self.headers = status, body, headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return str(self.body)
+
+
+class _FakeSession:
+    closed = False
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        if url.endswith("/missing"):
+            return _FakeResponse(404, {"ok": False})
+        if (kwargs.get("headers") or {}).get("If-None-Match") == '"v1"':
+            return _FakeResponse(304, None, {"ETag": '"v1"'})
+        return _FakeResponse(200, {"ok": True, "n": len(self.calls)}, {"ETag": '"v1"'})
+
+
+def test_api_client_reuses_one_session_and_counts():
+    import api_client
+    client = api_client.ApiClient(pool_size=4)
+    session = client._session = _FakeSession()
+    ctx = types.SimpleNamespace()
+
+    async def go():
+        assert (await client.request("GET", "/api/v1/ready"))["ok"]
+        missing = await client.request("PATCH", "/missing", json={})
+        assert missing["error"] and missing["status"] == 404
+        await client._on_create(None, ctx, None)
+        await client._on_reuse(None, ctx, None)
+        await client._on_queued_start(None, ctx, None)
+        await client._on_queued_end(None, ctx, None)
+
+    asyncio.run(go())
+    assert [c[0] for c in session.calls] == ["GET", "PATCH"]
+    stats = client.stats()
+    assert stats["requests"] == 2 and stats["errors"] == 1 and stats["in_flight"] == 0
+    assert stats["connections_created"] == 1 and stats["connections_reused"] == 1
+    assert stats["pool_waits"] == 1 and stats["pool_size"] == 4
+
+
+def test_response_cache_coalesces_evicts_and_invalidates():
+    from cache import ResponseCache
+    cache = ResponseCache(max_entries=2)
+    loads = []
+
+    def loader(value):
+        async def load(stale):
+            loads.append(value)
+            await asyncio.sleep(0.01)
+            return value, None, True
+        return load
+
+    async def go():
+        k1, k2, k3 = (cache.key(f"/p{i}") for i in range(1, 4))
+        # Three simultaneous identical lookups share one load
+        got = await asyncio.gather(*(cache.get(k1, loader("a"), 60) for _ in range(3)))
+        assert got == ["a"] * 3 and loads == ["a"]
+        assert await cache.get(k1, loader("x"), 60) == "a"  # hit
+        await cache.get(k2, loader("b"), 60)
+        await cache.get(k1, loader("x"), 60)                # k1 now most recent
+        await cache.get(k3, loader("c"), 60)                # evicts k2
+        assert await cache.get(k2, loader("b2"), 60) == "b2"
+        assert cache.invalidate(lambda path: path == "/p3") == 1
+        assert await cache.get(k3, loader("c2"), 60) == "c2"
+
+    asyncio.run(go())
+    stats = cache.stats()
+    assert stats["coalesced"] == 2 and stats["hits"] == 2 and stats["evictions"] >= 1
+    assert stats["invalidations"] == 1 and stats["entries"] == 2
+
+
+def test_api_client_cache_revalidates_and_invalidates_on_write():
+    import api_client
+    client = api_client.ApiClient()
+    session = client._session = _FakeSession()
+
+    async def go():
+        first = await client.cached_get("/api/v1/beads/os-a", ttl=60)
+        assert await client.cached_get("/api/v1/beads/os-a", ttl=60) is first
+        assert len(session.calls) == 1
+        # Expired: revalidated with If-None-Match, body reused on 304
+        await client.cached_get("/api/v1/ready", {"limit": "20"}, ttl=0.001)
+        await asyncio.sleep(0.01)
+        await client.cached_get("/api/v1/ready", {"limit": "20"}, ttl=0.001)
+        assert session.calls[-1][2]["headers"] == {"If-None-Match": '"v1"'}
+        assert client.cache.counters["revalidated"] == 1
+        # Errors are not cached
+        await client.cached_get("/missing", ttl=60)
+        await client.cached_get("/missing", ttl=60)
+        assert client.cache.counters["misses"] == 5
+
+        client.invalidate_bead("os-a")
+        await client.cached_get("/api/v1/beads/os-a", ttl=60)
+        assert session.calls[-1][1].endswith("/api/v1/beads/os-a")
+        assert client.cache.stats()["entries"] == 1  # ready went with the bead
+
+    asyncio.run(go())
+
+
+# ---- Background commands ----
+
+class _FakeTurn:
+    """TurnContext stand-in recording what the bot sends and edits."""
+
+    def __init__(self, log, text="", activity_id=None):
+        self.log = log
+        self.activity = types.SimpleNamespace(text=text, id=activity_id, conversation="conv-1")
+        self.turn_state = {}
+
+    async def send_activity(self, activity):
+        self.log.append(("send", activity.attachments[0]))
+        return types.SimpleNamespace(id=f"msg-{len(self.log)}")
+
+    async def update_activity(self, activity):
+        self.log.append(("update", activity.id, activity.attachments[0]))
+
+
+class _FakeAdapter:
+    def __init__(self, log):
+        self.log = log
+
+    async def continue_conversation(self, reference, callback, bot_id=None):
+        assert reference == "conv-1"
+        await callback(_FakeTurn(self.log))
+
+
+def test_slow_commands_ack_then_reply_in_background():
+    log = []
+    release = asyncio.Event()
+
+    async def get_bead(bead_id, project=None):
+        await release.wait()
+        if bead_id == "os-x":
+            raise RuntimeError("boom")
+        return {"id": bead_id, "title": "Slow bead", "status": "open", "priority": 1}
+
+    async def go():
+        tasks = TaskQueue(concurrency=1, max_pending=1)
+        bot = AtomBot(adapter=_FakeAdapter(log), app_id="app", tasks=tasks)
+        await bot.on_message_activity(_FakeTurn(log, "show os-a", "act-1"))
+        # Acknowledged before the API answered
+        assert log[0][0] == "send" and "Working" in str(log[0][1])
+        # Redelivery of the same activity is ignored
+        await bot.on_message_activity(_FakeTurn(log, "show os-a", "act-1"))
+        await asyncio.sleep(0)
+        await bot.on_message_activity(_FakeTurn(log, "show os-b", "act-2"))  # queued
+        await bot.on_message_activity(_FakeTurn(log, "show os-c", "act-3"))  # queue full
+        assert "busy" in str(log[-1])
+        release.set()
+        await tasks.join()
+        # Results replace their "working" cards
+        updates = [entry for entry in log if entry[0] == "update"]
+        assert [u[1] for u in updates[-2:]] == ["msg-1", "msg-2"]
+        assert "os-a" in str(updates[-2][2]) and "os-b" in str(updates[-1][2])
+        assert tasks.stats()["duplicates"] == 1 and tasks.stats()["rejected"] == 1
+
+        # A rejected activity is not remembered, so its redelivery runs
+        await bot.on_message_activity(_FakeTurn(log, "show os-c", "act-3"))
+        await tasks.join()
+        assert "os-c" in str(log[-1]) and tasks.stats()["duplicates"] == 1
+
+        # A failing command gets exactly one error card and counts as failed
+        before = len(log)
+        await bot.on_message_activity(_FakeTurn(log, "show os-x", "act-4"))
+        await tasks.join()
+        errors = [entry for entry in log[before:] if "Command failed" in str(entry)]
+        assert len(errors) == 1 and tasks.stats()["failed"] == 1
+        await tasks.stop()
+
+    original, api_client.get_bead = api_client.get_bead, get_bead
+    try:
+        asyncio.run(go())
+    finally:
+        api_client.get_bead = original
+
+
+def test_all_projects_fan_out_concurrently_with_partial_results():
+    assert _wants_all("list all") and _wants_all("status *")
+    assert not _wants_all("list os") and not _wants_all("all")
+    log = []
+    delays = {"os": 0.05, "3dl": 0.05, "vms": 0.05, "slow": 10}
+
+    async def list_projects():
+        return [{"name": n, "has_beads": True} for n in [*delays, "broken"]]
+
+    async def get_stats(project=None):
+        if project == "broken":
+            return {"error": True, "status": 502, "detail": "bd exited 1"}
+        await asyncio.sleep(delays[project])
+        return {"projects": {project: {"active": 2, "high_priority": 1,
+                                       "by_status": {"in_progress": 1}}}}
+
+    async def list_beads(project=None, limit=20, **_):
+        if project == "broken":
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(delays[project])
+        return [{"id": f"{project}-1", "title": "t", "status": "open", "priority": len(project)}]
+
+    patched = {"list_projects": list_projects, "get_stats": get_stats, "list_beads": list_beads}
+    originals = {name: getattr(api_client, name) for name in patched}
+    original_timeout = bot_module.config.BOT_PROJECT_TIMEOUT
+
+    async def go():
+        bot = AtomBot()
+        started = time.monotonic()
+        await bot.on_message_activity(_FakeTurn(log, "status all"))
+        # Bounded by the per-project timeout, not the sum of project latencies
+        assert time.monotonic() - started < 1
+        await bot.on_message_activity(_FakeTurn(log, "list all"))
+
+    try:
+        for name, fn in patched.items():
+            setattr(api_client, name, fn)
+        bot_module.config.BOT_PROJECT_TIMEOUT = 0.3
+        asyncio.run(go())
+    finally:
+        for name, fn in originals.items():
+            setattr(api_client, name, fn)
+        bot_module.config.BOT_PROJECT_TIMEOUT = original_timeout
+
+    status = log[0][1]
+    facts = status["body"][2]["facts"]
+    assert [f["title"] for f in facts] == ["3dl", "os", "vms"]
+    assert "6 active" in status["body"][3]["text"]
+    note = status["body"][1]["text"]
+    assert "broken (HTTP 502)" in note and "slow (timed out)" in note
+    listing = log[1][1]
+    assert "broken (connection reset)" in listing["body"][1]["text"]
+    ids = [row["columns"][0]["items"][0]["text"] for row in listing["body"][2:]]
+    assert ids == ["`os-1`", "`3dl-1`", "`vms-1`"]
+
+
+def test_paged_list_cards_navigate_with_cursors():
+    beads = [{"id": f"os-{i:03d}", "title": f"Bead {i}" + "é" * (400 if i >= 50 else 0),
+              "status": "open", "priority": 2} for i in range(60)]
+    calls = []
+
+    async def list_page(project=None, cursor=None, limit=25):
+        calls.append((cursor, limit))
+        start = int(cursor or 0)
+        end = min(start + limit, len(beads))
+        return {"beads": beads[start:end], "next_cursor": str(end) if end < len(beads) else None}
+
+    log = []
+
+    async def go():
+        bot = AtomBot()
+        await bot.on_message_activity(_FakeTurn(log, "list os"))
+        first = log[-1][1]
+        assert first["body"][-1]["text"] == "Page 1"
+        assert [a["title"] for a in first["actions"]] == ["Next ▶"]
+        nxt = first["actions"][0]["data"]
+        assert nxt == {"action": "page", "kind": "list", "project": "os",
+                       "cursor": "25", "history": [None]}
+
+        # Next arrives as an invoke and updates the clicked card in place
+        turn = _FakeTurn(log)
+        turn.activity.name = "adaptiveCard/action"
+        turn.activity.value = {"action": {"data": nxt}}
+        turn.activity.reply_to_id = "card-1"
+        await bot.on_invoke_activity(turn)
+        assert log[-1][:2] == ("update", "card-1")
+        second = log[-1][2]
+        assert [a["title"] for a in second["actions"]] == ["◀ Prev", "Next ▶"]
+        assert second["actions"][0]["data"]["cursor"] is None
+
+        # Page 3 has long rows: packed to the budget, then refetched to match
+        turn.activity.value = {"action": {"data": second["actions"][1]["data"]}}
+        await bot.on_invoke_activity(turn)
+        third = log[-1][2]
+        assert len(json.dumps(third)) <= cards.CARD_BYTE_BUDGET
+        shown = len(third["body"]) - 2
+        assert calls[-1] == ("50", shown) and shown < 10
+        assert third["actions"][-1]["data"]["cursor"] == str(50 + shown)
+
+    original, api_client.list_page = api_client.list_page, list_page
+    budget = cards.CARD_BYTE_BUDGET
+    cards.CARD_BYTE_BUDGET = 16000  # 25 short rows fit, long ones don't
+    try:
+        asyncio.run(go())
+    finally:
+        api_client.list_page = original
+        cards.CARD_BYTE_BUDGET = budget
+
+
 # ---- Run ----
 
 if __name__ == "__main__":